@@ -1,13 +1,21 @@
 import sys
+import threading
 from data_core.hemispheric_bloom import hemispheric_bloom_cycle, RecursionPacket
-try:
-    # Import Ollama Python API for the Phi model
-    from ollama import chat as ollama_chat
-except ImportError:
-    ollama_chat = None
+from llm_adapter.admission import backend_for, get_scheduler, priority_for_manifest
+from llm_adapter.manifest_render import DEFAULT_TOKEN_BUDGET, render_manifest
+from llm_adapter.telemetry import get_telemetry
 
-def generate_bloom_manifest(user_input: str):
-    """Process the user input through the Bloom (hemispheric) layer to get a manifest."""
+# Warm Ollama clients, one per host, so long-lived processes reuse connections
+# (the Ollama library itself is imported on first use to keep start-up fast)
+_clients = {}
+_clients_lock = threading.Lock()
+
+def generate_bloom_manifest(user_input: str, memo: bool = False):
+    """Process the user input through the Bloom (hemispheric) layer to get a manifest.
+
+    With ``memo`` the cycle is replayed from ``data_core.bloom_memo`` when
+    the same L4 vector has been seen before (only the timestamp differs).
+    """
     # Prepare the recursion packet with the input
     packet = RecursionPacket(user_input)
     # Seed an initial L4 logic vector (symbols guiding the Bloom process)
@@ -17,30 +25,88 @@ def generate_bloom_manifest(user_input: str):
         # Additional symbols (e.g. Θ) can be included if needed for deeper logic
     ]
     # Run the hemispheric Bloom cycle (layers 5–8) to produce the manifest
-    result_packet = hemispheric_bloom_cycle(packet)
+    if memo:
+        from data_core.bloom_memo import memoized_bloom_cycle
+
+        result_packet = memoized_bloom_cycle(packet)
+    else:
+        result_packet = hemispheric_bloom_cycle(packet)
     # Extract the Bloom manifest (symbolic directives) from the result
     manifest = result_packet.annotations.get("bloom_manifest", {})
     return manifest
 
-def query_phi_coder(manifest: dict, model_name: str = "phi", host: str = "http://localhost:11434"):
-    """Send the Bloom manifest to the Phi LLM (via Ollama) and get the model's response."""
-    if ollama_chat is None:
-        raise RuntimeError("Ollama library is not installed or available.")
-    # Format the manifest into a prompt string for the LLM
-    # (We include a header and list each directive line for clarity)
-    prompt_lines = ["🧬 Bloom Manifest – auto-generated from input –"]
-    for directive in manifest.get("linear_directives", []):
-        line = f"- [{directive['priority']}] {directive['action']} ({directive['tag']} @ {directive['path']}) | confidence: {directive['confidence']}"
-        prompt_lines.append(line)
-    prompt_str = "\n".join(prompt_lines)
+def get_ollama_client(host: str = "http://localhost:11434"):
+    """Return a cached Ollama client for ``host`` (created on first use)."""
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            try:
+                # Import Ollama Python API for the Phi model
+                from ollama import Client as OllamaClient
+            except ImportError:
+                raise RuntimeError("Ollama library is not installed or available.")
+            client = _clients[host] = OllamaClient(host=host)
+        return client
+
+def format_manifest_prompt(manifest: dict, token_budget: int = DEFAULT_TOKEN_BUDGET, model_name: str = None) -> str:
+    """Format the manifest into a prompt string for the LLM."""
+    # (A header, then deduplicated directives in rank order until the budget, counted
+    # with model_name's tokenizer, is spent)
+    return render_manifest(manifest, token_budget=token_budget, model_name=model_name)
+
+def query_phi_coder(manifest: dict, model_name: str = "phi", host: str = "http://localhost:11434",
+                    token_budget: int = DEFAULT_TOKEN_BUDGET, router=None, priority=None, deadline=None,
+                    semantic_cache=None):
+    """Send the Bloom manifest to the Phi LLM (via Ollama) and get the model's response.
+
+    Pass an ``llm_adapter.router.OllamaRouter`` as ``router`` to spread calls
+    over several Ollama hosts instead of pinning them to ``host``.
+
+    The call waits for a slot in the admission scheduler first; ``priority``
+    defaults to the manifest's strongest directive and ``deadline`` bounds
+    the wait in seconds (``AdmissionRejected`` is raised under overload).
+
+    With ``semantic_cache`` (a ``SemanticCache``, or ``True`` for the shared
+    one) a near-identical earlier manifest's answer is served without a call.
+    """
+    prompt_str = format_manifest_prompt(manifest, token_budget, model_name)
+    if semantic_cache:
+        from llm_adapter.semantic_cache import resolve
+
+        return resolve(semantic_cache).get_or_compute(
+            prompt_str,
+            lambda: query_phi_coder(manifest, model_name, host, token_budget, router, priority, deadline),
+            manifest=manifest, namespace=f"phi:{model_name}",
+        )
     # Prepare the message payload for the Ollama chat API
     messages = [{"role": "user", "content": prompt_str}]
     # Optionally, a system prompt could be prepended here via {"role": "system", "content": "..."} if needed
     # Call the Ollama API to generate a response from the Phi model
-    response = ollama_chat(model=model_name, messages=messages, host=host)
+    client = router if router is not None else get_ollama_client(host)
+    with get_scheduler().admit(backend_for(host, router), priority or priority_for_manifest(manifest), deadline) as ticket, \
+            get_telemetry().track(model_name, "router" if router is not None else host, "chat", ticket.queue_wait) as call:
+        response = client.chat(model=model_name, messages=messages)
+        call.response(response)
     # Extract the content of the assistant's message (Phi model's answer)
     return response["message"]["content"]
 
+def stream_phi_coder(manifest: dict, model_name: str = "phi", host: str = "http://localhost:11434",
+                     token_budget: int = DEFAULT_TOKEN_BUDGET, router=None, priority=None, deadline=None):
+    """Like ``query_phi_coder`` but yield the answer in chunks as the model produces them."""
+    messages = [{"role": "user", "content": format_manifest_prompt(manifest, token_budget, model_name)}]
+    client = router if router is not None else get_ollama_client(host)
+    # The slot is held until the stream is exhausted or closed
+    with get_scheduler().admit(backend_for(host, router), priority or priority_for_manifest(manifest), deadline) as ticket, \
+            get_telemetry().track(model_name, "router" if router is not None else host, "chat", ticket.queue_wait) as call:
+        for chunk in client.chat(model=model_name, messages=messages, stream=True):
+            content = chunk["message"]["content"]
+            if content:
+                call.first_token()
+                yield content
+            if chunk.get("done"):
+                # The final chunk carries the token counts and durations
+                call.response(chunk)
+
 def main():
     # Get user input from command-line arguments or prompt if not provided
     if len(sys.argv) > 1:
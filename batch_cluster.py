@@ -0,0 +1,583 @@
+"""
+batch_cluster.py
+================
+
+Coordinator/worker mode for ``bloom_batch`` across several machines.
+
+The coordinator indexes the input JSONL (``jsonl_index``), cuts it into
+shards of ``--shard-size`` records and hands them out as leases over a
+line-delimited JSON TCP protocol.  Workers run each record through
+``bloom_batch.process_record`` and stream every result back as soon as
+it finishes.
+
+* **Leases** expire ``--lease-ttl`` seconds after the last heartbeat,
+  or ``--record-timeout`` seconds after the lease last produced a result
+  (so a worker that is alive but stuck on one record cannot hold it
+  forever); the unfinished records of an expired lease (or of a worker
+  whose connection drops) go back to the front of the queue.
+* **Work stealing**: once the queue is empty, an idle worker takes the
+  tail half of the lease with the longest estimated time to finish
+  (remaining records ÷ that lease's observed rate).  The victim learns
+  about it in the ``revoked`` field of its next reply and skips those
+  records.  Tails too short to split (and stalled leases) are instead
+  re-issued speculatively to idle workers without revoking them — the
+  first result wins either way.
+* **Exactly-once, deterministic output**: the first result for each
+  record index wins and later duplicates are dropped; results are
+  written strictly in input order, so the output has the same records,
+  in the same order and with the same content as a single-process
+  ``bloom_batch`` run whatever the worker count, timing or failures
+  (timing fields such as ``latency_ms`` naturally differ).  The
+  coordinator checkpoints the output like ``bloom_batch`` and resumes
+  from it after a crash.
+
+The input's offset index is kept next to the output, as
+``<output>.input.idx`` (``--index`` to choose another path), so the input
+may sit in a read-only location; it is removed with the checkpoint once
+the run completes.
+
+Protocol (one JSON object per line, every request gets one reply)::
+
+    → {"op": "hello", "worker": "host-1:4242"}       ← {"op": "welcome", "heartbeat": 10.0}
+    → {"op": "lease"}                                ← {"op": "lease", "lease": 7, "records": [[i, record], ...]}
+                                                       | {"op": "wait", "retry": 0.5} | {"op": "done"}
+    → {"op": "result", "lease": 7, "result": {...}}  ← {"op": "ok", "revoked": [i, ...]}
+    → {"op": "heartbeat", "lease": 7}                ← {"op": "ok", "revoked": [...]} | {"op": "lost"}
+    → {"op": "complete", "lease": 7}                 ← {"op": "ok"}
+
+Usage::
+
+    python batch_cluster.py coordinator dataset.jsonl -o results.jsonl --bind 0.0.0.0 --port 7341
+    python batch_cluster.py worker coordinator-host:7341 --concurrency 8 --host http://localhost:11434
+    python batch_cluster.py local dataset.jsonl -o results.jsonl --workers 4 --bloom-only
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_PORT = 7341
+
+
+def _decode(raw):
+    try:
+        return json.loads(raw.decode("utf-8-sig"))
+    except ValueError as e:
+        return {"_decode_error": str(e)}
+
+
+def _send(stream, payload):
+    stream.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+class Lease:
+    __slots__ = ("id", "worker", "remaining", "revoked", "started", "finished", "expires", "progress",
+                 "speculative")
+
+    def __init__(self, lease_id, worker, indices, ttl, speculative=False):
+        self.id = lease_id
+        self.worker = worker
+        self.remaining = list(indices)
+        self.revoked = []
+        self.started = time.monotonic()
+        self.finished = 0
+        self.expires = self.started + ttl
+        self.progress = self.started
+        self.speculative = speculative
+
+    def eta(self):
+        """Estimated seconds to finish, from this lease's observed rate."""
+        elapsed = time.monotonic() - self.started
+        rate = self.finished / elapsed if self.finished and elapsed > 0 else 0.0
+        return len(self.remaining) / rate if rate else float("inf")
+
+
+def index_path_for_output(output_path):
+    return output_path + ".input.idx"
+
+
+# 🧭 Coordinator
+class Coordinator:
+    """Serve leases over ``input_path`` and merge results into ``output_path``.
+
+    Args:
+        shard_size: Records per lease.
+        lease_ttl: Seconds a lease survives without a heartbeat or result.
+        min_steal: Smallest number of records taken from a peer by stealing.
+        record_timeout: Seconds a lease may go without producing a result
+            before heartbeats stop renewing it (``None`` disables).
+        checkpoint_every: Written records between output checkpoints.
+        restart: Ignore an existing checkpoint.
+        index_path: Offset index of the input (defaults to
+            ``index_path_for_output(output_path)``, never next to the input).
+    """
+
+    def __init__(self, input_path, output_path, bind="127.0.0.1", port=DEFAULT_PORT, shard_size=32,
+                 lease_ttl=30.0, min_steal=2, checkpoint_every=16, restart=False, index_path=None,
+                 record_timeout=300.0):
+        from bloom_batch import load_checkpoint
+        from jsonl_index import JsonlDataset
+
+        self.input_path = input_path
+        self.output_path = output_path
+        self.lease_ttl = lease_ttl
+        self.min_steal = min_steal
+        self.record_timeout = record_timeout
+        self.checkpoint_every = checkpoint_every
+        self.index_path = index_path or index_path_for_output(output_path)
+        self.dataset = JsonlDataset(input_path, self.index_path, decode=_decode, complete=True)
+        self.total = len(self.dataset)
+
+        state = None if restart else load_checkpoint(output_path, input_path)
+        self.resumed_from = state["completed"] if state else 0
+        if state:
+            self._out = open(output_path, "r+b")
+            self._out.truncate(state["offset"])
+            self._out.seek(state["offset"])
+        else:
+            self._out = open(output_path, "wb")
+
+        self.next_index = self.resumed_from
+        self._queue = deque(
+            list(range(start, min(start + shard_size, self.total)))
+            for start in range(self.resumed_from, self.total, shard_size)
+        )
+        self._leases = {}
+        self._owner = {}
+        self._buffer = {}
+        # Record index → speculative lease re-running it
+        self._speculated = {}
+        self._lease_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self.counts = {"leases": 0, "expired": 0, "stolen": 0, "speculated": 0, "duplicates": 0, "errors": 0}
+        self.started = time.perf_counter()
+        if self.next_index >= self.total:
+            self._finished.set()
+
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                worker = f"{self.client_address[0]}:{self.client_address[1]}"
+                try:
+                    for line in self.rfile:
+                        message = json.loads(line)
+                        if message.get("op") == "hello":
+                            worker = message.get("worker") or worker
+                        reply = coordinator.dispatch(worker, message)
+                        _send(self.wfile, reply)
+                        if reply["op"] == "done":
+                            break
+                except (BrokenPipeError, ConnectionResetError, ValueError):
+                    pass
+                finally:
+                    coordinator.release_worker(worker)
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((bind, port), Handler)
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="batch-coordinator", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until every record is written (expiring stale leases meanwhile)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._finished.wait(min(1.0, self.lease_ttl / 4)):
+            with self._lock:
+                self._expire()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            self._out.flush()
+            if self.next_index < self.total:
+                self._checkpoint()
+            self._out.close()
+        self.dataset.close()
+        from bloom_batch import checkpoint_path
+
+        if self.next_index >= self.total:
+            for path in (checkpoint_path(self.output_path), self.index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # 📨 Protocol
+    def dispatch(self, worker, message):
+        op = message.get("op")
+        with self._lock:
+            self._expire()
+            if op == "hello":
+                return {"op": "welcome", "heartbeat": self.lease_ttl / 3}
+            if op == "lease":
+                return self._grant(worker)
+            lease = self._leases.get(message.get("lease"))
+            if op == "result":
+                self._accept(message["result"], message.get("lease"))
+                return self._ack(lease)
+            if op == "heartbeat":
+                if lease is None:
+                    return {"op": "lost"}
+                return self._ack(lease)
+            if op == "complete":
+                if lease is not None:
+                    self._requeue(lease)
+                return {"op": "ok"}
+        return {"op": "error", "error": f"unknown op {op!r}"}
+
+    def _ack(self, lease):
+        if lease is None:
+            return {"op": "ok", "revoked": []}
+        lease.expires = time.monotonic() + self.lease_ttl
+        if self.record_timeout is not None:
+            # Heartbeats keep a lease alive only while it keeps producing results
+            lease.expires = min(lease.expires, lease.progress + self.record_timeout)
+        revoked, lease.revoked = lease.revoked, []
+        return {"op": "ok", "revoked": revoked}
+
+    def _grant(self, worker):
+        if self.next_index >= self.total:
+            return {"op": "done"}
+        indices = None
+        while self._queue and not indices:
+            # Records written while the shard sat in the queue are dropped here
+            indices = [i for i in self._queue.popleft() if i >= self.next_index and i not in self._buffer]
+        if not indices:
+            indices = self._steal(worker)
+        speculative = False
+        if not indices:
+            indices = self._speculate(worker)
+            speculative = bool(indices)
+        if not indices:
+            return {"op": "wait", "retry": 0.5}
+        lease = Lease(next(self._lease_ids), worker, indices, self.lease_ttl, speculative)
+        self._leases[lease.id] = lease
+        if speculative:
+            # The original lease keeps ownership; whichever result arrives first wins
+            for i in indices:
+                self._speculated[i] = lease.id
+        else:
+            for i in indices:
+                self._owner[i] = lease.id
+        self.counts["leases"] += 1
+        return {"op": "lease", "lease": lease.id, "records": [[i, self.dataset[i]] for i in indices]}
+
+    def _steal(self, worker):
+        candidates = [lease for lease in self._leases.values()
+                      if lease.worker != worker and not lease.speculative
+                      and len(lease.remaining) >= 2 * self.min_steal]
+        if not candidates:
+            return None
+        victim = max(candidates, key=lambda lease: (lease.eta(), len(lease.remaining)))
+        cut = len(victim.remaining) // 2
+        stolen = victim.remaining[cut:]
+        del victim.remaining[cut:]
+        victim.revoked.extend(stolen)
+        self.counts["stolen"] += len(stolen)
+        return stolen
+
+    def _speculate(self, worker):
+        """Re-issue the unfinished records of the slowest other lease without revoking them.
+
+        Used once nothing is left to hand out or steal, so a tail of a few
+        records (or a worker stuck on one) cannot hold up the run.  Each
+        record has at most one live speculative copy.
+        """
+        def open_records(lease):
+            return [i for i in lease.remaining if self._speculated.get(i) not in self._leases]
+
+        candidates = [lease for lease in self._leases.values()
+                      if lease.worker != worker and not lease.speculative and open_records(lease)]
+        if not candidates:
+            return None
+        victim = max(candidates, key=lambda lease: (lease.eta(), time.monotonic() - lease.progress))
+        indices = open_records(victim)
+        self.counts["speculated"] += len(indices)
+        return indices
+
+    def _accept(self, result, lease_id):
+        index = result["index"]
+        if index < self.next_index or index in self._buffer:
+            self.counts["duplicates"] += 1
+            return
+        self._buffer[index] = result
+        self._owner.pop(index, None)
+        self._speculated.pop(index, None)
+        # The owning lease and any speculative copy both drop the record
+        for lease in [lease for lease in self._leases.values() if index in lease.remaining]:
+            lease.remaining.remove(index)
+            if lease.id == lease_id:
+                lease.finished += 1
+                lease.progress = time.monotonic()
+            else:
+                # Served elsewhere (a late, stolen or speculative copy): the holder can skip it
+                lease.revoked.append(index)
+            if not lease.remaining:
+                del self._leases[lease.id]
+        self._write_ready()
+
+    def _write_ready(self):
+        while self.next_index in self._buffer:
+            result = self._buffer.pop(self.next_index)
+            self._out.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+            if "error" in result:
+                self.counts["errors"] += 1
+            self.next_index += 1
+            if self.next_index % self.checkpoint_every == 0:
+                self._checkpoint()
+        if self.next_index >= self.total:
+            self._out.flush()
+            self._finished.set()
+
+    def _checkpoint(self):
+        from bloom_batch import write_checkpoint
+
+        self._out.flush()
+        write_checkpoint(self.output_path, self.input_path, self.next_index, self._out.tell())
+
+    def _requeue(self, lease):
+        """Drop ``lease`` and put its unfinished records back at the front of the queue."""
+        self._leases.pop(lease.id, None)
+        if lease.speculative:
+            return
+        left = [i for i in lease.remaining if self._owner.get(i) == lease.id]
+        for i in left:
+            del self._owner[i]
+        if left:
+            self._queue.appendleft(left)
+
+    def _expire(self):
+        now = time.monotonic()
+        for lease in [lease for lease in self._leases.values() if lease.expires < now]:
+            self.counts["expired"] += 1
+            self._requeue(lease)
+
+    def release_worker(self, worker):
+        """Requeue every lease held by ``worker`` (its connection closed)."""
+        with self._lock:
+            for lease in [lease for lease in self._leases.values() if lease.worker == worker]:
+                self._requeue(lease)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            written = self.next_index - self.resumed_from
+            return dict(
+                self.counts,
+                total=self.total,
+                written=written,
+                resumed_from=self.resumed_from,
+                active_leases=len(self._leases),
+                elapsed_s=round(elapsed, 3),
+                throughput_per_s=round(written / elapsed, 3) if elapsed > 0 else 0.0,
+            )
+
+
+# 🛠️ Worker
+def run_worker(address, concurrency=4, model_name="phi", host="http://localhost:11434", bloom_only=False,
+               include_manifest=False, memo=False, router=None, worker_id=None, process_fn=None):
+    """Pull leases from the coordinator at ``address`` ("host:port") until it reports done.
+
+    Returns the number of results sent.
+    """
+    if process_fn is None:
+        from bloom_batch import process_record as process_fn
+
+    coord_host, _, coord_port = address.rpartition(":")
+    sock = socket.create_connection((coord_host or "127.0.0.1", int(coord_port)))
+    stream = sock.makefile("rwb")
+    lock = threading.Lock()
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    sent = 0
+
+    def call(message):
+        with lock:
+            _send(stream, message)
+            line = stream.readline()
+        if not line:
+            raise ConnectionError("coordinator closed the connection")
+        return json.loads(line)
+
+    heartbeat = call({"op": "hello", "worker": worker_id})["heartbeat"]
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                reply = call({"op": "lease"})
+                if reply["op"] == "done":
+                    return sent
+                if reply["op"] == "wait":
+                    time.sleep(reply.get("retry", 0.5))
+                    continue
+                lease = reply["lease"]
+                todo = deque(reply["records"])
+                revoked = set()
+                lost = threading.Event()
+                stop = threading.Event()
+
+                def beat():
+                    while not stop.wait(heartbeat):
+                        try:
+                            answer = call({"op": "heartbeat", "lease": lease})
+                        except (OSError, ConnectionError):
+                            return
+                        if answer["op"] == "lost":
+                            lost.set()
+                        revoked.update(answer.get("revoked", ()))
+
+                beater = threading.Thread(target=beat, name=f"heartbeat-{lease}", daemon=True)
+                beater.start()
+                in_flight = set()
+                try:
+                    while todo or in_flight:
+                        # Keep at most ``concurrency`` records running so stolen ones can still be skipped
+                        while todo and len(in_flight) < concurrency and not lost.is_set():
+                            index, record = todo.popleft()
+                            if index in revoked:
+                                continue
+                            in_flight.add(pool.submit(process_fn, index, record, model_name, host, bloom_only,
+                                                      include_manifest, router=router, memo=memo))
+                        if not in_flight:
+                            break
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            answer = call({"op": "result", "lease": lease, "result": future.result()})
+                            sent += 1
+                            revoked.update(answer.get("revoked", ()))
+                finally:
+                    stop.set()
+                    beater.join()
+                call({"op": "complete", "lease": lease})
+    finally:
+        stream.close()
+        sock.close()
+
+
+def _local_worker(address, kwargs, admission_limit, max_queue):
+    from bloom_batch import configure_admission
+
+    configure_admission(kwargs.get("concurrency", 4), admission_limit, max_queue)
+    run_worker(address, **kwargs)
+
+
+def run_local(input_path, output_path, workers=2, shard_size=32, lease_ttl=30.0, restart=False, index_path=None,
+              record_timeout=300.0, admission_limit=None, max_queue=None, **worker_kwargs):
+    """Coordinator plus ``workers`` local worker processes; returns the coordinator stats.
+
+    ``admission_limit`` and ``max_queue`` size each worker's admission
+    scheduler (see ``bloom_batch.configure_admission``).
+    """
+    import multiprocessing
+
+    with Coordinator(input_path, output_path, port=0, shard_size=shard_size, lease_ttl=lease_ttl,
+                     restart=restart, index_path=index_path, record_timeout=record_timeout) as coordinator:
+        procs = [multiprocessing.Process(target=_local_worker, daemon=True,
+                                         args=(coordinator.address, worker_kwargs, admission_limit, max_queue))
+                 for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+        coordinator.wait()
+        for proc in procs:
+            proc.join(timeout=lease_ttl)
+    return coordinator.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribute bloom_batch over worker machines.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_output_args(p):
+        p.add_argument("input", help="JSONL file of prompts")
+        p.add_argument("-o", "--output", required=True)
+        p.add_argument("--shard-size", type=int, default=32)
+        p.add_argument("--lease-ttl", type=float, default=30.0)
+        p.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+        p.add_argument("--index", default=None, help="input offset index (default: <output>.input.idx)")
+        p.add_argument("--record-timeout", type=float, default=300.0,
+                       help="seconds a lease may go without a result before it is reassigned")
+
+    def add_worker_args(p):
+        p.add_argument("-c", "--concurrency", type=int, default=4)
+        p.add_argument("--model", default="phi")
+        p.add_argument("--host", default="http://localhost:11434")
+        p.add_argument("--bloom-only", action="store_true")
+        p.add_argument("--include-manifest", action="store_true")
+        p.add_argument("--memo", action="store_true")
+        p.add_argument("--admission-limit", type=int, default=None,
+                       help="concurrent LLM calls per host (default: --concurrency)")
+        p.add_argument("--max-queue", type=int, default=None, help="LLM calls allowed to wait for admission")
+
+    coord_p = sub.add_parser("coordinator", help="serve leases and merge results")
+    add_output_args(coord_p)
+    coord_p.add_argument("--bind", default="0.0.0.0")
+    coord_p.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    worker_p = sub.add_parser("worker", help="process leases from a coordinator")
+    worker_p.add_argument("address", help="coordinator host:port")
+    add_worker_args(worker_p)
+
+    local_p = sub.add_parser("local", help="coordinator plus local worker processes")
+    add_output_args(local_p)
+    local_p.add_argument("--workers", type=int, default=2)
+    add_worker_args(local_p)
+
+    args = parser.parse_args(argv)
+    if args.command == "worker":
+        from bloom_batch import configure_admission
+
+        configure_admission(args.concurrency, args.admission_limit, args.max_queue)
+        sent = run_worker(args.address, args.concurrency, args.model, args.host, args.bloom_only,
+                          args.include_manifest, args.memo)
+        print(f"[worker] ✅ sent {sent} results", file=sys.stderr)
+        return 0
+
+    if args.command == "local":
+        stats = run_local(args.input, args.output, args.workers, args.shard_size, args.lease_ttl, args.restart,
+                          args.index, args.record_timeout, args.admission_limit, args.max_queue,
+                          concurrency=args.concurrency, model_name=args.model, host=args.host,
+                          bloom_only=args.bloom_only, include_manifest=args.include_manifest, memo=args.memo)
+    else:
+        with Coordinator(args.input, args.output, args.bind, args.port, args.shard_size, args.lease_ttl,
+                         restart=args.restart, index_path=args.index,
+                         record_timeout=args.record_timeout) as coordinator:
+            print(f"[coordinator] 🧭 {coordinator.total} records on {coordinator.address}", file=sys.stderr)
+            try:
+                coordinator.wait()
+            except KeyboardInterrupt:
+                pass
+            stats = coordinator.stats()
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
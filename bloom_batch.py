@@ -0,0 +1,262 @@
+"""
+bloom_batch.py
+==============
+
+Batch runner that streams a JSONL file of prompts through the hemispheric
+bloom cycle and the Phi LLM inside one long-lived process.
+
+Each input line is either a bare JSON string or an object carrying the
+prompt under ``prompt`` / ``query`` (``dataset.jsonl``) or ``title`` and
+``body`` (``requests.jsonl``).  Prompts are processed by a thread pool,
+but results are written to the output JSONL strictly in input order as
+soon as the head of the queue completes, so memory stays bounded by the
+in-flight window rather than the size of the file.
+
+A checkpoint file (``<output>.ckpt``) records how many records have been
+written and the byte offset of the output at that point.  If a run
+crashes, re-running the same command truncates any partially written
+tail and resumes from the next record.  The checkpoint is removed once
+the run completes.
+
+Usage::
+
+    python bloom_batch.py dataset.jsonl -o results.jsonl --concurrency 8
+    python bloom_batch.py requests.jsonl -o manifests.jsonl --bloom-only
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from HARMONIC_AI_001 import generate_bloom_manifest, query_phi_coder
+from llm_adapter.metrics import latency_summary
+from llm_adapter import admission
+from llm_adapter.router import OllamaRouter
+
+PROMPT_KEYS = ("prompt", "query")
+
+
+def extract_prompt(record):
+    """Pull the prompt text out of one decoded JSONL record."""
+    if isinstance(record, str):
+        return record
+    if not isinstance(record, dict):
+        return None
+    for key in PROMPT_KEYS:
+        if record.get(key):
+            return str(record[key])
+    # requests.jsonl style entries: title + body
+    parts = [str(record[key]) for key in ("title", "body") if record.get(key)]
+    return "\n\n".join(parts) or None
+
+
+def record_id(record, index):
+    if isinstance(record, dict):
+        for key in ("request_id", "id"):
+            if key in record:
+                return record[key]
+    return index
+
+
+def iter_records(path, skip=0):
+    """Yield ``(index, record)`` for each non-blank line, skipping the first ``skip``."""
+    index = 0
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if index >= skip:
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {"_decode_error": str(e)}
+                yield index, record
+            index += 1
+
+
+def process_record(index, record, model_name, host, bloom_only=False, include_manifest=False, router=None,
+                   memo=False):
+    """Run one record through bloom (and optionally the LLM); never raises."""
+    started = time.perf_counter()
+    result = {"index": index, "id": record_id(record, index)}
+    prompt = extract_prompt(record)
+    if prompt is None:
+        decode_error = record.get("_decode_error") if isinstance(record, dict) else None
+        result["error"] = decode_error or "no prompt field"
+    else:
+        result["prompt"] = prompt
+        try:
+            manifest = generate_bloom_manifest(prompt, memo=memo)
+            result["harmonic_sync"] = manifest.get("harmonic_sync")
+            if include_manifest:
+                result["manifest"] = manifest
+            if not bloom_only:
+                result["response"] = query_phi_coder(manifest, model_name=model_name, host=host, router=router)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+    return result
+
+
+# 💾 Checkpointing
+def checkpoint_path(output_path):
+    return output_path + ".ckpt"
+
+
+def load_checkpoint(output_path, input_path):
+    path = checkpoint_path(output_path)
+    if not os.path.exists(path) or not os.path.exists(output_path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("input") != os.path.abspath(input_path):
+        return None
+    return state
+
+
+def write_checkpoint(output_path, input_path, completed, offset):
+    path = checkpoint_path(output_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"input": os.path.abspath(input_path), "completed": completed, "offset": offset}, f)
+    os.replace(tmp, path)
+
+
+# 🚀 Batch driver
+def configure_admission(concurrency, admission_limit=None, max_queue=None):
+    """Size the process-wide admission scheduler for ``concurrency`` records in flight.
+
+    ``admission_limit`` caps concurrent LLM calls per host (a router gets
+    it once per host) and defaults to ``concurrency``, so the scheduler
+    does not throttle calls the worker pool already bounds.
+    """
+    return admission.configure(default_limit=admission_limit or concurrency,
+                               max_queue=max_queue or max(64, concurrency))
+
+
+def run_batch(input_path, output_path, concurrency=4, model_name="phi", host="http://localhost:11434",
+              bloom_only=False, include_manifest=False, checkpoint_every=16, restart=False,
+              process_fn=process_record, router=None, memo=False):
+    """Stream ``input_path`` through ``process_fn`` and write ordered results.
+
+    Returns a stats dictionary with throughput and latency percentiles for
+    the records processed in this run (resumed records are not re-counted).
+    With ``memo``, bloom cycles are memoized and the memo's hit rate is
+    included in the stats.
+    """
+    state = None if restart else load_checkpoint(output_path, input_path)
+    completed = state["completed"] if state else 0
+
+    if state:
+        out = open(output_path, "r+b")
+        out.truncate(state["offset"])
+        out.seek(state["offset"])
+    else:
+        out = open(output_path, "wb")
+
+    latencies = []
+    errors = 0
+    window = max(1, concurrency * 2)
+    pending = deque()
+    started = time.perf_counter()
+
+    def drain_head():
+        nonlocal completed, errors
+        result = pending.popleft().result()
+        out.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+        latencies.append(result["latency_ms"])
+        if "error" in result:
+            errors += 1
+        completed += 1
+        if completed % checkpoint_every == 0:
+            out.flush()
+            write_checkpoint(output_path, input_path, completed, out.tell())
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for index, record in iter_records(input_path, skip=completed):
+                pending.append(pool.submit(process_fn, index, record, model_name, host,
+                                           bloom_only, include_manifest, router=router, memo=memo))
+                if len(pending) >= window:
+                    drain_head()
+            while pending:
+                drain_head()
+        out.flush()
+    finally:
+        if pending:
+            # Crashed or interrupted: persist what is safely on disk.
+            out.flush()
+            write_checkpoint(output_path, input_path, completed, out.tell())
+        out.close()
+
+    if os.path.exists(checkpoint_path(output_path)):
+        os.remove(checkpoint_path(output_path))
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "processed": len(latencies),
+        "errors": errors,
+        "resumed_from": state["completed"] if state else 0,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    stats.update(latency_summary(latencies))
+    if memo:
+        from data_core.bloom_memo import get_memo
+
+        stats["memo"] = get_memo().stats()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a JSONL of prompts through bloom and the Phi LLM.")
+    parser.add_argument("input", help="JSONL file of prompts (dataset.jsonl, requests.jsonl, ...)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to write ordered results to")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--model", default="phi")
+    parser.add_argument("--host", default="http://localhost:11434")
+    parser.add_argument("--hosts", nargs="+", help="several Ollama hosts to balance over (overrides --host)")
+    parser.add_argument("--hedge", action="store_true", help="hedge slow calls to a second host")
+    parser.add_argument("--bloom-only", action="store_true", help="only run the bloom cycle, skip the LLM")
+    parser.add_argument("--include-manifest", action="store_true", help="write the full bloom manifest per record")
+    parser.add_argument("--memo", action="store_true", help="memoize bloom cycles for repeated L4 vectors")
+    parser.add_argument("--checkpoint-every", type=int, default=16)
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    parser.add_argument("--admission-limit", type=int, default=None,
+                        help="concurrent LLM calls per host (default: --concurrency)")
+    parser.add_argument("--max-queue", type=int, default=None, help="LLM calls allowed to wait for admission")
+    args = parser.parse_args(argv)
+    router = OllamaRouter(args.hosts, hedge=args.hedge) if args.hosts else None
+    configure_admission(args.concurrency, args.admission_limit, args.max_queue)
+
+    stats = run_batch(
+        args.input, args.output,
+        concurrency=args.concurrency,
+        model_name=args.model,
+        host=args.host,
+        bloom_only=args.bloom_only,
+        include_manifest=args.include_manifest,
+        checkpoint_every=max(1, args.checkpoint_every),
+        restart=args.restart,
+        router=router,
+        memo=args.memo,
+    )
+
+    print("\n📊 Batch complete", file=sys.stderr)
+    print(f"  processed:  {stats['processed']} (resumed from {stats['resumed_from']}, errors {stats['errors']})", file=sys.stderr)
+    print(f"  throughput: {stats['throughput_per_s']} prompts/s over {stats['elapsed_s']}s", file=sys.stderr)
+    print(f"  latency ms: p50={stats['p50_ms']} p90={stats['p90_ms']} p95={stats['p95_ms']} "
+          f"p99={stats['p99_ms']} max={stats['max_ms']}", file=sys.stderr)
+    if "memo" in stats:
+        print(f"  bloom memo: {stats['memo']['hits']} hits, {stats['memo']['misses']} misses "
+              f"(hit rate {stats['memo']['hit_rate']})", file=sys.stderr)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+bloom_inference.py
+==================
+
+CPU-side inference helpers for the BLOOM half of the Phi ↔ BLOOM bridge.
+
+``PrefixKVCache``
+    Every manifest handed to BLOOM starts with the same header (and
+    usually the same system instructions).  Rather than re-encoding that
+    text and recomputing its attention on every call, the cache runs the
+    model over each registered prefix once, keeps the resulting
+    ``past_key_values``, and starts generation for any input sharing that
+    prefix from the cached state.  Entries are evicted least-recently-used
+    once their tensors exceed a memory budget; evicted prefixes stay
+    registered and are recomputed on their next use.
+
+CPU inference modes (``load_cpu_model``)
+    ``fp32``  – plain ``from_pretrained``; every process holds a private
+                copy of the weights.
+    ``mmap``  – weights are mapped straight from the model's
+                ``.safetensors`` files (copy-on-write), so forked worker
+                processes share the same physical pages.
+    ``int8``  – ``mmap`` plus dynamic int8 quantization of every
+                ``nn.Linear``; linear weights become private but ~4×
+                smaller, embeddings and norms stay shared.
+    Each mode can pin the number of intra-op threads per worker.
+
+Run ``python bloom_inference.py bench`` to measure the latency, memory
+and accuracy trade-off of each mode against the fp32 path.
+
+torch and transformers are imported lazily, so this module can be
+imported (and ``BloomModelInterface`` configured) without them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _tensors(obj: Any):
+    """Yield every tensor inside a (possibly nested) ``past_key_values``."""
+    if hasattr(obj, "to_legacy_cache"):
+        obj = obj.to_legacy_cache()
+    if isinstance(obj, (tuple, list)):
+        for item in obj:
+            yield from _tensors(item)
+    elif hasattr(obj, "element_size") and hasattr(obj, "numel"):
+        yield obj
+
+
+def past_nbytes(past: Any) -> int:
+    """Memory held by the tensors of a ``past_key_values`` object."""
+    return sum(t.numel() * t.element_size() for t in _tensors(past))
+
+
+@dataclass
+class _PrefixEntry:
+    input_ids: Any
+    past: Any
+    nbytes: int
+
+
+class PrefixKVCache:
+    """LRU cache of ``past_key_values`` for registered prompt prefixes.
+
+    Args:
+        model: A causal LM (e.g. ``BloomForCausalLM``).
+        tokenizer: Its tokenizer.
+        max_bytes: Memory budget for cached key/value tensors.
+    """
+
+    def __init__(self, model: Any, tokenizer: Any, max_bytes: int = 256 * 2**20):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._registered: List[str] = []
+        self._entries: "OrderedDict[str, _PrefixEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    # 📌 Registration and lookup
+    def register(self, prefix: str) -> None:
+        """Register ``prefix`` and compute its key/value state now."""
+        if not prefix:
+            return
+        with self._lock:
+            if prefix not in self._registered:
+                self._registered.append(prefix)
+                # Longest first so lookups find the most specific match
+                self._registered.sort(key=len, reverse=True)
+        self._entry(prefix)
+
+    def match(self, text: str) -> Optional[str]:
+        """Longest registered prefix of ``text``, if any (by characters; see ``prepare``)."""
+        for prefix in list(self._registered):
+            if text.startswith(prefix) and len(text) > len(prefix):
+                return prefix
+        return None
+
+    def _entry(self, prefix: str) -> _PrefixEntry:
+        with self._lock:
+            entry = self._entries.get(prefix)
+            if entry is not None:
+                self._entries.move_to_end(prefix)
+                return entry
+
+        import torch  # type: ignore
+
+        input_ids = self._encode(prefix)
+        with torch.no_grad():
+            past = self.model(input_ids=input_ids, use_cache=True).past_key_values
+        entry = _PrefixEntry(input_ids, past, past_nbytes(past))
+
+        with self._lock:
+            if prefix not in self._entries:
+                self._entries[prefix] = entry
+                self._bytes += entry.nbytes
+            self._entries.move_to_end(prefix)
+            self._evict_locked(keep=prefix)
+            return self._entries.get(prefix, entry)
+
+    def _evict_locked(self, keep: str) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            victim = next(iter(self._entries))
+            if victim == keep:
+                self._entries.move_to_end(victim)
+                victim = next(iter(self._entries))
+            self._bytes -= self._entries.pop(victim).nbytes
+
+    def _encode(self, text: str) -> Any:
+        return self.tokenizer(text, return_tensors="pt", add_special_tokens=False)["input_ids"]
+
+    # 🚀 Generation
+    def prepare(self, text: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Build ``model.generate`` keyword arguments for ``text``.
+
+        ``text`` is encoded in one piece, exactly as without the cache.  When
+        its token ids start with a registered prefix's ids (and continue
+        past them), a private copy of the prefix's ``past_key_values`` is
+        included so only the remaining tokens are run through the model.
+        A prefix whose last token merges with the text after it (BPE at the
+        boundary) does not match, so cached and uncached inputs are always
+        the same token sequence.
+        """
+        import torch  # type: ignore
+
+        input_ids = self._encode(text)
+        entry = None
+        prefix = self.match(text)
+        while prefix is not None:
+            candidate = self._entry(prefix)
+            n = candidate.input_ids.shape[-1]
+            if input_ids.shape[-1] > n and torch.equal(input_ids[..., :n], candidate.input_ids):
+                entry = candidate
+                break
+            # Tokenised differently at the boundary: try the next shorter prefix
+            prefix = next((p for p in list(self._registered)
+                           if len(p) < len(prefix) and text.startswith(p) and len(text) > len(p)), None)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}, None
+
+        # Cache objects are extended in place during generation; give each
+        # call its own copy so the cached prefix state stays pristine.
+        past = copy.deepcopy(entry.past) if hasattr(entry.past, "to_legacy_cache") else entry.past
+        return {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+            "past_key_values": past,
+        }, prefix
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "registered": len(self._registered),
+                "cached": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# 🧮 CPU inference modes
+INFERENCE_MODES = ("fp32", "mmap", "int8")
+
+_SAFETENSORS_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+
+
+def set_worker_threads(num_threads: Optional[int]) -> None:
+    """Pin torch's intra-op thread pool for this worker process."""
+    if not num_threads:
+        return
+    import torch  # type: ignore
+
+    torch.set_num_threads(num_threads)
+
+
+def _safetensors_files(model_name: str) -> List[str]:
+    if os.path.isdir(model_name):
+        root = model_name
+    else:
+        from huggingface_hub import snapshot_download  # type: ignore
+
+        root = snapshot_download(model_name, allow_patterns=["*.safetensors", "*.json"])
+    files = sorted(glob.glob(os.path.join(root, "*.safetensors")))
+    if not files:
+        raise RuntimeError(f"No .safetensors weights found for {model_name!r}")
+    return files
+
+
+def mmap_safetensors(path: str) -> Dict[str, Any]:
+    """Map a ``.safetensors`` file and return zero-copy tensors over it.
+
+    The file is mapped copy-on-write: pages are shared between every
+    process that maps it (including forked workers) until one of them
+    writes to a tensor.
+    """
+    import torch  # type: ignore
+
+    with open(path, "rb") as f:
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    base = 8 + header_len
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = getattr(torch, _SAFETENSORS_DTYPES[info["dtype"]])
+        start, end = info["data_offsets"]
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        flat = torch.frombuffer(mapped, dtype=dtype, count=count, offset=base + start) if count else torch.empty(0, dtype=dtype)
+        tensors[name] = flat.view(info["shape"])
+    return tensors
+
+
+def load_mmap_model(model_name: str) -> Any:
+    """Build the model without allocating weights, then bind mmap'd tensors."""
+    import torch  # type: ignore
+    from transformers import AutoConfig, AutoModelForCausalLM  # type: ignore
+
+    config = AutoConfig.from_pretrained(model_name)
+    with torch.device("meta"):
+        model = AutoModelForCausalLM.from_config(config)
+
+    expected = model.state_dict().keys()
+    state = {}
+    for path in _safetensors_files(model_name):
+        for name, tensor in mmap_safetensors(path).items():
+            # Base-model checkpoints (e.g. bloom-560m) omit the "transformer." prefix
+            key = name if name in expected else f"{model.base_model_prefix}.{name}"
+            state[key] = tensor
+    model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [n for n, p in model.named_parameters() if p.device.type == "meta"]
+    if missing:
+        raise RuntimeError(f"Weights missing from checkpoint: {', '.join(missing[:5])}")
+    return model.eval()
+
+
+def quantize_int8(model: Any) -> Any:
+    """Dynamic int8 quantization of every ``nn.Linear`` (weights int8, activations fp32).
+
+    Quantizes ``model`` in place: a copy would duplicate the mmap'd
+    embeddings and norms into private memory, which is what ``int8``
+    mode exists to avoid.
+    """
+    import torch  # type: ignore
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_cpu_model(model_name: str, mode: str = "fp32", num_threads: Optional[int] = None) -> Tuple[Any, Any]:
+    """Load ``(model, tokenizer)`` for CPU inference in one of ``INFERENCE_MODES``."""
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode {mode!r}; expected one of {INFERENCE_MODES}")
+    from transformers import AutoTokenizer, AutoModelForCausalLM  # type: ignore
+
+    set_worker_threads(num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if mode == "fp32":
+        model = AutoModelForCausalLM.from_pretrained(model_name).eval()
+    else:
+        model = load_mmap_model(model_name)
+        if mode == "int8":
+            model = quantize_int8(model)
+    return model, tokenizer
+
+
+# 📊 Benchmark
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _load_prompts(path: Optional[str], limit: int) -> List[str]:
+    if not path:
+        return ["🧬 Bloom Manifest · sync=0.867\n- [high] exec::Φ (root) conf=1.8\n- [high] exec::Ψ (branch) conf=0.8"]
+    prompts = []
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                prompts.append(record.get("prompt") or record.get("body") or str(record))
+            if len(prompts) >= limit:
+                break
+    return prompts
+
+
+def benchmark(model_name: str, modes=INFERENCE_MODES, prompts=(), max_new_tokens: int = 32,
+              runs: int = 3, num_threads: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Compare each inference mode's latency, memory and accuracy to fp32.
+
+    Accuracy is measured on the prompts themselves: ``top1_agreement`` is
+    the fraction of positions whose arg-max next token matches fp32,
+    ``max_logit_diff`` the largest absolute logit difference, and
+    ``greedy_match`` the fraction of prompts whose greedy continuation is
+    identical to fp32's.
+    """
+    import torch  # type: ignore
+    from llm_adapter.metrics import latency_summary
+
+    reference = None
+    report = {}
+    for mode in ("fp32",) + tuple(m for m in modes if m != "fp32"):
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model, tokenizer = load_cpu_model(model_name, mode, num_threads)
+        load_s = time.perf_counter() - started
+        rss_after = _rss_bytes()
+
+        logits, greedy, latencies = [], [], []
+        for prompt in prompts:
+            ids = tokenizer(prompt, return_tensors="pt")["input_ids"]
+            with torch.no_grad():
+                logits.append(model(input_ids=ids).logits[0].float())
+                for _ in range(runs):
+                    t0 = time.perf_counter()
+                    out = model.generate(ids, max_new_tokens=max_new_tokens, do_sample=False)
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+            greedy.append(out[0, ids.shape[1]:].tolist())
+
+        entry = {"load_s": round(load_s, 3), "rss_delta_mb": round((rss_after - rss_before) / 2**20, 1)}
+        entry.update(latency_summary(latencies))
+        if reference is None:
+            reference = (logits, greedy)
+        else:
+            ref_logits, ref_greedy = reference
+            agree = sum(int((a.argmax(-1) == b.argmax(-1)).sum()) for a, b in zip(logits, ref_logits))
+            positions = sum(a.shape[0] for a in logits)
+            entry["top1_agreement"] = round(agree / positions, 4) if positions else 0.0
+            entry["max_logit_diff"] = round(max(float((a - b).abs().max()) for a, b in zip(logits, ref_logits)), 4)
+            entry["greedy_match"] = round(sum(a == b for a, b in zip(greedy, ref_greedy)) / (len(greedy) or 1), 4)
+        if mode in modes:
+            report[mode] = entry
+        del model
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU inference helpers for BLOOM.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_p = sub.add_parser("bench", help="compare inference modes against fp32")
+    bench_p.add_argument("--model", default="bigscience/bloom-560m")
+    bench_p.add_argument("--modes", nargs="+", choices=INFERENCE_MODES, default=list(INFERENCE_MODES))
+    bench_p.add_argument("--prompts", help="JSONL of prompts (dataset.jsonl style)")
+    bench_p.add_argument("--limit", type=int, default=8, help="prompts to use from --prompts")
+    bench_p.add_argument("--max-new-tokens", type=int, default=32)
+    bench_p.add_argument("--runs", type=int, default=3)
+    bench_p.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    report = benchmark(
+        args.model, tuple(args.modes), _load_prompts(args.prompts, args.limit),
+        max_new_tokens=args.max_new_tokens, runs=args.runs, num_threads=args.threads,
+    )
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
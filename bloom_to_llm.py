@@ -1,27 +1,71 @@
 import subprocess
 import json
-from datetime import datetime
-from data_core.hemispheric_bloom import hemispheric_bloom_cycle, RecursionPacket
+from data_core.bloom_memo import memoized_bloom_cycle
+from data_core.hemispheric_bloom import RecursionPacket
+from llm_adapter import manifest_render
+from llm_adapter.admission import backend_for, get_scheduler
+from llm_adapter.sessions import SessionStore, manifest_delta, session_generate
+from llm_adapter.telemetry import get_telemetry
+
+LLM_MODEL = "phi-coder-llm"
+# Prompt tokens allowed for the manifest (the model runs with num_ctx 8192)
+TOKEN_BUDGET = manifest_render.DEFAULT_TOKEN_BUDGET
 
 session_memory = []
+# Ollama context per REPL session, so each turn reuses the server's KV cache
+llm_sessions = SessionStore()
+
+def manifest_lines(manifest, token_budget=TOKEN_BUDGET):
+    # Deduplicated, ranked directive lines (linear and recursive); the header
+    # comes out of the same budget, all counted with LLM_MODEL's tokenizer
+    count_tokens = manifest_render.token_counter(LLM_MODEL)
+    budget = manifest_render.body_budget(manifest_render.manifest_header(manifest), token_budget, count_tokens)
+    return manifest_render.manifest_lines(manifest, budget, count_tokens=count_tokens)
 
-def format_bloom_manifest(manifest):
-    header = f"\n🧬 Bloom Manifest – {datetime.now().isoformat()}"
-    lines = []
-    for d in manifest.get("linear_directives", []):
-        line = f"- [{d['priority']}] {d['action']} ({d['tag']} @ {d['path']}) | confidence: {d['confidence']}"
-        lines.append(line)
-    return header + "\n".join(lines)
-
-def call_llm(prompt):
-    result = subprocess.run(
-        ["ollama", "run", "phi-coder-llm"],
-        input=prompt.encode('utf-8'),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
+def format_bloom_manifest(manifest, lines=None):
+    header = manifest_render.manifest_header(manifest)
+    if lines is None:
+        lines = manifest_lines(manifest)
+    return "\n".join([header] + list(lines))
+
+def call_llm(prompt, priority="normal", deadline=None):
+    with get_scheduler().admit("ollama-cli", priority, deadline) as ticket, \
+            get_telemetry().track(LLM_MODEL, "cli", "cli", ticket.queue_wait):
+        result = subprocess.run(
+            ["ollama", "run", LLM_MODEL],
+            input=prompt.encode('utf-8'),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
     return result.stdout.decode('utf-8')
 
+def session_turn_prompt(manifest, session_id="repl"):
+    """Build this turn's prompt: the full manifest first, then only new directives."""
+    session = llm_sessions.get(session_id)
+    lines = manifest_lines(manifest)
+    if not session.context:
+        return format_bloom_manifest(manifest, lines), lines
+    delta = manifest_delta(session.sent_lines, lines)
+    return format_bloom_manifest(manifest, delta or ["(no new directives)"]), lines
+
+def call_llm_session(prompt, lines=(), session_id="repl", priority="normal", deadline=None):
+    """Send one turn through the Ollama API, carrying the session's context.
+
+    Falls back to the stateless ``ollama run`` subprocess when the Ollama
+    Python library is not installed.
+    """
+    from HARMONIC_AI_001 import get_ollama_client
+
+    try:
+        client = get_ollama_client()
+    except RuntimeError:
+        return call_llm(prompt, priority, deadline)
+    session = llm_sessions.get(session_id)
+    with get_scheduler().admit(backend_for(), priority, deadline) as ticket, \
+            get_telemetry().track(LLM_MODEL, "http://localhost:11434", "generate", ticket.queue_wait) as call:
+        return session_generate(client, LLM_MODEL, session, llm_sessions, prompt, lines=lines,
+                                observe=call.response)
+
 def run_interactive_loop():
     print("🧠 ΛΩΞΨ LLM INTERFACE (type 'exit' to quit)\n")
 
@@ -36,13 +80,13 @@ def run_interactive_loop():
             {"symbol": "Ψ", "entropy_resolution": "collapse", "depth": 1, "memory_tag": "branch"},
         ]
 
-        result = hemispheric_bloom_cycle(packet)
+        result = memoized_bloom_cycle(packet)
         session_memory.append(result.annotations)
 
-        bloom_prompt = format_bloom_manifest(result.annotations["bloom_manifest"])
+        bloom_prompt, lines = session_turn_prompt(result.annotations["bloom_manifest"])
         print("\n📡 SENDING TO LLM:\n", bloom_prompt)
 
-        llm_output = call_llm(bloom_prompt)
+        llm_output = call_llm_session(bloom_prompt, lines)
         print("\n🧠 LLM RESPONSE:\n", llm_output)
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+"""
+check_import_time.py
+====================
+
+Cold-import budget check for the PHI-CODER entry points.
+
+Each entry point is imported in a fresh interpreter with ``-X importtime``
+and its cumulative import time is compared against a budget.  The check
+also fails if an entry point eagerly imports a module that is meant to
+load lazily (bloom nodes, the Ollama client, transformers/torch).
+
+The best of several runs is used so a noisy machine does not cause false
+failures.  Exits non-zero on any regression, so it can gate CI::
+
+    python check_import_time.py
+    python check_import_time.py --runs 5 --scale 2.0
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Entry point → cumulative cold-import budget in milliseconds
+BUDGETS_MS = {
+    "data_core.hemispheric_bloom": 40,
+    "HARMONIC_AI_001": 40,
+    "bloom_to_llm": 80,
+    "phi_bloom_bridge": 80,
+    "bloom_batch": 100,
+    "harmonic_daemon": 80,
+}
+
+# Modules that must only be imported on first use
+LAZY_PREFIXES = (
+    "data_core.cluster_layer_5_8.node_",
+    "data_core.layer_9",
+    "ollama",
+    "transformers",
+    "torch",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module):
+    """Return ``(cumulative_ms, imported_module_names)`` for one cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    cumulative_us = None
+    imported = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name = match.group(3)
+        imported.append(name)
+        if name == module:
+            cumulative_us = int(match.group(2))
+    if cumulative_us is None:
+        raise RuntimeError(f"no import-time line for {module}")
+    return cumulative_us / 1000.0, imported
+
+
+def check(runs=3, scale=1.0):
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        best_ms, imported = min(measure(module) for _ in range(runs))
+        limit = budget * scale
+        eager = sorted({name for name in imported if name.startswith(LAZY_PREFIXES)})
+        status = "ok" if best_ms <= limit and not eager else "FAIL"
+        print(f"{status:4} {module:30} {best_ms:8.1f} ms (budget {limit:.0f} ms)")
+        if best_ms > limit:
+            failures.append(f"{module}: {best_ms:.1f} ms exceeds {limit:.0f} ms")
+        if eager:
+            failures.append(f"{module}: eagerly imports {', '.join(eager)}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if cold import of the entry points regresses.")
+    parser.add_argument("--runs", type=int, default=3, help="best-of-N runs per entry point")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI boxes)")
+    args = parser.parse_args(argv)
+
+    failures = check(runs=max(1, args.runs), scale=args.scale)
+    for failure in failures:
+        print("✗", failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+ΞΛΩ – Annotation Map
+Structurally shared packet annotations
+
+``AnnotationMap`` is a chain of overlay dicts.  Writes go to the map's
+own top layer; reads fall through to the shared layers underneath.
+
+- ``fork()`` is O(1): the current top layer is frozen and shared, and
+  both the original and the fork continue on fresh empty layers, so
+  neither sees the other's later writes.
+- ``evolve(...)`` returns a fork with some entries replaced — the
+  persistent-style API for new code.
+- Existing nodes keep working unchanged: the map is a ``MutableMapping``,
+  so ``annotations[key] = value``, ``.get``, ``in``, ``setdefault`` and
+  ``update`` all behave like a dict (the migration shim).
+- Reading a list/dict/set that lives in a shared layer copies it
+  (shallowly) into the top layer first, so in-place updates such as
+  ``annotations["trace"].append(...)`` or
+  ``annotations["llm_directives"][name] = ...`` never leak into other
+  forks.  Objects nested deeper than one level are still shared; replace
+  them rather than mutating them.
+- Chains longer than ``COMPACT_DEPTH`` are flattened on the next fork.
+"""
+
+from collections.abc import MutableMapping
+
+COMPACT_DEPTH = 16
+_MUTABLE = (dict, list, set)
+
+
+class _Deleted:
+    """Tombstone for keys deleted in a fork; a singleton across copies and pickles."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<deleted>"
+
+    def __reduce__(self):
+        return "_DELETED"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_DELETED = _Deleted()
+_MISSING = object()
+
+
+class _Frame:
+    """A frozen, shared layer and the frames beneath it."""
+
+    __slots__ = ("layer", "parent", "depth")
+
+    def __init__(self, layer, parent):
+        self.layer = layer
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 1
+
+
+class AnnotationMap(MutableMapping):
+    """Dict-like packet annotations with O(1) forks."""
+
+    __slots__ = ("_layer", "_parent")
+
+    def __init__(self, data=None):
+        self._layer = dict(data) if data else {}
+        self._parent = None
+
+    # 🔎 Lookup
+    def _lookup(self, key):
+        value = self._layer.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        frame = self._parent
+        while frame is not None:
+            value = frame.layer.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            frame = frame.parent
+        return _MISSING
+
+    def __getitem__(self, key):
+        if key in self._layer:
+            value = self._layer[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        value = self._lookup(key)
+        if value is _MISSING or value is _DELETED:
+            raise KeyError(key)
+        if isinstance(value, _MUTABLE):
+            # Copy-on-access: in-place edits must not reach shared layers
+            value = self._layer[key] = value.copy()
+        return value
+
+    def __contains__(self, key):
+        value = self._lookup(key)
+        return value is not _MISSING and value is not _DELETED
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    # ✍️ Writes (always into the top layer)
+    def __setitem__(self, key, value):
+        self._layer[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if self._parent is None:
+            del self._layer[key]
+        else:
+            self._layer[key] = _DELETED
+
+    # 🔁 Iteration (base layer first, so order matches a dict built the same way)
+    def _frames(self):
+        layers = [self._layer]
+        frame = self._parent
+        while frame is not None:
+            layers.append(frame.layer)
+            frame = frame.parent
+        return reversed(layers)
+
+    def _flatten(self):
+        merged = {}
+        for layer in self._frames():
+            for key, value in layer.items():
+                if value is _DELETED:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+        return merged
+
+    def __iter__(self):
+        return iter(self._flatten())
+
+    def __len__(self):
+        return len(self._flatten())
+
+    def __repr__(self):
+        return f"AnnotationMap({self._flatten()!r})"
+
+    # 🌿 Persistence
+    def fork(self):
+        """Return an independent copy in O(1) (amortised; see ``COMPACT_DEPTH``)."""
+        if self._layer or self._parent is None:
+            parent = _Frame(self._layer, self._parent)
+            if parent.depth > COMPACT_DEPTH:
+                parent = _Frame(self._flatten(), None)
+            self._parent = parent
+            self._layer = {}
+        child = AnnotationMap.__new__(AnnotationMap)
+        child._layer = {}
+        child._parent = self._parent
+        return child
+
+    def evolve(self, changes=None, **kwargs):
+        """A fork with ``changes`` (and ``kwargs``) applied; ``self`` is unchanged."""
+        child = self.fork()
+        if changes:
+            child._layer.update(changes)
+        child._layer.update(kwargs)
+        return child
+
+    def to_dict(self):
+        """A plain dict snapshot (values are shared, not copied)."""
+        return self._flatten()
+
+    @property
+    def depth(self):
+        """Number of shared frames under the top layer."""
+        return self._parent.depth if self._parent is not None else 0
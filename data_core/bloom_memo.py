@@ -0,0 +1,161 @@
+"""
+ΞΛΩ – Bloom Memo
+Memoized hemispheric bloom cycle
+
+Nodes 5–8 are a pure function of the packet's ``L4_logic_vector`` and
+the node code/configuration — only ``Node8Core``'s ``timestamp`` differs
+between runs.  ``BloomMemo`` keeps a bounded LRU of the annotations the
+cycle writes, keyed on a canonical hash of the L4 vector plus a
+fingerprint of the registered nodes, and replays them onto new packets:
+
+* every hit gets fresh deep copies (callers may mutate them freely) and
+  a new manifest ``timestamp``;
+* vectors that cannot be canonicalised (non-JSON values) bypass the memo;
+* ``stats()`` reports hits, misses and hit rate.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from data_core import node_registry
+from data_core.hemispheric_bloom import BLOOM_SEQUENCE, hemispheric_bloom_cycle
+
+# Annotations written by nodes 5–8; everything else on the packet is left alone
+BLOOM_OUTPUT_KEYS = (
+    "L5_execution_vector", "R5_execution_vector",
+    "L6_tuned_vector", "R6_branch_vector",
+    "L7_directives", "R7_recursive_directives",
+    "bloom_manifest",
+)
+
+
+def canonical_key(logic_vector, fingerprint=""):
+    """SHA-256 of the L4 vector (key order ignored) and the node fingerprint."""
+    blob = json.dumps(logic_vector, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{fingerprint}\n{blob}".encode("utf-8")).hexdigest()
+
+
+def node_fingerprint(sequence=BLOOM_SEQUENCE):
+    """Hash of the node classes in ``sequence``: target, source and default config.
+
+    Changing a node's code or its tables (e.g. ``symbol_weights``)
+    changes the fingerprint and so invalidates memoized manifests.
+    """
+    import inspect
+
+    digest = hashlib.sha256()
+    bus = node_registry.get("cluster_bus")(verbose=False)
+    for name in sequence:
+        cls = node_registry.get(name)
+        digest.update(f"{name}={cls.__module__}:{cls.__qualname__}\n".encode("utf-8"))
+        try:
+            digest.update(inspect.getsource(cls).encode("utf-8"))
+        except (OSError, TypeError):
+            pass
+        config = {k: v for k, v in vars(cls(bus)).items() if k != "bus"}
+        digest.update(json.dumps(config, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BloomMemo:
+    """Bounded LRU memo for ``hemispheric_bloom_cycle``.
+
+    Args:
+        maxsize: Distinct L4 vectors kept.
+        cycle: The cycle to memoize.
+    """
+
+    def __init__(self, maxsize=256, cycle=hemispheric_bloom_cycle):
+        self.maxsize = maxsize
+        self._cycle = cycle
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = node_fingerprint()
+        return self._fingerprint
+
+    def cycle(self, packet):
+        """Run (or replay) the bloom cycle on ``packet``; returns the packet."""
+        try:
+            key = canonical_key(packet.annotations.get("L4_logic_vector", []), self.fingerprint)
+        except (TypeError, ValueError):
+            with self._lock:
+                self.bypassed += 1
+            return self._cycle(packet)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            # Store deep copies so the entry never aliases the caller's packet
+            packet = self._cycle(packet)
+            entry = copy.deepcopy({
+                "outputs": {k: packet.annotations[k] for k in BLOOM_OUTPUT_KEYS if k in packet.annotations},
+                "llm_directives": {k: v for k, v in packet.annotations.get("llm_directives", {}).items()
+                                   if k in BLOOM_SEQUENCE},
+            })
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            return packet
+
+        outputs = copy.deepcopy(entry["outputs"])
+        if "bloom_manifest" in outputs:
+            outputs["bloom_manifest"]["timestamp"] = time.time()
+        packet.annotations.update(outputs)
+        packet.annotations.setdefault("llm_directives", {}).update(copy.deepcopy(entry["llm_directives"]))
+        return packet
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        """Drop every entry and recompute the node fingerprint on next use."""
+        with self._lock:
+            self._entries.clear()
+            self._fingerprint = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_memo():
+    """The process-wide memo shared by the REPLs, HARMONIC and the batch runner."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BloomMemo()
+        return _default
+
+
+def memoized_bloom_cycle(packet):
+    """Drop-in replacement for ``hemispheric_bloom_cycle`` using the shared memo."""
+    return get_memo().cycle(packet)
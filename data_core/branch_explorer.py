@@ -0,0 +1,223 @@
+"""
+ΞΛΩ – Branch Explorer
+Speculative exploration of branch / defer paths
+
+Node 5R–7R turn ``branch`` and ``defer`` nodes of the L4 vector into
+recursive directives, but nothing follows them.  ``BranchExplorer``
+does: for each recursive directive it forks the logic vector with that
+node resolved (``collapse``), runs the bloom cycle on the fork in a
+worker pool, and keeps expanding the surviving forks breadth-first.
+
+Forks are pruned when
+- the directive's ``viability`` is below ``min_viability`` or its
+  ``loop_risk`` is above ``max_loop_risk`` (before running), or
+- the fork's ``harmonic_sync`` falls more than ``sync_tolerance`` (a
+  fraction) below its parent's (after running) — resolving a branch
+  always trades some viability for confidence, so small drops are kept.
+
+Exploration stops at ``max_depth``, after ``max_forks`` forks or when
+``time_budget`` runs out, whichever comes first.  Forks still running at
+the deadline stop at their next bloom node (``ForkTimeout``) rather than
+finishing in the background.  Survivors are merged into the manifest
+under ``explored_branches``, best first, with the run summary under
+``exploration``.
+
+This is a library API (also exported by ``data_core.cortex_entry``); no
+script runs it yet.
+
+    packet = BranchExplorer(max_workers=8, time_budget=0.5).explore(packet)
+    packet.annotations["bloom_manifest"]["explored_branches"]
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from data_core import node_registry
+from data_core.hemispheric_bloom import BLOOM_SEQUENCE, RecursionPacket, hemispheric_bloom_cycle
+
+UNRESOLVED = ("branch", "defer")
+
+
+class ForkTimeout(Exception):
+    """A fork reached the exploration deadline before its bloom cycle finished."""
+
+
+def fork_vector(vector, index):
+    """Copy ``vector`` with its ``index``-th branch/defer node resolved to ``collapse``.
+
+    ``index`` counts unresolved nodes only, matching the ``rdir_<index>``
+    paths assigned by Node 7R.  Node dicts are copied, never mutated.
+    """
+    forked, seen = [], 0
+    for node in vector:
+        node = dict(node)
+        if node.get("entropy_resolution") in UNRESOLVED:
+            if seen == index:
+                node["explored_from"] = node["entropy_resolution"]
+                node["entropy_resolution"] = "collapse"
+            seen += 1
+        forked.append(node)
+    return forked
+
+
+def bloom_vector(fork, memo=False, deadline=None):
+    """Run the bloom cycle on ``fork``; returns the manifest.
+
+    ``fork`` is a forked packet (thread pools) or a bare logic vector
+    (process pools, which get a fresh packet).  ``deadline`` is a
+    ``time.time()`` value (comparable across processes) checked before
+    every bloom node; past it the fork raises ``ForkTimeout``.
+    Module-level so process pools can pickle it.
+    """
+    if isinstance(fork, list):
+        packet = RecursionPacket("")
+        packet.annotations["L4_logic_vector"] = fork
+    else:
+        packet = fork
+
+    def check_deadline():
+        if deadline is not None and time.time() >= deadline:
+            raise ForkTimeout("exploration deadline passed")
+
+    if memo:
+        from data_core.bloom_memo import memoized_bloom_cycle
+
+        check_deadline()
+        packet = memoized_bloom_cycle(packet)
+    else:
+        # hemispheric_bloom_cycle, with a deadline check between nodes
+        bus = node_registry.get("cluster_bus")(verbose=True)
+        for name in BLOOM_SEQUENCE:
+            check_deadline()
+            packet = node_registry.get(name)(bus).process(packet)
+    return packet.annotations["bloom_manifest"]
+
+
+class BranchExplorer:
+    """Explore branch/defer directives concurrently under a time and width budget.
+
+    Args:
+        max_workers: Pool size.
+        processes: Use a process pool (true parallelism for the pure-Python
+            nodes) instead of threads.
+        max_depth: Levels of nested forks to expand.
+        max_forks: Total forks run across all levels (the width budget).
+        time_budget: Seconds for the whole exploration.
+        min_viability, max_loop_risk: Directive thresholds for pruning.
+        sync_tolerance: Allowed relative drop of a fork's ``harmonic_sync``
+            below its parent's before the fork is pruned.
+        memo: Run forks through ``data_core.bloom_memo``.
+
+    With threads, each fork is ``packet.fork()`` — an O(1) structurally
+    shared copy (see ``data_core.annotation_map``) — so forks keep the
+    parent's other annotations; process pools receive only the vector.
+    """
+
+    def __init__(self, max_workers=4, processes=False, max_depth=2, max_forks=32, time_budget=2.0,
+                 min_viability=0.5, max_loop_risk=0.7, sync_tolerance=0.15, memo=False):
+        self.max_workers = max_workers
+        self.processes = processes
+        self.max_depth = max_depth
+        self.max_forks = max_forks
+        self.time_budget = time_budget
+        self.min_viability = min_viability
+        self.max_loop_risk = max_loop_risk
+        self.sync_tolerance = sync_tolerance
+        self.memo = memo and not processes
+
+    def explore(self, packet):
+        """Explore ``packet``'s branches and merge survivors into its bloom manifest.
+
+        Runs the bloom cycle first if the packet has no manifest yet.
+        Returns the packet.
+        """
+        if "bloom_manifest" not in packet.annotations:
+            packet = hemispheric_bloom_cycle(packet)
+        manifest = packet.annotations["bloom_manifest"]
+
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        # Wall-clock twin of ``deadline`` for the forks, which may run in other processes
+        fork_deadline = time.time() + self.time_budget
+        survivors, pruned = [], []
+        futures = {}
+        submitted = completed = budget_skipped = stopped = 0
+        pool_cls = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        pool = pool_cls(max_workers=self.max_workers)
+
+        def make_fork(parent, index):
+            if isinstance(parent, list):
+                return fork_vector(parent, index)
+            child = parent.fork()
+            child.annotations["L4_logic_vector"] = fork_vector(parent.annotations.get("L4_logic_vector", []), index)
+            return child
+
+        def schedule(parent, parent_manifest, trail, depth):
+            nonlocal submitted, budget_skipped
+            for i, directive in enumerate(parent_manifest.get("recursive_directives", [])):
+                path = trail + [directive.get("path", f"rdir_{i}")]
+                if directive.get("viability", 0) < self.min_viability:
+                    pruned.append({"path": "/".join(path), "reason": "low_viability"})
+                    continue
+                if directive.get("loop_risk", 0) > self.max_loop_risk:
+                    pruned.append({"path": "/".join(path), "reason": "loop_risk"})
+                    continue
+                if submitted >= self.max_forks:
+                    budget_skipped += 1
+                    continue
+                child = make_fork(parent, i)
+                future = pool.submit(bloom_vector, child, self.memo, fork_deadline)
+                submitted += 1
+                futures[future] = (child, path, depth + 1, directive, parent_manifest.get("harmonic_sync", 0))
+
+        try:
+            base = list(packet.annotations.get("L4_logic_vector", [])) if self.processes else packet
+            schedule(base, manifest, [], 0)
+            while futures:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    child, path, depth, directive, parent_sync = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except ForkTimeout:
+                        stopped += 1
+                        continue
+                    except Exception as e:
+                        completed += 1
+                        pruned.append({"path": "/".join(path), "reason": f"error: {type(e).__name__}: {e}"})
+                        continue
+                    completed += 1
+                    sync = result.get("harmonic_sync", 0)
+                    if sync < parent_sync * (1 - self.sync_tolerance):
+                        pruned.append({"path": "/".join(path), "reason": "sync_drop", "harmonic_sync": sync})
+                        continue
+                    survivors.append({
+                        "path": "/".join(path),
+                        "symbol": directive.get("symbol"),
+                        "depth": depth,
+                        "viability": directive.get("viability"),
+                        "loop_risk": directive.get("loop_risk"),
+                        "harmonic_sync": sync,
+                        "linear_directives": result.get("linear_directives", []),
+                    })
+                    if depth < self.max_depth and time.monotonic() < deadline:
+                        schedule(child, result, path, depth)
+        finally:
+            # Queued forks are cancelled; running ones stop at their next node
+            pool.shutdown(wait=False, cancel_futures=True)
+        timed_out = len(futures) + stopped
+
+        survivors.sort(key=lambda s: (-s["harmonic_sync"], s["depth"], s["path"]))
+        manifest["explored_branches"] = survivors
+        manifest["exploration"] = {
+            "explored": completed,
+            "survivors": len(survivors),
+            "pruned": pruned,
+            "timed_out": timed_out,
+            "budget_skipped": budget_skipped,
+            "elapsed_ms": round((time.monotonic() - started) * 1000.0, 3),
+        }
+        return packet
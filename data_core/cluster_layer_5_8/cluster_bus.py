@@ -1,4 +1,5 @@
 # cluster_bus.py
+from collections.abc import Mapping
 
 class ClusterBus:
     def __init__(self, verbose=False):
@@ -7,7 +8,7 @@ class ClusterBus:
 
     def transmit(self, packet, layer_id, direction, transform_fn=None):
         # Safety checks
-        if not hasattr(packet, 'annotations') or not isinstance(packet.annotations, dict):
+        if not hasattr(packet, 'annotations') or not isinstance(packet.annotations, Mapping):
             raise ValueError("Invalid packet: Missing annotations dictionary")
 
         # Regulatory check: depth limit (e.g., 13 max)
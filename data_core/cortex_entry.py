@@ -1,8 +1,36 @@
-from data_core.node_1_cortex import Node1Cortex
-from data_core.node_2_preprocessor import Node2Preprocessor
-from data_core.node_3_parser import Node3Parser
-# Continue with cluster_layer_5_8 and layer_9 nodes as before
-from cluster_layer_5_8.node_5_left import Node5Left
-from layer_9.node_9_feedback import Node9Feedback
-from llm_adapter.run_llm import call_llm
-from cluster_layer_5_8.cluster_bus import ClusterBus
+"""
+ΞΛΩ – Cortex Entry
+Resolves the cortex's layers through the lazy node registry.
+
+Names are looked up on attribute access, so importing this module does
+not import any layer.  Layers 1–3 (cortex, preprocessor, parser) are not
+implemented yet; register them in ``data_core.node_registry`` once they
+exist and add them here.
+"""
+
+from data_core import node_registry
+
+# Exported name → registry name (or "module:attr" for non-layer helpers)
+_EXPORTS = {
+    "Node5Left": "node_5_left",
+    "Node9Feedback": "node_9_feedback",
+    "RecursionDriver": "data_core.layer_9.recursion_driver:RecursionDriver",
+    "BranchExplorer": "data_core.branch_explorer:BranchExplorer",
+    "ClusterBus": "cluster_bus",
+    "call_llm": "llm_adapter.run_llm:call_llm",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    target = _EXPORTS[name]
+    if ":" in target:
+        import importlib
+
+        module, _, attr = target.partition(":")
+        return getattr(importlib.import_module(module), attr)
+    return node_registry.get(target)
+
+
+__all__ = list(_EXPORTS)
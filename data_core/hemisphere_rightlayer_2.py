@@ -1,4 +1,4 @@
-from ..recursion_packet import RecursionPacket
+from .recursion_packet import RecursionPacket
 
 class LayerR2:
     """
@@ -1,74 +1,72 @@
-import sys
-import os
-import subprocess
-from datetime import datetime
-
-# 🔧 Ensure correct path setup
-current_dir = os.path.dirname(os.path.abspath(__file__))
-cluster_dir = os.path.join(current_dir, 'cluster_layer_5_8')
-sys.path.append(cluster_dir)
-
-# ✅ Imports
-from data_core.cluster_layer_5_8.cluster_bus import ClusterBus
-from node_5_left import Node5Left
-from node_5_right import Node5Right
-from node_6_left import Node6Left
-from node_6_right import Node6Right
-from node_7_left import Node7Left
-from node_7_right import Node7Right
-from node_8_core import Node8Core
+# ✅ Imports — nodes are resolved lazily through the registry on first cycle
+from data_core import node_registry
+from data_core.annotation_map import AnnotationMap
+from llm_adapter.manifest_render import DEFAULT_TOKEN_BUDGET, render_manifest
+
+# Layer 5 → Layer 8, left before right within each layer
+BLOOM_SEQUENCE = (
+    "node_5_left", "node_5_right",
+    "node_6_left", "node_6_right",
+    "node_7_left", "node_7_right",
+    "node_8_core",
+)
 
 # 📦 Recursion packet structure
 class RecursionPacket:
     def __init__(self, prompt):
-        self.annotations = {
+        self.annotations = AnnotationMap({
             "prompt": prompt,
             "recursion_depth": 0,
             "trace": []
-        }
+        })
+
+    def fork(self):
+        # O(1): annotations are shared until one side writes them
+        child = RecursionPacket.__new__(RecursionPacket)
+        child.annotations = self.annotations.fork()
+        return child
 
 # 🌱 Bloom cycle through nodes 5–8
 def hemispheric_bloom_cycle(packet):
-    bus = ClusterBus(verbose=True)
-
-    # Layer 5
-    packet = Node5Left(bus).process(packet)
-    packet = Node5Right(bus).process(packet)
-
-    # Layer 6
-    packet = Node6Left(bus).process(packet)
-    packet = Node6Right(bus).process(packet)
+    bus = node_registry.get("cluster_bus")(verbose=True)
 
-    # Layer 7
-    packet = Node7Left(bus).process(packet)
-    packet = Node7Right(bus).process(packet)
-
-    # Layer 8
-    packet = Node8Core(bus).process(packet)
+    # Layers 5 → 8
+    for name in BLOOM_SEQUENCE:
+        packet = node_registry.get(name)(bus).process(packet)
 
     return packet
 
 # 💬 Convert manifest into a language prompt
-def send_to_llm(manifest):
-    prompt = f"🧬 Bloom Manifest – {datetime.now().isoformat()} –\n"
-    for d in manifest.get("linear_directives", []):
-        prompt += f"[{d['priority']}] {d['action']} ({d['tag']} @ {d['path']}) | confidence: {d['confidence']}\n"
+def send_to_llm(manifest, token_budget=DEFAULT_TOKEN_BUDGET, priority=None, deadline=None):
+    prompt = render_manifest(manifest, token_budget=token_budget, model_name="phi")
 
     print("\n📡 SENDING TO LLM:\n")
     print(prompt)
 
+    import subprocess
+    from llm_adapter.admission import AdmissionRejected, get_scheduler, priority_for_manifest
+    from llm_adapter.telemetry import get_telemetry
+
     try:
-        result = subprocess.run(
-            ["ollama", "run", "phi", prompt],
-            capture_output=True,
-            text=True
-        )
+        # High-priority manifests are admitted ahead of normal ones under load
+        with get_scheduler().admit("ollama-cli", priority or priority_for_manifest(manifest), deadline) as ticket, \
+                get_telemetry().track("phi", "cli", "cli", ticket.queue_wait):
+            result = subprocess.run(
+                ["ollama", "run", "phi", prompt],
+                capture_output=True,
+                text=True
+            )
         return result.stdout.strip()
+    except AdmissionRejected as e:
+        return f"[LLM Rejected] {str(e)}"
     except Exception as e:
         return f"[LLM Error] {str(e)}"
 
 # 🔁 Execution entry point
 if __name__ == "__main__":
+    # The mock L4 vector never changes, so every turn after the first is a memo hit
+    from data_core.bloom_memo import memoized_bloom_cycle
+
     while True:
         prompt = input("\n💬 > ")
         if prompt.strip().lower() in ["exit", "quit"]:
@@ -83,7 +81,7 @@ if __name__ == "__main__":
             {"symbol": "Θ", "entropy_resolution": "none", "depth": 1, "memory_tag": "inert"},
         ]
 
-        result = hemispheric_bloom_cycle(packet)
+        result = memoized_bloom_cycle(packet)
         result.annotations["L4_logic_vector"] = packet.annotations["L4_logic_vector"]
 
         print("\n🌸 Bloom Manifest Output:")
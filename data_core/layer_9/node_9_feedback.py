@@ -8,7 +8,7 @@ recurse the directive packet back to Layer 2.
 Caps recursion depth to 13.
 """
 
-from .cluster_bus import ClusterBus
+from data_core.cluster_layer_5_8.cluster_bus import ClusterBus
 
 class Node9Feedback:
     def __init__(self, bus: ClusterBus, max_depth=13):
@@ -0,0 +1,233 @@
+"""
+ΞΛΩ – Recursion Driver
+Early-converging feedback loop for Node 9
+
+Runs the recursion Node 9 asks for — Layer 2 → Layer 4, the bloom cluster
+(5–8), then ``Node9Feedback`` — and stops as soon as further passes
+cannot change the answer:
+
+- ``fixed_point``: the manifest (ignoring its ``timestamp``) is identical
+  to the previous pass;
+- ``cycle``: it repeats one from up to ``cycle_window`` passes ago;
+- ``converged``: ``harmonic_sync`` moved less than ``sync_tolerance``;
+- ``settled`` / ``max_depth``: Node 9 itself stopped relooping.
+
+Each request's first L4 vector (and the depth it starts at) is
+fingerprinted; the outcome is cached under it, so a recursion seen
+before (in any later request) returns its final manifest after a single
+Layer 2–4 pass (``cached``).
+
+``stats()`` reports stop reasons, the depth histogram and the passes
+saved against running to Node 9's ``max_depth``.
+
+    packet = get_driver().run(RecursionPacket(signal, symbols=tokens))
+    packet.annotations["output"], packet.annotations["recursion_stop"]
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from data_core import node_registry
+from data_core.hemispheric_bloom import BLOOM_SEQUENCE
+
+# Layers 1 and R1 run once on entry; Node 9 re-enters at Layer 2
+ENTRY_SEQUENCE = ("layer_L1", "layer_R1")
+RECURSION_SEQUENCE = (
+    "layer_L2", "layer_R2",
+    "layer_L3", "layer_R3",
+    "layer_4_left", "layer_4_center", "layer_4_right",
+)
+STOP_REASONS = ("settled", "max_depth", "fixed_point", "cycle", "converged", "cached")
+
+
+def manifest_fingerprint(manifest):
+    """SHA-256 of ``manifest`` without its ``timestamp`` (key order ignored)."""
+    stable = {k: v for k, v in manifest.items() if k != "timestamp"}
+    blob = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=repr)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def vector_fingerprint(vector, salt=""):
+    blob = json.dumps(vector, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=repr)
+    return hashlib.sha256(f"{salt}\n{blob}".encode("utf-8")).hexdigest()
+
+
+class RecursionDriver:
+    """Drive Node 9 recursions with fixed-point, cycle and convergence detection.
+
+    Args:
+        sync_tolerance: Stop when ``harmonic_sync`` changes by less than this.
+        cycle_window: Longest manifest cycle detected (in passes).
+        cache_size: Starting vectors whose outcome is remembered.
+        verbose: Print the cluster bus traffic.
+    """
+
+    def __init__(self, sync_tolerance=1e-3, cycle_window=4, cache_size=1024, verbose=False):
+        self.sync_tolerance = sync_tolerance
+        self.cycle_window = cycle_window
+        self.cache_size = cache_size
+        self.verbose = verbose
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._salt = None
+        self.reasons = Counter()
+        self.depths = Counter()
+        self.passes = 0
+        self.passes_saved = 0
+
+    @property
+    def salt(self):
+        """Node fingerprint plus the stop settings: changing either invalidates the cache."""
+        if self._salt is None:
+            from data_core.bloom_memo import node_fingerprint
+
+            settings = f"{self.sync_tolerance}:{self.cycle_window}:{self._max_depth()}"
+            self._salt = f"{node_fingerprint()}:{settings}"
+        return self._salt
+
+    def _max_depth(self):
+        bus = node_registry.get("cluster_bus")(verbose=False)
+        return node_registry.get("node_9_feedback")(bus).max_depth
+
+    # 🔁 One Layer 2 → Node 9 pass
+    def _run_layers(self, packet, sequence):
+        for name in sequence:
+            packet = node_registry.get(name)().process(packet)
+        return packet
+
+    def _bloom_and_feedback(self, packet):
+        bus = node_registry.get("cluster_bus")(verbose=self.verbose)
+        for name in BLOOM_SEQUENCE:
+            packet = node_registry.get(name)(bus).process(packet)
+        node9 = node_registry.get("node_9_feedback")(bus)
+        return node9.process(packet), node9.max_depth
+
+    def run(self, packet):
+        """Run ``packet`` from Layer 1 until Node 9 outputs or the recursion converges."""
+        packet.annotations.setdefault("trace", [])
+        start_depth = packet.annotations.setdefault("recursion_depth", 0)
+        packet = self._run_layers(packet, ENTRY_SEQUENCE)
+        packet = self._run_layers(packet, RECURSION_SEQUENCE)
+
+        # Node 9 counts depth from the packet, so the same vector at another depth is another recursion
+        start_key = vector_fingerprint(packet.annotations.get("L4_logic_vector", []), f"{self.salt}:{start_depth}")
+        with self._lock:
+            cached = self._cache.get(start_key)
+            if cached is not None:
+                self._cache.move_to_end(start_key)
+        if cached is not None:
+            return self._replay(packet, cached, start_depth)
+
+        history = []
+        previous_sync = None
+        reason = None
+        while reason is None:
+            packet, max_depth = self._bloom_and_feedback(packet)
+            manifest = packet.annotations.get("bloom_manifest", {})
+            fingerprint = manifest_fingerprint(manifest)
+            sync = manifest.get("harmonic_sync", 0)
+            with self._lock:
+                self.passes += 1
+
+            if not packet.annotations.get("reloop"):
+                reason = "max_depth" if packet.annotations.get("recursion_depth", 0) >= max_depth else "settled"
+            elif history and history[-1] == fingerprint:
+                reason = "fixed_point"
+            elif fingerprint in history[-self.cycle_window:]:
+                reason = "cycle"
+            elif previous_sync is not None and abs(sync - previous_sync) < self.sync_tolerance:
+                reason = "converged"
+            else:
+                history.append(fingerprint)
+                previous_sync = sync
+                packet = self._run_layers(packet, RECURSION_SEQUENCE)
+                continue
+
+            if reason not in ("settled", "max_depth"):
+                # Further passes cannot change the answer: undo Node 9's reloop
+                packet.annotations["reloop"] = False
+                packet.annotations["recursion_depth"] -= 1
+                packet.annotations.pop("recursion_entry", None)
+                packet.annotations["output"] = manifest
+
+        depth = packet.annotations.get("recursion_depth", 0)
+        self._finish(packet, reason, depth, len(history) + 1, max_depth - start_depth + 1)
+        with self._lock:
+            self._cache[start_key] = copy.deepcopy({
+                "manifest": packet.annotations.get("output", {}),
+                "reason": reason,
+                "depth": depth,
+                "passes": len(history) + 1,
+            })
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return packet
+
+    def _replay(self, packet, cached, start_depth):
+        manifest = copy.deepcopy(cached["manifest"])
+        manifest["timestamp"] = time.time()
+        packet.annotations["bloom_manifest"] = manifest
+        packet.annotations["output"] = manifest
+        packet.annotations["reloop"] = False
+        packet.annotations["recursion_depth"] = cached["depth"]
+        # Without the cache, an early stop would still have run to max_depth;
+        # a run Node 9 ended itself would have cost its original passes
+        if cached["reason"] in ("settled", "max_depth"):
+            unbounded = cached["passes"]
+        else:
+            unbounded = self._max_depth() - start_depth + 1
+        self._finish(packet, "cached", cached["depth"], 0, unbounded, cached_reason=cached["reason"])
+        return packet
+
+    def _finish(self, packet, reason, depth, passes, unbounded_passes, cached_reason=None):
+        """Record the stop; ``unbounded_passes`` is what the run would cost without the driver."""
+        stop = {"reason": reason, "depth": depth, "passes": passes}
+        if cached_reason:
+            stop["cached_reason"] = cached_reason
+        packet.annotations["recursion_stop"] = stop
+        packet.annotations["trace"].append(f"🛑 Recursion stopped: {reason} at depth {depth} after {passes} passes")
+        with self._lock:
+            self.reasons[reason] += 1
+            self.depths[depth] += 1
+            if reason in ("fixed_point", "cycle", "converged", "cached"):
+                self.passes_saved += max(0, unbounded_passes - passes)
+
+    # 📊 Tuning
+    def stats(self):
+        with self._lock:
+            runs = sum(self.reasons.values())
+            total_depth = sum(depth * count for depth, count in self.depths.items())
+            return {
+                "runs": runs,
+                "passes": self.passes,
+                "passes_saved": self.passes_saved,
+                "reasons": {reason: self.reasons.get(reason, 0) for reason in STOP_REASONS},
+                "depth_histogram": dict(sorted(self.depths.items())),
+                "mean_depth": round(total_depth / runs, 3) if runs else 0.0,
+                "max_depth_seen": max(self.depths) if self.depths else 0,
+                "cache_size": len(self._cache),
+                "cache_hit_rate": round(self.reasons.get("cached", 0) / runs, 4) if runs else 0.0,
+            }
+
+    def clear(self):
+        """Forget cached outcomes and recompute the node fingerprint on next use."""
+        with self._lock:
+            self._cache.clear()
+            self._salt = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_driver():
+    """The process-wide driver, so the outcome cache spans requests."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RecursionDriver()
+        return _default
@@ -42,10 +42,10 @@ class Layer4Center:
             memory_boost = 0.3 if has_memory else 0
 
             score = (polarity + resolution_boost + memory_boost) * depth
-            node["harmonic_score"] = round(score, 3)
             total_score += score
 
-            harmonized_vector.append(node)
+            # New node dict: the incoming vector may be shared with forked packets
+            harmonized_vector.append({**node, "harmonic_score": round(score, 3)})
 
         average_score = round(total_score / len(vector), 3) if vector else 0
 
@@ -10,7 +10,7 @@ class Layer4Right:
         - defer (postpone recursion)
         - branch (create parallel recursion path)
 
-    Finalizes vector with entropy decisions in-place.
+    Finalizes vector with entropy decisions (as new node dicts).
     """
 
     def process(self, packet: RecursionPacket) -> RecursionPacket:
@@ -27,8 +27,7 @@ class Layer4Right:
             else:
                 resolution = "collapse"
 
-            node["entropy_resolution"] = resolution
-            stabilized_vector.append(node)
+            stabilized_vector.append({**node, "entropy_resolution": resolution})
 
         packet.annotations["L4_logic_vector"] = stabilized_vector
         return packet
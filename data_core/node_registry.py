@@ -0,0 +1,80 @@
+"""
+ΞΛΩ – Node Registry
+Lazy layer lookup by name
+
+Layers register a ``"package.module:ClassName"`` target under a short
+name.  Nothing is imported until ``get(name)`` is first called, so entry
+points only pay for the layers they actually run, and no ``sys.path``
+manipulation is needed — every target is a fully qualified module path.
+"""
+
+import importlib
+import threading
+
+_targets = {}
+_loaded = {}
+_lock = threading.Lock()
+
+
+def register(name, target):
+    """Register ``target`` (``"module:attr"``) under ``name``.
+
+    Re-registering a name replaces its target and drops any cached class.
+    """
+    module, sep, attr = target.partition(":")
+    if not sep or not module or not attr:
+        raise ValueError(f"Invalid registry target {target!r}; expected 'module:attr'")
+    with _lock:
+        _targets[name] = target
+        _loaded.pop(name, None)
+
+
+def get(name):
+    """Return the object registered under ``name``, importing it on first use."""
+    try:
+        return _loaded[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _loaded:
+            if name not in _targets:
+                raise KeyError(f"No layer registered under {name!r}")
+            module, _, attr = _targets[name].partition(":")
+            _loaded[name] = getattr(importlib.import_module(module), attr)
+        return _loaded[name]
+
+
+def registered():
+    """Names of every registered layer, in registration order."""
+    return list(_targets)
+
+
+def is_loaded(name):
+    return name in _loaded
+
+
+# 🧠 Hemisphere layers 1–3
+register("layer_L1", "data_core.hemisphere_leftlayer_1:LayerL1")
+register("layer_L2", "data_core.hemisphere_leftlayer_2:LayerL2")
+register("layer_L3", "data_core.hemisphere_leftlayer_3:LayerL3")
+register("layer_R1", "data_core.hemisphere_rightlayer_1:LayerR1")
+register("layer_R2", "data_core.hemisphere_rightlayer_2:LayerR2")
+register("layer_R3", "data_core.hemisphere_rightlayer_3:LayerR3")
+
+# 🔗 Nexus layer 4
+register("layer_4_left", "data_core.nexus_layer_4.layer_4_left:Layer4Left")
+register("layer_4_center", "data_core.nexus_layer_4.layer_4_center:Layer4Center")
+register("layer_4_right", "data_core.nexus_layer_4.layer_4_right:Layer4Right")
+
+# 🌸 Cluster layers 5–8
+register("cluster_bus", "data_core.cluster_layer_5_8.cluster_bus:ClusterBus")
+register("node_5_left", "data_core.cluster_layer_5_8.node_5_left:Node5Left")
+register("node_5_right", "data_core.cluster_layer_5_8.node_5_right:Node5Right")
+register("node_6_left", "data_core.cluster_layer_5_8.node_6_left:Node6Left")
+register("node_6_right", "data_core.cluster_layer_5_8.node_6_right:Node6Right")
+register("node_7_left", "data_core.cluster_layer_5_8.node_7_left:Node7Left")
+register("node_7_right", "data_core.cluster_layer_5_8.node_7_right:Node7Right")
+register("node_8_core", "data_core.cluster_layer_5_8.node_8_core:Node8Core")
+
+# 🔁 Layer 9
+register("node_9_feedback", "data_core.layer_9.node_9_feedback:Node9Feedback")
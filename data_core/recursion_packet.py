@@ -1,16 +1,31 @@
-class RecursionPacket:
-    """
-    ΞΛΩ_Packet:
-    Core symbolic container passed between harmonic layers.
-    Contains the signal, symbolic state, entropy, memory trail, and intent signature.
-    """
-    def __init__(self, signal="", symbols=None, memory=None, intent=None):
-        self.signal = signal
-        self.symbols = symbols or []
-        self.memory = memory or []
-        self.intent = intent
-        self.entropy = 0.0
-        self.annotations = {}
-
-    def __repr__(self):
-        return f"<ΨΛΩ RecursionPacket | Signal: {self.signal} | Symbols: {self.symbols}>"
+from .annotation_map import AnnotationMap
+
+
+class RecursionPacket:
+    """
+    ΞΛΩ_Packet:
+    Core symbolic container passed between harmonic layers.
+    Contains the signal, symbolic state, entropy, memory trail, and intent signature.
+    """
+    def __init__(self, signal="", symbols=None, memory=None, intent=None):
+        self.signal = signal
+        self.symbols = symbols or []
+        self.memory = memory or []
+        self.intent = intent
+        self.entropy = 0.0
+        self.annotations = AnnotationMap()
+
+    def fork(self):
+        """Copy for what-if runs.
+
+        The annotations fork in O(1) and stay shared until written;
+        ``symbols`` and ``memory`` are copied, so the fork costs time
+        linear in their length.
+        """
+        child = RecursionPacket(self.signal, list(self.symbols), list(self.memory), self.intent)
+        child.entropy = self.entropy
+        child.annotations = self.annotations.fork()
+        return child
+
+    def __repr__(self):
+        return f"<ΨΛΩ RecursionPacket | Signal: {self.signal} | Symbols: {self.symbols}>"
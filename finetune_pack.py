@@ -0,0 +1,428 @@
+"""
+finetune_pack.py
+================
+
+Sequence-packed fine-tuning export for the ``{"prompt", "response"}``
+datasets (``dataset.jsonl``, ``sotma_dataset.jsonl``).
+
+Pipeline:
+
+1. **Tokenize** every pair with the target model's tokenizer in a
+   process pool.  Token ids are cached in SQLite keyed on the tokenizer,
+   the template and the pair's text, so re-exports (and datasets that
+   share pairs) only tokenize what is new.
+2. **Pack** the tokenized pairs into ``seq_len`` sequences with
+   first-fit-decreasing.  Pairs longer than ``seq_len`` are truncated
+   (keeping their EOS) and counted.  Pairs left with no response tokens
+   to learn are counted as prompt-only, and dropped with
+   ``--skip-prompt-only``.
+3. **Write** ``<out>.bin`` — a flat ``sequences × seq_len`` token array
+   (``uint16`` when the vocabulary fits, else ``uint32``), padded with
+   the pad id — plus the attention-boundary index:
+
+   * ``<out>.segments.bin`` — ``uint32`` rows of
+     ``(start, length, prompt_length)``, one per packed pair;
+   * ``<out>.offsets.bin`` — ``uint64`` × (sequences + 1): sequence
+     ``i`` owns segment rows ``offsets[i]:offsets[i + 1]``;
+   * ``<out>.meta.json`` — shapes, dtypes, tokenizer and the packing
+     report.
+
+   A trainer builds block-diagonal attention (and resets position ids) per
+   segment, and can mask the loss on the first ``prompt_length`` tokens of
+   each.  ``PackedDataset`` reads all of it through ``mmap``.
+
+Usage::
+
+    python finetune_pack.py dataset.jsonl sotma_dataset.jsonl -o packed/phi --seq-len 2048
+    python finetune_pack.py sotma_dataset.jsonl -o packed/sotma --tokenizer microsoft/phi-2 --workers 8
+
+transformers is imported lazily, inside the tokenizer workers.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_TOKENIZER = "microsoft/phi-2"
+DEFAULT_CACHE = "finetune_tokens.sqlite"
+PROMPT_TEMPLATE = "{prompt}\n"
+BATCH_SIZE = 512
+
+
+# 🔤 Tokenization (runs in worker processes)
+_tokenizer = None
+
+
+def load_tokenizer(name):
+    from transformers import AutoTokenizer  # type: ignore
+
+    return AutoTokenizer.from_pretrained(name)
+
+
+def _init_worker(name):
+    global _tokenizer
+    _tokenizer = load_tokenizer(name)
+
+
+def _tokenize_batch(batch):
+    """``[(key, prompt, response)]`` → ``[(key, ids_bytes, prompt_length)]``."""
+    tok = _tokenizer
+    prompts = [PROMPT_TEMPLATE.format(prompt=p) for _, p, _ in batch]
+    responses = [r for _, _, r in batch]
+    prompt_ids = tok(prompts, add_special_tokens=False)["input_ids"]
+    response_ids = tok(responses, add_special_tokens=False)["input_ids"]
+    bos = [tok.bos_token_id] if tok.bos_token_id is not None else []
+    eos = [tok.eos_token_id] if tok.eos_token_id is not None else []
+    out = []
+    for (key, _, _), p_ids, r_ids in zip(batch, prompt_ids, response_ids):
+        ids = bos + p_ids + r_ids + eos
+        out.append((key, array("I", ids).tobytes(), len(bos) + len(p_ids)))
+    return out
+
+
+def tokenizer_info(name):
+    """``(fingerprint, vocab_size, pad_id, eos_id)`` for cache keys and the export meta."""
+    tok = load_tokenizer(name)
+    vocab = json.dumps(sorted(tok.get_vocab().items()), ensure_ascii=False).encode("utf-8")
+    fingerprint = hashlib.sha256(f"{name}\n{type(tok).__name__}\n".encode("utf-8") + vocab).hexdigest()[:16]
+    pad_id = tok.pad_token_id if tok.pad_token_id is not None else tok.eos_token_id
+    return fingerprint, len(tok), pad_id if pad_id is not None else 0, tok.eos_token_id
+
+
+class TokenCache:
+    """SQLite cache of token ids keyed on ``(tokenizer, template, prompt, response)``."""
+
+    def __init__(self, path=DEFAULT_CACHE, fingerprint=""):
+        self.fingerprint = fingerprint
+        self._db = sqlite3.connect(path)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, ids BLOB, prompt_length INTEGER) WITHOUT ROWID")
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, prompt, response):
+        text = f"{self.fingerprint}\0{PROMPT_TEMPLATE}\0{prompt}\0{response}"
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def lengths(self, keys):
+        """``{key: (token_count, prompt_length)}`` for the cached ``keys``."""
+        found = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            rows = self._db.execute(
+                f"SELECT key, length(ids) / 4, prompt_length FROM tokens WHERE key IN ({','.join('?' * len(part))})", part)
+            found.update((k, (n, p)) for k, n, p in rows)
+        return found
+
+    def get(self, key):
+        ids, prompt_length = self._db.execute("SELECT ids, prompt_length FROM tokens WHERE key = ?", (key,)).fetchone()
+        return array("I", ids), prompt_length
+
+    def put_many(self, rows):
+        self._db.executemany("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)", rows)
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+def iter_pairs(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict) and record.get("prompt") is not None and record.get("response") is not None:
+                    yield str(record["prompt"]), str(record["response"])
+
+
+def tokenize_all(paths, tokenizer, cache, workers=None):
+    """Tokenize every pair (cache misses only, in parallel); returns ``[(key, length, prompt_length)]``."""
+    items = []
+    pending = {}
+    started = time.perf_counter()
+
+    def drain(futures):
+        for future in futures:
+            rows = future.result()
+            cache.put_many(rows)
+            for key, ids, prompt_length in rows:
+                pending[key] = (len(ids) // 4, prompt_length)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tokenizer,)) as pool:
+        in_flight = []
+        batch = []
+
+        def flush(batch):
+            keys = [cache.key(p, r) for p, r in batch]
+            cached = cache.lengths(keys)
+            misses = {}
+            for key, (p, r) in zip(keys, batch):
+                items.append(key)
+                # Repeats of a pair already queued this run reuse its tokens too
+                if key in cached or key in pending or key in misses:
+                    cache.hits += 1
+                else:
+                    misses[key] = (key, p, r)
+                pending.setdefault(key, cached.get(key))
+            cache.misses += len(misses)
+            if misses:
+                in_flight.append(pool.submit(_tokenize_batch, list(misses.values())))
+
+        for pair in iter_pairs(paths):
+            batch.append(pair)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+                # Bound the queued work to a couple of batches per worker
+                if len(in_flight) >= 2 * workers:
+                    drain(in_flight[:workers])
+                    del in_flight[:workers]
+        if batch:
+            flush(batch)
+        drain(in_flight)
+    elapsed = time.perf_counter() - started
+    return [(key,) + pending[key] for key in items], elapsed
+
+
+# 📦 Packing
+class FirstFit:
+    """First-fit bin packing in O(log bins) per item (max segment tree over free space)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.bins = 0
+        self._size = 1
+        self._tree = [0, 0]
+
+    def _grow(self):
+        leaves = self._tree[self._size:]
+        self._size *= 2
+        self._tree = [0] * self._size + leaves + [0] * (self._size - len(leaves))
+        for i in range(self._size - 1, 0, -1):
+            self._tree[i] = max(self._tree[2 * i], self._tree[2 * i + 1])
+
+    def _set(self, leaf, value):
+        i = self._size + leaf
+        self._tree[i] = value
+        i //= 2
+        while i:
+            self._tree[i] = max(self._tree[2 * i], self._tree[2 * i + 1])
+            i //= 2
+
+    def place(self, length):
+        """Index of the first bin with room for ``length`` (opening one if needed)."""
+        tree = self._tree
+        if tree[1] >= length:
+            i = 1
+            while i < self._size:
+                i = 2 * i if tree[2 * i] >= length else 2 * i + 1
+            leaf = i - self._size
+            self._set(leaf, tree[i] - length)
+            return leaf
+        if self.bins == self._size:
+            self._grow()
+        leaf = self.bins
+        self.bins += 1
+        self._set(leaf, self.capacity - length)
+        return leaf
+
+
+def pack(lengths, seq_len):
+    """First-fit-decreasing: ``lengths`` → list of bins (lists of item indices)."""
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    packer = FirstFit(seq_len)
+    bins = []
+    for i in order:
+        b = packer.place(min(lengths[i], seq_len))
+        if b == len(bins):
+            bins.append([])
+        bins[b].append(i)
+    return bins
+
+
+def fit(ids, prompt_length, seq_len, eos_id):
+    """Truncate ``ids`` to ``seq_len`` keeping its closing EOS; returns ``(ids, prompt_length)``.
+
+    The prompt length is clipped so the EOS is never loss-masked.
+    """
+    tail = 1 if eos_id is not None and ids and ids[-1] == eos_id else 0
+    if len(ids) > seq_len:
+        ids = ids[:seq_len - tail] + ids[len(ids) - tail:]
+    return ids, min(prompt_length, len(ids) - tail)
+
+
+def export(paths, out, seq_len=2048, tokenizer=DEFAULT_TOKENIZER, cache_path=DEFAULT_CACHE, workers=None,
+           skip_prompt_only=False):
+    """Tokenize, pack and write ``paths`` to ``out``; returns the report.
+
+    A pair is prompt-only when, after truncation, nothing but its prompt
+    (and EOS) is left, so it trains on no response tokens.  These are
+    counted, and left out of the export with ``skip_prompt_only``.
+    """
+    fingerprint, vocab_size, pad_id, eos_id = tokenizer_info(tokenizer)
+    cache = TokenCache(cache_path, fingerprint)
+    try:
+        items, tokenize_s = tokenize_all(paths, tokenizer, cache, workers)
+        tail = 1 if eos_id is not None else 0
+        prompt_only = [i for i, (_, n, prompt_length) in enumerate(items)
+                       if prompt_length >= min(n, seq_len) - tail]
+        packed = items
+        if skip_prompt_only and prompt_only:
+            dropped = set(prompt_only)
+            packed = [item for i, item in enumerate(items) if i not in dropped]
+        started = time.perf_counter()
+        bins = pack([n for _, n, _ in packed], seq_len)
+        pack_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        dtype = "uint16" if vocab_size <= 1 << 16 else "uint32"
+        typecode = "H" if dtype == "uint16" else "I"
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        tokens = truncated = 0
+        offsets = array("Q", [0])
+        with open(f"{out}.bin", "wb") as tok_f, open(f"{out}.segments.bin", "wb") as seg_f:
+            for members in bins:
+                row = array(typecode)
+                segments = array("I")
+                for i in members:
+                    ids, prompt_length = cache.get(packed[i][0])
+                    if len(ids) > seq_len:
+                        truncated += 1
+                    ids, prompt_length = fit(ids, prompt_length, seq_len, eos_id)
+                    segments.extend((len(row), len(ids), prompt_length))
+                    row.extend(ids.tolist())
+                tokens += len(row)
+                row.extend([pad_id] * (seq_len - len(row)))
+                row.tofile(tok_f)
+                segments.tofile(seg_f)
+                offsets.append(offsets[-1] + len(members))
+        with open(f"{out}.offsets.bin", "wb") as f:
+            offsets.tofile(f)
+        write_s = time.perf_counter() - started
+
+        sequences = len(bins)
+        report = {
+            "records": len(items),
+            "unique_records": len({key for key, _, _ in items}),
+            "tokens": tokens,
+            "sequences": sequences,
+            "seq_len": seq_len,
+            "packing_efficiency": round(tokens / (sequences * seq_len), 4) if sequences else 0.0,
+            "unpacked_efficiency": round(tokens / (len(packed) * seq_len), 4) if packed else 0.0,
+            "segments_per_sequence": round(len(packed) / sequences, 2) if sequences else 0.0,
+            "truncated": truncated,
+            "prompt_only": len(prompt_only),
+            "skipped": len(items) - len(packed),
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+            "tokenize_s": round(tokenize_s, 3),
+            "pack_s": round(pack_s, 3),
+            "write_s": round(write_s, 3),
+        }
+        meta = {
+            "tokenizer": tokenizer,
+            "tokenizer_fingerprint": fingerprint,
+            "vocab_size": vocab_size,
+            "pad_id": pad_id,
+            "dtype": dtype,
+            "seq_len": seq_len,
+            "sequences": sequences,
+            "segment_fields": ["start", "length", "prompt_length"],
+            "template": PROMPT_TEMPLATE,
+            "sources": list(paths),
+            "report": report,
+        }
+        with open(f"{out}.meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        return report
+    finally:
+        cache.close()
+
+
+# 📖 Reader
+class PackedDataset:
+    """Memory-mapped reader for an ``export`` result."""
+
+    def __init__(self, out):
+        with open(f"{out}.meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.seq_len = self.meta["seq_len"]
+        self._maps = []
+        typecode = "H" if self.meta["dtype"] == "uint16" else "I"
+        self._tokens = self._map(f"{out}.bin", typecode)
+        self._segments = self._map(f"{out}.segments.bin", "I")
+        self._offsets = self._map(f"{out}.offsets.bin", "Q")
+
+    def _map(self, path, typecode):
+        if os.path.getsize(path) == 0:
+            return memoryview(b"").cast(typecode)
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return memoryview(mm).cast(typecode)
+
+    def __len__(self):
+        return self.meta["sequences"]
+
+    def tokens(self, i):
+        """Zero-copy view of sequence ``i``'s ``seq_len`` token ids."""
+        return self._tokens[i * self.seq_len:(i + 1) * self.seq_len]
+
+    def segments(self, i):
+        """``[(start, length, prompt_length)]`` of the pairs packed into sequence ``i``."""
+        rows = self._segments[self._offsets[i] * 3:self._offsets[i + 1] * 3]
+        return [tuple(rows[j:j + 3]) for j in range(0, len(rows), 3)]
+
+    def position_ids(self, i):
+        """Position ids restarting at 0 for every segment (0 over padding)."""
+        positions = [0] * self.seq_len
+        for start, length, _ in self.segments(i):
+            positions[start:start + length] = range(length)
+        return positions
+
+    def close(self):
+        for view in (self._tokens, self._segments, self._offsets):
+            view.release()
+        for mm in self._maps:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tokenize and sequence-pack prompt/response JSONL for fine-tuning.")
+    parser.add_argument("inputs", nargs="+", help="JSONL files of {prompt, response}")
+    parser.add_argument("-o", "--output", required=True, help="output prefix (writes .bin, .segments.bin, ...)")
+    parser.add_argument("--seq-len", type=int, default=2048)
+    parser.add_argument("--tokenizer", default=DEFAULT_TOKENIZER)
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="token id cache (SQLite)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--skip-prompt-only", action="store_true",
+                        help="leave out pairs truncated down to their prompt (no response tokens to train on)")
+    args = parser.parse_args(argv)
+
+    report = export(args.inputs, args.output, args.seq_len, args.tokenizer, args.cache, args.workers,
+                    args.skip_prompt_only)
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+harmonic_daemon.py
+==================
+
+Long-lived daemon for ``HARMONIC_AI_001`` plus a thin socket client.
+
+Running ``HARMONIC_AI_001.py`` once per query pays interpreter start-up,
+the import of every bloom node and (on the BLOOM path) the
+transformers/torch import and model load on every invocation.  The
+daemon does all of that once, keeps the bloom pipeline, the Ollama
+client and optionally the BLOOM model resident, and answers queries over
+a Unix domain socket.
+
+The client side of this module only imports the standard library, so
+``ask`` starts in a few tens of milliseconds and the per-query latency
+seen from the shell is dominated by the model.
+
+Protocol: the client sends one JSON line ``{"query": ..., "mode": ...}``
+and the daemon streams back JSON lines — ``{"chunk": "..."}`` for each
+piece of the answer, then ``{"done": true, "elapsed_ms": ...}`` or
+``{"error": "..."}``.
+
+Usage::
+
+    python harmonic_daemon.py serve --model phi --metrics-port 9464
+    python harmonic_daemon.py ask "build a harmonic clock"
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+DEFAULT_SOCKET = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"phi-coder-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock",
+)
+
+
+# 🔁 Daemon
+def serve(socket_path=DEFAULT_SOCKET, model_name="phi", host="http://localhost:11434", bloom=False,
+          bloom_mode="fp32", threads=None, metrics_port=None, tokenizer=False):
+    """Warm every pipeline once and serve queries until interrupted.
+
+    With ``metrics_port``, per-call telemetry is served on
+    ``http://127.0.0.1:<port>/metrics``.  With ``tokenizer``, manifest
+    budgets are counted with the model's locally cached tokenizer.
+    """
+    import socketserver
+
+    # Heavy imports happen here, once, instead of per query
+    from HARMONIC_AI_001 import generate_bloom_manifest, get_ollama_client, stream_phi_coder
+
+    bridge = None
+    if bloom:
+        from phi_bloom_bridge import BloomModelInterface, OllamaPhiModel, PhiBloomBridge
+        bridge = PhiBloomBridge(
+            bloom=BloomModelInterface(inference_mode=bloom_mode, num_threads=threads),
+            phi=OllamaPhiModel(model_name=model_name, host=host),
+        )
+        bridge.bloom.load()
+
+    if metrics_port:
+        from llm_adapter.telemetry import serve_metrics
+
+        serve_metrics(metrics_port)
+        print(f"[daemon] 📈 metrics on http://127.0.0.1:{metrics_port}/metrics", file=sys.stderr)
+
+    if tokenizer:
+        from llm_adapter.manifest_render import use_tokenizer
+
+        if not use_tokenizer(model_name):
+            print(f"[daemon] ⚠ no cached tokenizer for {model_name}; estimating tokens", file=sys.stderr)
+
+    generate_bloom_manifest("warmup")
+    try:
+        get_ollama_client(host)
+    except RuntimeError as e:
+        print(f"[daemon] ⚠ {e}", file=sys.stderr)
+
+    class QueryHandler(socketserver.StreamRequestHandler):
+        def send(self, payload):
+            self.wfile.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            started = time.perf_counter()
+            try:
+                request = json.loads(line)
+                query = request["query"]
+                if request.get("mode") == "bridge":
+                    if bridge is None:
+                        raise RuntimeError("daemon was started without --bloom")
+                    result = bridge.process(query)
+                    self.send({"chunk": result["bloom_output"]})
+                else:
+                    manifest = generate_bloom_manifest(query, memo=True)
+                    for chunk in stream_phi_coder(manifest, model_name=model_name, host=host):
+                        self.send({"chunk": chunk})
+                self.send({"done": True, "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 3)})
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            except Exception as e:
+                self.send({"error": f"{type(e).__name__}: {e}"})
+
+    class DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+    _remove_stale_socket(socket_path)
+    with DaemonServer(socket_path, QueryHandler) as server:
+        os.chmod(socket_path, 0o600)
+        print(f"[daemon] 🧠 listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise RuntimeError(f"a daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+# 💬 Thin client
+def ask(query, socket_path=DEFAULT_SOCKET, mode="phi", out=sys.stdout):
+    """Send ``query`` to the daemon and stream the answer to ``out``.
+
+    Returns the process exit status (0 on success).
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        print(f"Could not reach daemon at {socket_path}: {e}", file=sys.stderr)
+        return 2
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps({"query": query, "mode": mode}) + "\n").encode("utf-8"))
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if "chunk" in message:
+                out.write(message["chunk"])
+                out.flush()
+            elif "error" in message:
+                print(f"\n(Error during Phi model query: {message['error']})", file=sys.stderr)
+                return 1
+            elif message.get("done"):
+                out.write("\n")
+                return 0
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm PHI-CODER daemon and socket client.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_p = sub.add_parser("serve", help="run the daemon")
+    serve_p.add_argument("--model", default="phi")
+    serve_p.add_argument("--host", default="http://localhost:11434")
+    serve_p.add_argument("--bloom", action="store_true", help="also keep the BLOOM bridge resident")
+    serve_p.add_argument("--bloom-mode", choices=("fp32", "mmap", "int8"), default="fp32",
+                         help="how BLOOM weights are held on CPU")
+    serve_p.add_argument("--threads", type=int, default=None, help="torch threads for BLOOM")
+    serve_p.add_argument("--metrics-port", type=int, default=None, help="serve telemetry on this port")
+    serve_p.add_argument("--tokenizer", action="store_true",
+                         help="count manifest tokens with the model's locally cached tokenizer")
+
+    ask_p = sub.add_parser("ask", help="send a query to a running daemon")
+    ask_p.add_argument("query", nargs="+")
+    ask_p.add_argument("--mode", choices=("phi", "bridge"), default="phi")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.socket, model_name=args.model, host=args.host, bloom=args.bloom,
+              bloom_mode=args.bloom_mode, threads=args.threads, metrics_port=args.metrics_port,
+              tokenizer=args.tokenizer)
+        return 0
+    return ask(" ".join(args.query), socket_path=args.socket, mode=args.mode)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
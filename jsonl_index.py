@@ -0,0 +1,349 @@
+"""
+jsonl_index.py
+==============
+
+Random access into JSONL datasets (``dataset.jsonl``,
+``sotma_dataset.jsonl``, ``requests.jsonl``, bloom_batch output ...).
+
+A sidecar ``<data>.idx`` holds the byte offset of every record as a
+packed ``uint64`` array, built in one streaming pass.  Both files are
+memory-mapped, so ``raw(i)`` is a zero-copy slice of the data file and
+opening a dataset costs nothing per record.
+
+When records are appended to the data file, the next open (or
+``refresh()``) scans only the new tail and appends its offsets.  Only
+newline-terminated lines are indexed: a last line still being written
+is left for a later refresh (pass ``complete=True`` for a finished file
+whose last record lacks its newline).  The index also keeps a digest of
+the data it covered; if the file was rewritten rather than appended to,
+the index is rebuilt.
+
+    ds = JsonlDataset("sotma_dataset.jsonl")
+    len(ds), ds[42], ds[-1]
+    for record in ds.shuffled(seed=7): ...
+    worker_part = ds.shard(rank, world_size)
+
+Index layout (native byte order)::
+
+    magic "JSONLIX1" | count u64 | indexed_bytes u64 | digest 16 bytes | count × offset u64
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+MAGIC = b"JSONLIX1"
+HEADER = struct.Struct("=8sQQ16s")
+DIGEST_SPAN = 4096
+SCAN_BLOCK = 1 << 20
+WHITESPACE = b" \t\r\n"
+
+
+def index_path_for(path):
+    return f"{path}.idx"
+
+
+def _digest(data, indexed):
+    """Fingerprint of the indexed prefix: its first and last ``DIGEST_SPAN`` bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(indexed.to_bytes(8, "little"))
+    h.update(data[:min(DIGEST_SPAN, indexed)])
+    h.update(data[max(0, indexed - DIGEST_SPAN):indexed])
+    return h.digest()
+
+
+def scan_offsets(f, start=0, stop=None):
+    """Yield the start offset of every non-blank line from ``start`` to ``stop`` (or EOF).
+
+    Streams ``f`` (a binary file) in ``SCAN_BLOCK`` chunks; ``start`` must
+    be at a line boundary.
+    """
+    f.seek(start)
+    position = start
+    at_line_start = True
+    while stop is None or position < stop:
+        block = f.read(SCAN_BLOCK if stop is None else min(SCAN_BLOCK, stop - position))
+        if not block:
+            return
+        i = 0
+        size = len(block)
+        while i < size:
+            if at_line_start:
+                # Skip blank lines and leading whitespace
+                while i < size and block[i] in WHITESPACE:
+                    i += 1
+                if i == size:
+                    break
+                yield position + i
+                at_line_start = False
+            nl = block.find(b"\n", i)
+            if nl < 0:
+                i = size
+            else:
+                i = nl + 1
+                at_line_start = True
+        position += size
+
+
+def line_end(f, start, size):
+    """Offset just past the last ``\\n`` in ``[start, size)``, or ``start`` if there is none."""
+    position = size
+    while position > start:
+        step = min(SCAN_BLOCK, position - start)
+        f.seek(position - step)
+        nl = f.read(step).rfind(b"\n")
+        if nl >= 0:
+            return position - step + nl + 1
+        position -= step
+    return start
+
+
+class JsonlDataset:
+    """Memory-mapped, indexed view of a JSONL file.
+
+    Args:
+        path: The JSONL data file.
+        index_path: Sidecar index (defaults to ``<path>.idx``).
+        decode: Applied to each record's bytes by ``__getitem__``.
+        complete: The file is no longer being written, so a last line
+            without a trailing newline is a record too.  It is served
+            from memory and never written to the index.
+    """
+
+    def __init__(self, path, index_path=None, decode=json.loads, complete=False):
+        self.path = path
+        self.index_path = index_path or index_path_for(path)
+        self.decode = decode
+        self.complete = complete
+        self._data = None
+        self._index = None
+        self._offsets = memoryview(b"").cast("Q")
+        self._indexed = 0
+        self._tail = None
+        self.refresh()
+
+    # 🗂️ Index maintenance
+    def refresh(self):
+        """Pick up records appended since the index was last updated.
+
+        Remaps both files, so it raises ``BufferError`` while any
+        ``raw()`` view is still alive; release those (or copy them with
+        ``bytes()``) first.
+        """
+        self._unmap()
+        size = os.path.getsize(self.path)
+        count, indexed, digest = self._read_header()
+        with open(self.path, "rb") as f:
+            if count is not None and indexed <= size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else _Empty() as data:
+                    valid = _digest(data, indexed) == digest
+            else:
+                valid = False
+            if not valid:
+                count, indexed = 0, 0
+                with open(self.index_path, "wb") as idx:
+                    idx.write(HEADER.pack(MAGIC, 0, 0, b"\0" * 16))
+            # An unterminated last line may still be mid-write: leave it for the next refresh
+            end = line_end(f, indexed, size)
+            if indexed < end:
+                self._append(f, count, indexed, end)
+        self._map(size)
+        return self
+
+    def _read_header(self):
+        try:
+            with open(self.index_path, "rb") as idx:
+                raw = idx.read(HEADER.size)
+                magic, count, indexed, digest = HEADER.unpack(raw)
+                idx.seek(0, os.SEEK_END)
+                if magic != MAGIC or idx.tell() < HEADER.size + count * 8:
+                    return None, 0, b""
+                return count, indexed, digest
+        except (OSError, struct.error):
+            return None, 0, b""
+
+    def _append(self, f, count, indexed, end):
+        """Scan ``[indexed, end)`` and append its offsets, then commit the header."""
+        offsets = array("Q")
+        with open(self.index_path, "r+b") as idx:
+            # Drop offsets written past the header's count by an interrupted update
+            idx.truncate(HEADER.size + count * 8)
+            idx.seek(0, os.SEEK_END)
+            for offset in scan_offsets(f, indexed, end):
+                offsets.append(offset)
+                if len(offsets) >= 65536:
+                    count += len(offsets)
+                    offsets.tofile(idx)
+                    del offsets[:]
+            count += len(offsets)
+            offsets.tofile(idx)
+            idx.flush()
+            os.fsync(idx.fileno())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest = _digest(data, end)
+            # Header last: a crash before this leaves the previous index valid
+            idx.seek(0)
+            idx.write(HEADER.pack(MAGIC, count, end, digest))
+
+    def _map(self, size):
+        count, indexed, _ = self._read_header()
+        self._indexed = indexed
+        self._tail = None
+        if count:
+            with open(self.index_path, "rb") as idx:
+                self._index = mmap.mmap(idx.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets = memoryview(self._index)[HEADER.size:HEADER.size + count * 8].cast("Q")
+        else:
+            self._offsets = memoryview(b"").cast("Q")
+        if size and (count or self.complete):
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.complete:
+                tail = self._data[indexed:size]
+                if tail.strip(WHITESPACE):
+                    self._tail = (indexed + len(tail) - len(tail.lstrip(WHITESPACE)), size)
+
+    def _unmap(self):
+        # Data first: if a raw() view pins it, BufferError leaves the dataset usable
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self._offsets.release()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def close(self):
+        self._unmap()
+        self._offsets = memoryview(b"").cast("Q")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # 🔎 Access
+    def __len__(self):
+        return len(self._offsets) + (self._tail is not None)
+
+    def _bounds(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"record {i} out of range for {n} records")
+        if i == len(self._offsets):
+            start, end = self._tail
+            while end > start and self._data[end - 1] in WHITESPACE:
+                end -= 1
+            return start, end
+        start = self._offsets[i]
+        end = self._offsets[i + 1] if i + 1 < len(self._offsets) else self._indexed
+        while end > start and self._data[end - 1] in WHITESPACE:
+            end -= 1
+        return start, end
+
+    def raw(self, i):
+        """Zero-copy ``memoryview`` of record ``i``'s bytes.
+
+        Valid until ``close``/``refresh``; release it before either.
+        """
+        start, end = self._bounds(i)
+        return memoryview(self._data)[start:end]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start, end = self._bounds(i)
+        return self.decode(self._data[start:end])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def indices(self):
+        return range(len(self))
+
+    def shuffled(self, seed, epoch=0):
+        """Iterate in a deterministic random order for ``(seed, epoch)``."""
+        return _Subset(self, self.indices()).shuffled(seed, epoch)
+
+    def shard(self, index, count):
+        """Records ``index, index + count, ...`` — one of ``count`` disjoint parts."""
+        return _Subset(self, self.indices()).shard(index, count)
+
+
+class _Subset:
+    """A view over selected record indices of a ``JsonlDataset``."""
+
+    def __init__(self, dataset, indices):
+        self.dataset = dataset
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.dataset[j] for j in self._indices[i]]
+        return self.dataset[self._indices[i]]
+
+    def __iter__(self):
+        for j in self._indices:
+            yield self.dataset[j]
+
+    def indices(self):
+        return self._indices
+
+    def raw(self, i):
+        return self.dataset.raw(self._indices[i])
+
+    def shuffled(self, seed, epoch=0):
+        order = list(self._indices)
+        random.Random(f"{seed}:{epoch}").shuffle(order)
+        for j in order:
+            yield self.dataset[j]
+
+    def shard(self, index, count):
+        if not 0 <= index < count:
+            raise ValueError(f"shard index {index} out of range for {count} shards")
+        return _Subset(self.dataset, self._indices[index::count])
+
+
+class _Empty:
+    """Stands in for the mmap of an empty file (``mmap`` rejects length 0)."""
+
+    def __enter__(self):
+        return b""
+
+    def __exit__(self, *exc):
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or update a JSONL offset index and read records.")
+    parser.add_argument("path")
+    parser.add_argument("--get", type=int, nargs="*", default=[], help="print these records")
+    parser.add_argument("--shard", default=None, help="print shard i/n, e.g. 0/4")
+    args = parser.parse_args(argv)
+
+    with JsonlDataset(args.path) as ds:
+        print(f"{args.path}: {len(ds)} records (index {ds.index_path})", file=sys.stderr)
+        for i in args.get:
+            print(bytes(ds.raw(i)).decode("utf-8"))
+        if args.shard:
+            index, count = (int(x) for x in args.shard.split("/"))
+            for i in range(len(part := ds.shard(index, count))):
+                print(bytes(part.raw(i)).decode("utf-8"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
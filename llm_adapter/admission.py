@@ -0,0 +1,225 @@
+"""
+Priority-aware admission control for model calls.
+
+Every LLM path (``call_llm``, ``send_to_llm``, ``query_phi_coder``,
+``OllamaPhiModel.generate``) asks the scheduler for a slot before it
+calls its backend.  Each backend has a concurrency limit; calls beyond
+it wait in one bounded queue ordered by priority class and arrival.
+
+* ``high`` calls are admitted before ``normal`` ones, ``normal`` before
+  ``low`` — a manifest with any high-priority directive maps to
+  ``high`` (see ``priority_for_manifest``).
+* When the queue is full, a new call either displaces the lowest-priority
+  waiter (if it outranks it) or is rejected immediately with
+  ``AdmissionRejected``.
+* A call with a ``deadline`` that is still waiting when the deadline
+  passes is dropped with ``DeadlineExceeded`` rather than admitted late.
+
+Callers therefore get a fast, explicit rejection under overload instead
+of every request slowing down together.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+ROUTER_BACKEND = "ollama-router:"
+
+
+class AdmissionRejected(RuntimeError):
+    """The call was not admitted (queue full, or displaced by a higher-priority call)."""
+
+
+class DeadlineExceeded(AdmissionRejected):
+    """The call's deadline passed while it was still queued."""
+
+
+def priority_for_manifest(manifest):
+    """``"high"`` if any linear directive of ``manifest`` is high priority."""
+    directives = (manifest or {}).get("linear_directives", [])
+    return "high" if any(d.get("priority") == "high" for d in directives) else "normal"
+
+
+def backend_for(host=None, router=None):
+    """Scheduler key for an Ollama endpoint.
+
+    A router is one backend keyed by its host list, so its default limit
+    scales with the number of hosts it balances over (see ``_limit``).
+    """
+    if router is not None:
+        return ROUTER_BACKEND + ",".join(h.url for h in router.hosts)
+    return f"ollama:{host or 'http://localhost:11434'}"
+
+
+class Ticket:
+    """An admitted call; ``queue_wait`` is the time spent queued, in seconds."""
+
+    __slots__ = ("backend", "priority", "deadline", "enqueued", "admitted", "state")
+
+    def __init__(self, backend, priority, deadline):
+        self.backend = backend
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.admitted = None
+        self.state = "waiting"  # waiting → admitted | rejected | expired
+
+    @property
+    def queue_wait(self):
+        return (self.admitted or time.monotonic()) - self.enqueued
+
+
+class AdmissionScheduler:
+    """Bounded priority queue with per-backend concurrency limits.
+
+    Args:
+        limits: ``{backend: max concurrent calls}``.
+        default_limit: Per-host limit for backends not listed in
+            ``limits``; a router backend gets it once per host.
+        max_queue: Calls allowed to wait across all backends.
+    """
+
+    def __init__(self, limits=None, default_limit=4, max_queue=64):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._active = {}
+        self._waiting = {}  # backend → heap of (priority rank, seq, ticket)
+        self._queued = 0
+        self._seq = itertools.count()
+        self.counters = {"admitted": 0, "rejected": 0, "shed": 0, "expired": 0}
+
+    # 🎟 Acquire / release
+    def acquire(self, backend="default", priority="normal", deadline=None):
+        """Wait for a slot on ``backend``; returns a ``Ticket``.
+
+        ``deadline`` is the number of seconds the caller is willing to
+        wait for admission; ``None`` waits indefinitely.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {tuple(PRIORITIES)}")
+        rank = PRIORITIES[priority]
+        ticket = Ticket(backend, priority, None if deadline is None else time.monotonic() + deadline)
+        with self._cond:
+            waiting = self._waiting.setdefault(backend, [])
+            if self._active.get(backend, 0) < self._limit(backend) and not waiting:
+                self._admit_locked(ticket)
+                return ticket
+            if self._queued >= self.max_queue and not self._shed_locked(rank):
+                self.counters["rejected"] += 1
+                raise AdmissionRejected(f"Admission queue full ({self.max_queue} waiting); {priority} call rejected")
+            heapq.heappush(waiting, (rank, next(self._seq), ticket))
+            self._queued += 1
+
+            while ticket.state == "waiting":
+                remaining = None if ticket.deadline is None else ticket.deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._drop_locked(ticket, "expired")
+                    break
+                self._cond.wait(remaining)
+
+        if ticket.state == "admitted":
+            return ticket
+        if ticket.state == "expired":
+            raise DeadlineExceeded(f"Deadline passed after {ticket.queue_wait:.3f}s in the {backend} queue")
+        raise AdmissionRejected(f"{priority} call on {backend} displaced by a higher-priority call")
+
+    def release(self, ticket):
+        """Return ``ticket``'s slot and admit the next waiters."""
+        with self._cond:
+            self._active[ticket.backend] -= 1
+            self._dispatch_locked(ticket.backend)
+
+    @contextmanager
+    def admit(self, backend="default", priority="normal", deadline=None):
+        """``with scheduler.admit(...) as ticket:`` around one model call."""
+        ticket = self.acquire(backend, priority, deadline)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def call(self, fn, *args, backend="default", priority="normal", deadline=None, **kwargs):
+        with self.admit(backend, priority, deadline):
+            return fn(*args, **kwargs)
+
+    # 🔧 Internals (hold self._cond)
+    def _limit(self, backend):
+        if backend in self.limits:
+            return self.limits[backend]
+        if backend.startswith(ROUTER_BACKEND):
+            return self.default_limit * (backend.count(",") + 1)
+        return self.default_limit
+
+    def _admit_locked(self, ticket):
+        ticket.state = "admitted"
+        ticket.admitted = time.monotonic()
+        self._active[ticket.backend] = self._active.get(ticket.backend, 0) + 1
+        self.counters["admitted"] += 1
+
+    def _drop_locked(self, ticket, state):
+        ticket.state = state
+        self._queued -= 1
+        self.counters["expired" if state == "expired" else "shed"] += 1
+        # Entries stay in their heap and are skipped lazily on dispatch
+
+    def _dispatch_locked(self, backend):
+        waiting = self._waiting.get(backend, [])
+        now = time.monotonic()
+        while waiting and self._active.get(backend, 0) < self._limit(backend):
+            _, _, ticket = heapq.heappop(waiting)
+            if ticket.state != "waiting":
+                continue
+            if ticket.deadline is not None and ticket.deadline <= now:
+                self._drop_locked(ticket, "expired")
+                continue
+            self._queued -= 1
+            self._admit_locked(ticket)
+        self._cond.notify_all()
+
+    def _shed_locked(self, rank):
+        """Drop the lowest-priority, newest waiter if it ranks below ``rank``."""
+        worst = None
+        for heap in self._waiting.values():
+            for entry in heap:
+                if entry[2].state == "waiting" and (worst is None or entry[:2] > worst[:2]):
+                    worst = entry
+        if worst is None or worst[0] <= rank:
+            return False
+        self._drop_locked(worst[2], "shed")
+        self._cond.notify_all()
+        return True
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": dict(self._active),
+                "queued": self._queued,
+                "max_queue": self.max_queue,
+                **self.counters,
+            }
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The process-wide scheduler used by the built-in model call paths."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = AdmissionScheduler()
+        return _default
+
+
+def configure(limits=None, default_limit=4, max_queue=64):
+    """Replace the process-wide scheduler (call before traffic starts)."""
+    global _default
+    with _default_lock:
+        _default = AdmissionScheduler(limits, default_limit, max_queue)
+        return _default
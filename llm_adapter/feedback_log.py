@@ -0,0 +1,254 @@
+"""
+Append-only feedback log for prompt/response pairs.
+
+``call_llm`` used to rewrite ``feedback_port.json`` on every call, which
+put a synchronous write on the hot path and kept only the latest pair.
+``FeedbackLog`` keeps the full history instead:
+
+* ``append`` only enqueues the record — it never touches the disk and
+  never blocks (when the queue is full the record is dropped and
+  counted);
+* a background writer drains the queue in batches, writes JSON lines to
+  the current segment, fsyncs at most every ``fsync_interval`` seconds
+  and starts a new segment once ``max_segment_bytes`` is reached;
+* ``iter_feedback`` streams the segments back in order, with cheap
+  filters (a raw substring check runs before any JSON decoding) for
+  replay and fine-tuning exports.
+
+Segments are plain JSONL files named ``feedback-00000001.jsonl``,
+``feedback-00000002.jsonl``, … so they can also be read with any tool.
+
+Usage::
+
+    python -m llm_adapter.feedback_log --contains harmonic --limit 5
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feedback")
+SEGMENT_PATTERN = re.compile(r"^feedback-(\d{8})\.jsonl$")
+
+
+def segment_name(number):
+    return f"feedback-{number:08d}.jsonl"
+
+
+def segments(directory=DEFAULT_DIR):
+    """Segment paths in ``directory``, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    numbered = sorted((int(m.group(1)), name) for name in names if (m := SEGMENT_PATTERN.match(name)))
+    return [os.path.join(directory, name) for _, name in numbered]
+
+
+def truncate_torn_tail(path, block=65536):
+    """Cut a partial last line (left by a crash mid-write) off ``path``.
+
+    Appends then start on a fresh line instead of gluing the next record
+    onto the torn one, which would lose both.
+    """
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return
+    with f:
+        size = position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            step = min(block, position)
+            f.seek(position - step)
+            nl = f.read(step).rfind(b"\n")
+            if nl >= 0:
+                position -= step - nl - 1
+                break
+            position -= step
+        if position < size:
+            f.truncate(position)
+
+
+class FeedbackLog:
+    """Background, batching writer of JSONL feedback segments.
+
+    Args:
+        directory: Where segments are written.
+        max_segment_bytes: Size at which a new segment is started.
+        batch_size: Records written per batch at most.
+        flush_interval: Seconds the writer waits to fill a batch.
+        fsync_interval: Minimum seconds between fsyncs.
+        queue_size: Records buffered before ``append`` starts dropping.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_segment_bytes=64 * 1024 * 1024, batch_size=256,
+                 flush_interval=0.5, fsync_interval=2.0, queue_size=10000):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._file = None
+        self._segment = 0
+        self._last_fsync = 0.0
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="feedback-log", daemon=True)
+        self._thread.start()
+
+    # ✍️ Hot path
+    def append(self, record):
+        """Queue ``record`` (a JSON-serialisable dict) for writing; never blocks.
+
+        Returns ``False`` if the record was dropped because the queue is full.
+        """
+        if "ts" not in record:
+            record = dict(record, ts=time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    # 🧵 Writer thread
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._maybe_fsync()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"[feedback_log] ⚠ write failed: {e}", file=sys.stderr)
+        self._close_segment()
+
+    def _write(self, batch):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+        f = self._segment_file()
+        if f.tell() and f.tell() + len(data) > self.max_segment_bytes:
+            self._close_segment()
+            self._segment += 1
+            f = self._segment_file()
+        f.write(data)
+        f.flush()
+        self.written += len(batch)
+        self._maybe_fsync()
+
+    def _segment_file(self):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            if not self._segment:
+                existing = segments(self.directory)
+                self._segment = int(SEGMENT_PATTERN.match(os.path.basename(existing[-1])).group(1)) if existing else 1
+            path = os.path.join(self.directory, segment_name(self._segment))
+            truncate_torn_tail(path)
+            self._file = open(path, "ab")
+        return self._file
+
+    def _maybe_fsync(self, force=False):
+        if self._file is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._maybe_fsync(force=True)
+            self._file.close()
+            self._file = None
+
+    def close(self, timeout=10.0):
+        """Write everything queued so far, fsync and stop the writer."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize(),
+                "segment": self._segment}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_feedback_log():
+    """The process-wide feedback log (flushed at interpreter exit)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = FeedbackLog()
+            atexit.register(_default.close)
+        return _default
+
+
+# 📖 Reader
+def iter_feedback(directory=DEFAULT_DIR, contains=None, since=None, until=None, where=None):
+    """Stream feedback records, oldest first.
+
+    Args:
+        contains: Keep records whose raw line contains this string (checked
+            before decoding, so non-matching lines cost almost nothing).
+        since, until: Keep records with ``since <= ts < until`` (Unix time).
+        where: Predicate on the decoded record.
+
+    A torn last line (from a crash mid-write) is skipped.
+    """
+    needle = None
+    if contains is not None:
+        # Match the JSON-escaped form too, so non-ASCII needles find escaped text
+        needle = (contains.encode("utf-8"), json.dumps(contains)[1:-1].encode("utf-8"))
+    for path in segments(directory):
+        with open(path, "rb") as f:
+            for line in f:
+                if needle is not None and needle[0] not in line and needle[1] not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                ts = record.get("ts", 0)
+                if since is not None and ts < since:
+                    continue
+                if until is not None and ts >= until:
+                    continue
+                if where is not None and not where(record):
+                    continue
+                yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream records from the feedback log as JSONL.")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--contains", default=None, help="only records containing this text")
+    parser.add_argument("--since", type=float, default=None, help="Unix time lower bound")
+    parser.add_argument("--until", type=float, default=None, help="Unix time upper bound")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    for n, record in enumerate(iter_feedback(args.dir, args.contains, args.since, args.until)):
+        if args.limit is not None and n >= args.limit:
+            break
+        print(json.dumps(record, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Token-budgeted rendering of bloom manifests for LLM prompts.
+
+The bloom manifest can carry many linear and recursive directives, many of
+them equivalent (same action and tag, different ``dir_i`` path).  This
+module renders a compact prompt from it:
+
+* equivalent directives are merged, keeping the strongest one and a count;
+* the top-k directives by priority and confidence (recursive directives by
+  viability and loop risk) are selected with a bounded heap in one pass;
+* lines are added in rank order until the token budget is reached, using
+  a cheap estimate by default.  A long-lived process can opt in to exact
+  counts for a model once at startup with ``use_tokenizer``; callers
+  always pass the ``model_name`` they send the prompt to, and rendering
+  itself never loads a tokenizer or touches the network.
+
+The header carries no timestamp, so identical manifests render to
+identical prompts and the server can reuse its prompt cache.
+"""
+
+import heapq
+import math
+import re
+
+MANIFEST_HEADER = "🧬 Bloom Manifest"
+DEFAULT_TOKEN_BUDGET = 1024
+
+PRIORITY_RANK = {"high": 2, "normal": 1}
+
+# Ollama model name → (ungated) HuggingFace tokenizer of the model it is built FROM;
+# other models need an explicit ``tokenizer_id`` in ``use_tokenizer``
+TOKENIZERS = {
+    "phi": "microsoft/phi-2",
+}
+
+# Counters enabled with ``use_tokenizer``, by Ollama base model name
+_counters = {}
+
+_PIECES = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+# 🔢 Token estimation
+def approx_tokens(text):
+    """Rough BPE-style token estimate.
+
+    ASCII pieces cost about one token per four characters; non-ASCII
+    glyphs (Φ, Ψ, emoji) usually cost at least one token each.
+    """
+    total = 0
+    for piece in _PIECES.findall(text):
+        total += math.ceil(len(piece) / 4) if piece.isascii() else len(piece)
+    return total
+
+
+def _base_model(model_name):
+    return model_name.split(":", 1)[0]
+
+
+def tokenizer_name(model_name):
+    """HuggingFace tokenizer id for an Ollama ``model_name`` (``name:tag``); other names pass through."""
+    return TOKENIZERS.get(_base_model(model_name), model_name)
+
+
+def use_tokenizer(model_name, tokenizer_id=None, local_files_only=True):
+    """Count ``model_name``'s prompt tokens with its HuggingFace tokenizer from now on.
+
+    Call once at startup (e.g. ``harmonic_daemon serve --tokenizer``).
+    By default only a tokenizer already in the local HuggingFace cache is
+    used, so this never waits on the Hub.  Returns whether the tokenizer
+    was loaded; on failure ``model_name`` keeps the ``approx_tokens``
+    estimate.
+    """
+    try:
+        from transformers import AutoTokenizer  # type: ignore
+
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_id or tokenizer_name(model_name),
+                                                  local_files_only=local_files_only)
+    except Exception:
+        return False
+    _counters[_base_model(model_name)] = lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    return True
+
+
+def token_counter(model_name=None):
+    """Return a ``text -> token count`` function for ``model_name``.
+
+    The tokenizer enabled with ``use_tokenizer`` for that model, else
+    ``approx_tokens``.  Never loads anything.
+    """
+    if model_name:
+        return _counters.get(_base_model(model_name), approx_tokens)
+    return approx_tokens
+
+
+# 🧹 Deduplication and ranking
+def _top_k(items, key, k):
+    """Best ``k`` items by ``key`` using a bounded min-heap; ties keep input order."""
+    heap = []
+    for seq, item in enumerate(items):
+        entry = (key(item), -seq, item)
+        if k is None or len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heappushpop(heap, entry)
+    return [item for _, _, item in sorted(heap, key=lambda e: e[:2], reverse=True)]
+
+
+def _dedupe(directives, key, strength):
+    """Merge equivalent directives, keeping the strongest and counting the rest."""
+    merged = {}
+    for d in directives:
+        k = key(d)
+        if k in merged:
+            best, count = merged[k]
+            merged[k] = (d if strength(d) > strength(best) else best, count + 1)
+        else:
+            merged[k] = (d, 1)
+    return list(merged.values())
+
+
+def _linear_strength(d):
+    return (PRIORITY_RANK.get(d.get("priority"), 0), d.get("confidence") or 0)
+
+
+def _recursive_strength(d):
+    return (d.get("viability") or 0, -(d.get("loop_risk") or 0))
+
+
+def linear_directives(manifest, top_k=None):
+    """Deduplicated ``(directive, count)`` pairs, strongest first."""
+    merged = _dedupe(
+        manifest.get("linear_directives", []),
+        key=lambda d: (d.get("action"), d.get("tag"), d.get("priority")),
+        strength=_linear_strength,
+    )
+    return _top_k(merged, key=lambda pair: _linear_strength(pair[0]), k=top_k)
+
+
+def recursive_directives(manifest, top_k=None):
+    """Deduplicated ``(directive, count)`` pairs, most viable first."""
+    merged = _dedupe(
+        manifest.get("recursive_directives", []),
+        key=lambda d: (d.get("symbol"), d.get("type"), d.get("origin"), d.get("containment")),
+        strength=_recursive_strength,
+    )
+    return _top_k(merged, key=lambda pair: _recursive_strength(pair[0]), k=top_k)
+
+
+# 📝 Rendering
+def linear_line(d, count=1):
+    """One linear directive; merged duplicates show the strongest one's ``path``."""
+    where = f"{d['tag']} @ {d['path']}" if d.get("path") else d["tag"]
+    line = f"- [{d['priority']}] {d['action']} ({where}) conf={d['confidence']}"
+    return line + (f" ×{count}" if count > 1 else "")
+
+
+def recursive_line(d, count=1):
+    line = f"~ {d['symbol']} {d['type']} w={d['window']} v={d['viability']} risk={d['loop_risk']}"
+    if d.get("containment") and d["containment"] != "none":
+        line += f" {d['containment']}"
+    return line + (f" ×{count}" if count > 1 else "")
+
+
+def manifest_lines(manifest, token_budget=None, top_k=None, count_tokens=approx_tokens,
+                   include_recursive=True):
+    """Ranked, deduplicated directive lines that fit ``token_budget`` tokens.
+
+    Linear directives come first, then recursive ones.  When lines are
+    dropped for budget, a final ``… +N more`` line is added if it fits.
+    """
+    candidates = [linear_line(d, n) for d, n in linear_directives(manifest, top_k)]
+    if include_recursive:
+        candidates += [recursive_line(d, n) for d, n in recursive_directives(manifest, top_k)]
+    if token_budget is None:
+        return candidates
+
+    lines, used = [], 0
+    for line in candidates:
+        cost = count_tokens(line) + 1  # newline
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    omitted = len(candidates) - len(lines)
+    if omitted:
+        note = f"… +{omitted} more"
+        if used + count_tokens(note) + 1 <= token_budget:
+            lines.append(note)
+    return lines
+
+
+def manifest_header(manifest):
+    sync = manifest.get("harmonic_sync")
+    return MANIFEST_HEADER if sync is None else f"{MANIFEST_HEADER} · sync={sync}"
+
+
+def body_budget(header, token_budget, count_tokens=approx_tokens):
+    """Tokens left for directive lines once ``header`` (and its newline) is paid for."""
+    return None if token_budget is None else max(0, token_budget - count_tokens(header) - 1)
+
+
+def render_manifest(manifest, token_budget=DEFAULT_TOKEN_BUDGET, top_k=None, model_name=None,
+                    include_recursive=True):
+    """Render ``manifest`` as a compact prompt within ``token_budget`` tokens of ``model_name``."""
+    count_tokens = token_counter(model_name)
+    header = manifest_header(manifest)
+    lines = manifest_lines(manifest, body_budget(header, token_budget, count_tokens), top_k, count_tokens,
+                           include_recursive)
+    return "\n".join([header] + lines)
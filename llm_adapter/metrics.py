@@ -0,0 +1,31 @@
+"""
+Latency summary helpers shared by the batch and model-call paths.
+
+Everything here is plain Python so it can be imported from hot paths
+without pulling in numpy or any model dependency.
+"""
+
+import math
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile ``q`` (0–100) of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(latencies_ms):
+    """Summarise a collection of latencies (milliseconds) into percentiles."""
+    ordered = sorted(latencies_ms)
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean_ms": round(sum(ordered) / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p90_ms": round(percentile(ordered, 90), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if count else 0.0,
+    }
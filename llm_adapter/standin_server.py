@@ -0,0 +1,259 @@
+"""
+Local stand-in for the Ollama HTTP API.
+
+Serves ``/api/chat`` and ``/api/generate`` (streaming NDJSON or a single
+JSON body), ``/api/tags`` and ``/api/version`` with the same response
+shape as Ollama, including the ``prompt_eval_count`` / ``eval_count`` /
+``*_duration`` metadata, so every model path in this repo (the ``ollama``
+client, ``OllamaRouter``, telemetry) can run end to end without a model.
+
+Timing is simulated: each request waits a time-to-first-token sampled
+from the configured latency distribution, then emits ``response_tokens``
+tokens at ``tokens_per_s``.  A fraction ``error_rate`` of requests fails
+with ``error_status`` instead.
+
+Usage::
+
+    python -m llm_adapter.standin_server --port 11434 --latency-ms 150 --tokens-per-s 40
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class StandinConfig:
+    """Simulated model behaviour.
+
+    Attributes:
+        latency_ms: Mean time to first token.
+        latency_dist: One of ``LATENCY_DISTRIBUTIONS``.
+        jitter: Spread of the distribution — half-width for ``uniform``
+            and sigma for ``lognormal`` (as a fraction of ``latency_ms``).
+        tokens_per_s: Generation rate after the first token (0 = instant).
+        response_tokens: Tokens per reply.
+        error_rate: Fraction of requests that fail.
+        error_status: HTTP status used for injected failures.
+        seed: Seed for the latency and error draws.
+    """
+
+    latency_ms: float = 100.0
+    latency_dist: str = "lognormal"
+    jitter: float = 0.5
+    tokens_per_s: float = 50.0
+    response_tokens: int = 32
+    error_rate: float = 0.0
+    error_status: int = 500
+    seed: int | None = None
+
+
+class StandinServer:
+    """Threaded stand-in Ollama server; use as a context manager or ``start``/``stop``."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or StandinConfig()
+        if self.config.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ollama-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # 🎲 Simulation
+    def _draw(self):
+        """Return ``(ttft_seconds, fail)`` for one request."""
+        cfg = self.config
+        mean = cfg.latency_ms / 1000.0
+        with self._rng_lock:
+            self.requests += 1
+            if cfg.latency_dist == "fixed":
+                ttft = mean
+            elif cfg.latency_dist == "uniform":
+                ttft = self._rng.uniform(mean * (1 - cfg.jitter), mean * (1 + cfg.jitter))
+            elif cfg.latency_dist == "exponential":
+                ttft = self._rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+            else:
+                # Lognormal with the requested mean: mu = ln(mean) - sigma²/2
+                sigma = cfg.jitter
+                ttft = self._rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma) if mean > 0 else 0.0
+            fail = self._rng.random() < cfg.error_rate
+            if fail:
+                self.errors += 1
+        return max(0.0, ttft), fail
+
+    def _reply_tokens(self, prompt):
+        words = prompt.split()[:8] or ["…"]
+        base = ["stand-in", "reply", "to:"] + words
+        return [base[i % len(base)] + " " for i in range(self.config.response_tokens)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-standin"})
+                elif self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "phi:latest", "model": "phi:latest", "size": 0}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": "invalid JSON"})
+                    return
+                chat = self.path == "/api/chat"
+                if chat:
+                    messages = request.get("messages") or [{}]
+                    prompt = messages[-1].get("content", "")
+                else:
+                    prompt = request.get("prompt", "")
+                ttft, fail = server._draw()
+                started = time.perf_counter()
+                time.sleep(ttft)
+                if fail:
+                    self._send_json(server.config.error_status, {"error": "injected failure"})
+                    return
+
+                tokens = server._reply_tokens(prompt)
+                rate = server.config.tokens_per_s
+                prompt_tokens = max(1, len(prompt.split()))
+                meta = {
+                    "model": request.get("model", "phi"),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }
+
+                def piece(text, done=False):
+                    chunk = dict(meta, done=done)
+                    if chat:
+                        chunk["message"] = {"role": "assistant", "content": text}
+                    else:
+                        chunk["response"] = text
+                    return chunk
+
+                def final(text):
+                    chunk = piece(text, done=True)
+                    chunk.update(
+                        done_reason="stop",
+                        total_duration=int((time.perf_counter() - started) * 1e9),
+                        load_duration=0,
+                        prompt_eval_count=prompt_tokens,
+                        prompt_eval_duration=int(ttft * 1e9),
+                        eval_count=len(tokens),
+                        eval_duration=int(len(tokens) / rate * 1e9) if rate else 0,
+                    )
+                    if not chat:
+                        chunk["context"] = list(request.get("context") or []) + list(range(prompt_tokens + len(tokens)))
+                    return chunk
+
+                if request.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    try:
+                        for token in tokens:
+                            self._write_chunk(piece(token))
+                            if rate:
+                                time.sleep(1.0 / rate)
+                        self._write_chunk(final(""))
+                        self.wfile.write(b"0\r\n\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass
+                else:
+                    if rate:
+                        time.sleep(len(tokens) / rate)
+                    self._send_json(200, final("".join(tokens)))
+
+            def _write_chunk(self, payload):
+                data = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a stand-in Ollama API with simulated latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="mean time to first token")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--tokens-per-s", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=32)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = StandinConfig(
+        latency_ms=args.latency_ms, latency_dist=args.latency_dist, jitter=args.jitter,
+        tokens_per_s=args.tokens_per_s, response_tokens=args.response_tokens,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+    )
+    server = StandinServer(config, args.host, args.port)
+    print(f"[standin] 🧪 Ollama stand-in on {server.url}", file=sys.stderr)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Per-call telemetry for the model paths.
+
+Every call through ``query_phi_coder``, ``stream_phi_coder``,
+``OllamaPhiModel.generate``, ``call_llm`` and ``send_to_llm`` produces a
+``CallRecord``: queue wait (from the admission ticket), time to first
+token, total time and — where the server reports them — prompt/eval
+token counts and durations from the Ollama response metadata.  Subprocess
+paths only see stdout, so their records carry timings but no token counts.
+
+Records are aggregated per ``(model, host)`` into rolling windows (the
+last ``window`` calls, no older than ``max_age`` seconds) and summarised
+into percentiles on demand:
+
+* ``get_telemetry().snapshot()`` for in-process use;
+* ``serve_metrics(port)`` for a Prometheus text endpoint on ``/metrics``
+  (``/metrics.json`` returns the snapshot).
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+from llm_adapter.metrics import latency_summary
+
+_NS = 1e9
+
+
+@dataclass
+class CallRecord:
+    """Timings (seconds) and token counts for one model call."""
+
+    model: str
+    host: str
+    kind: str  # chat | generate | cli
+    started: float = field(default_factory=time.time)
+    queue_wait: float = 0.0
+    ttft: float | None = None
+    total: float | None = None
+    load: float | None = None
+    prompt_eval_count: int | None = None
+    prompt_eval: float | None = None
+    eval_count: int | None = None
+    eval: float | None = None
+    ok: bool = True
+    error: str | None = None
+
+    @property
+    def tokens_per_s(self):
+        if self.eval_count and self.eval:
+            return self.eval_count / self.eval
+        return None
+
+    def as_dict(self):
+        return dict(asdict(self), tokens_per_s=self.tokens_per_s)
+
+
+def _meta(response, key):
+    """Read ``key`` from a dict response or an ``ollama`` response object."""
+    if response is None:
+        return None
+    if isinstance(response, dict):
+        return response.get(key)
+    return getattr(response, key, None)
+
+
+class CallTimer:
+    """Collects one ``CallRecord``; see ``Telemetry.track``."""
+
+    def __init__(self, record):
+        self.record = record
+        self._t0 = time.perf_counter()
+
+    def first_token(self):
+        """Mark the first streamed token (only the first call counts)."""
+        if self.record.ttft is None:
+            self.record.ttft = time.perf_counter() - self._t0
+
+    def response(self, response):
+        """Take token counts and durations from an Ollama response (or final stream chunk)."""
+        rec = self.record
+        routed = _meta(response, "routed_host")
+        if routed:
+            rec.host = routed
+        for attr, key in (("load", "load_duration"), ("prompt_eval", "prompt_eval_duration"),
+                          ("eval", "eval_duration")):
+            value = _meta(response, key)
+            if value is not None:
+                setattr(rec, attr, value / _NS)
+        for attr in ("prompt_eval_count", "eval_count"):
+            value = _meta(response, attr)
+            if value is not None:
+                setattr(rec, attr, value)
+        if rec.ttft is None and rec.prompt_eval is not None:
+            # Non-streaming: the first token follows model load and prompt evaluation
+            rec.ttft = (rec.load or 0.0) + rec.prompt_eval
+
+
+class Telemetry:
+    """Rolling per-``(model, host)`` windows of ``CallRecord``.
+
+    Args:
+        window: Calls kept per key.
+        max_age: Seconds after which a record drops out of the summaries.
+    """
+
+    def __init__(self, window=1024, max_age=300.0):
+        self.window = window
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._records = {}
+        self._totals = {}
+
+    @contextmanager
+    def track(self, model, host, kind, queue_wait=0.0):
+        """``with telemetry.track(...) as call:`` around one model call.
+
+        Exceptions are recorded as failed calls and re-raised.
+        """
+        timer = CallTimer(CallRecord(model=model, host=host, kind=kind, queue_wait=queue_wait))
+        try:
+            yield timer
+        except BaseException as e:
+            timer.record.ok = False
+            timer.record.error = type(e).__name__
+            raise
+        finally:
+            timer.record.total = time.perf_counter() - timer._t0
+            self.record(timer.record)
+
+    def record(self, rec):
+        key = (rec.model, rec.host)
+        with self._lock:
+            records = self._records.get(key)
+            if records is None:
+                records = self._records[key] = deque(maxlen=self.window)
+                self._totals[key] = {"calls": 0, "errors": 0, "prompt_tokens": 0, "eval_tokens": 0}
+            records.append(rec)
+            totals = self._totals[key]
+            totals["calls"] += 1
+            totals["errors"] += 0 if rec.ok else 1
+            totals["prompt_tokens"] += rec.prompt_eval_count or 0
+            totals["eval_tokens"] += rec.eval_count or 0
+
+    def recent(self, model=None, host=None):
+        """Records still inside the window, oldest first."""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            return [rec for (m, h), records in self._records.items()
+                    if (model is None or m == model) and (host is None or h == host)
+                    for rec in records if rec.started >= cutoff]
+
+    def snapshot(self):
+        """``{"model@host": {...}}`` with lifetime totals and windowed percentiles."""
+        with self._lock:
+            keys = list(self._records)
+            totals = {key: dict(value) for key, value in self._totals.items()}
+        out = {}
+        for model, host in keys:
+            recs = self.recent(model, host)
+            out[f"{model}@{host}"] = dict(
+                totals[(model, host)],
+                model=model,
+                host=host,
+                window=len(recs),
+                queue_wait_ms=_summary(r.queue_wait for r in recs),
+                ttft_ms=_summary(r.ttft for r in recs),
+                total_ms=_summary(r.total for r in recs),
+                tokens_per_s=_summary((r.tokens_per_s for r in recs), scale=1.0),
+            )
+        return out
+
+    def prometheus_text(self):
+        """The snapshot in Prometheus exposition format."""
+        lines = []
+        snapshot = self.snapshot()
+        for name, help_text in (("calls", "Model calls"), ("errors", "Failed model calls"),
+                                ("prompt_tokens", "Prompt tokens evaluated"),
+                                ("eval_tokens", "Tokens generated")):
+            lines += [f"# HELP phi_llm_{name}_total {help_text}.", f"# TYPE phi_llm_{name}_total counter"]
+            lines += [f"phi_llm_{name}_total{_labels(s)} {s[name]}" for s in snapshot.values()]
+        for name, help_text in (("queue_wait_ms", "Admission queue wait"), ("ttft_ms", "Time to first token"),
+                                ("total_ms", "Call duration"), ("tokens_per_s", "Generation rate")):
+            lines += [f"# HELP phi_llm_{name} {help_text} (rolling window).", f"# TYPE phi_llm_{name} summary"]
+            for s in snapshot.values():
+                summary = s[name]
+                for q in ("50", "90", "95", "99"):
+                    lines.append(f'phi_llm_{name}{_labels(s, quantile="0.{q}")} {summary[f"p{q}"]}')
+                lines.append(f"phi_llm_{name}_count{_labels(s)} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+
+def _summary(values, scale=1000.0):
+    """Percentiles of ``values`` (seconds × ``scale``), keyed without units."""
+    summary = latency_summary([v * scale for v in values if v is not None])
+    return {key.removesuffix("_ms"): value for key, value in summary.items()}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(s, **extra):
+    labels = dict(model=s["model"], host=s["host"], **extra)
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+_default = Telemetry()
+
+
+def get_telemetry():
+    """The process-wide telemetry used by the built-in model call paths."""
+    return _default
+
+
+# 📈 Metrics endpoint
+def serve_metrics(port=9464, host="127.0.0.1", telemetry=None):
+    """Serve ``/metrics`` (Prometheus) and ``/metrics.json`` from a daemon thread.
+
+    Returns the server; call ``shutdown()`` on it to stop.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    telemetry = telemetry or _default
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, ctype = telemetry.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, ctype = json.dumps(telemetry.snapshot(), ensure_ascii=False).encode("utf-8"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="phi-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,192 @@
+"""
+loadtest.py
+===========
+
+End-to-end load test of the prompt → bloom → LLM paths against the
+bundled Ollama stand-in (``llm_adapter.standin_server``), or against a
+real host with ``--host``.
+
+For each concurrency level the driver sends ``--requests`` prompts
+through each target and reports throughput and latency percentiles:
+
+* ``bridge`` — ``PhiBloomBridge.process`` with ``OllamaPhiModel`` and a
+  pass-through BLOOM stage (no transformers needed);
+* ``phi`` — ``generate_bloom_manifest`` + ``query_phi_coder`` through an
+  ``OllamaRouter``;
+* ``batch`` — ``bloom_batch.run_batch`` over a temporary JSONL.
+
+The admission scheduler is sized to the highest concurrency level unless
+``--admission-limit`` is given, so the sweep measures the server rather
+than the default per-backend limit.
+
+Usage::
+
+    python loadtest.py --concurrency 1 4 16 --requests 64 --latency-ms 120
+    python loadtest.py --targets phi --host http://localhost:11434 --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_adapter.metrics import latency_summary
+
+TARGETS = ("bridge", "phi", "batch")
+
+
+def load_prompts(path, count):
+    """``count`` prompts, cycling through ``path`` (any bloom_batch input) if given."""
+    if path:
+        from bloom_batch import extract_prompt, iter_records
+
+        base = [p for _, r in iter_records(path) if (p := extract_prompt(r))]
+    else:
+        base = [f"build a harmonic clock variant {i}" for i in range(16)]
+    if not base:
+        raise ValueError(f"No prompts found in {path}")
+    return [base[i % len(base)] for i in range(count)]
+
+
+def run_level(call, prompts, concurrency):
+    """Send every prompt through ``call`` with ``concurrency`` workers."""
+    latencies = []
+    errors = 0
+
+    def timed(prompt):
+        started = time.perf_counter()
+        try:
+            call(prompt)
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - started) * 1000.0, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, ok in pool.map(timed, prompts):
+            latencies.append(latency)
+            errors += 0 if ok else 1
+    elapsed = time.perf_counter() - started
+    stats = {
+        "processed": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    stats.update(latency_summary(latencies))
+    return stats
+
+
+def make_bridge(router, model_name):
+    from phi_bloom_bridge import BloomModelInterface, OllamaPhiModel, PhiBloomBridge
+
+    class PassthroughBloom(BloomModelInterface):
+        """BLOOM stage that returns its input, so only the Phi path is measured."""
+
+        def generate_from_manifest(self, manifest, max_new_tokens=128):
+            return manifest
+
+    return PhiBloomBridge(bloom=PassthroughBloom(), phi=OllamaPhiModel(model_name=model_name, router=router))
+
+
+def run_batch_level(prompts, concurrency, router, model_name):
+    from bloom_batch import run_batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "prompts.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for prompt in prompts:
+                f.write(json.dumps({"prompt": prompt}) + "\n")
+        stats = run_batch(input_path, os.path.join(tmp, "out.jsonl"), concurrency=concurrency,
+                          model_name=model_name, router=router, restart=True)
+    stats.pop("resumed_from", None)
+    return stats
+
+
+def sweep(targets, levels, prompts, host, model_name="phi"):
+    """Run every target at every concurrency level against ``host``; returns rows."""
+    from HARMONIC_AI_001 import generate_bloom_manifest, query_phi_coder
+    from llm_adapter.router import OllamaRouter
+
+    router = OllamaRouter([host], health_interval=None)
+    rows = []
+    try:
+        for target in targets:
+            for level in levels:
+                if target == "batch":
+                    stats = run_batch_level(prompts, level, router, model_name)
+                elif target == "bridge":
+                    bridge = make_bridge(router, model_name)
+                    stats = run_level(bridge.process, prompts, level)
+                else:
+                    stats = run_level(
+                        lambda p: query_phi_coder(generate_bloom_manifest(p), model_name=model_name, router=router),
+                        prompts, level,
+                    )
+                rows.append(dict(stats, target=target, concurrency=level))
+                print(f"  {target:<7} c={level:<4} {stats['throughput_per_s']:>9.2f}/s  "
+                      f"p50={stats['p50_ms']:.1f} p95={stats['p95_ms']:.1f} p99={stats['p99_ms']:.1f} ms  "
+                      f"errors={stats['errors']}", file=sys.stderr)
+    finally:
+        router.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep concurrency over the bloom → LLM paths.")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("-c", "--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("-n", "--requests", type=int, default=64, help="prompts per level")
+    parser.add_argument("--prompts", default=None, help="JSONL of prompts (defaults to synthetic ones)")
+    parser.add_argument("--model", default="phi")
+    parser.add_argument("--host", default=None, help="real Ollama host; omit to start the stand-in")
+    parser.add_argument("--admission-limit", type=int, default=None,
+                        help="per-host admission limit (defaults to the highest level)")
+    parser.add_argument("--json", default=None, help="write the report rows to this file")
+    standin = parser.add_argument_group("stand-in server")
+    standin.add_argument("--latency-ms", type=float, default=100.0)
+    standin.add_argument("--latency-dist", default="lognormal")
+    standin.add_argument("--jitter", type=float, default=0.5)
+    standin.add_argument("--tokens-per-s", type=float, default=200.0)
+    standin.add_argument("--response-tokens", type=int, default=32)
+    standin.add_argument("--error-rate", type=float, default=0.0)
+    standin.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from llm_adapter import admission
+
+    levels = sorted(set(args.concurrency))
+    limit = args.admission_limit or max(levels)
+    admission.configure(default_limit=limit, max_queue=max(64, args.requests))
+    prompts = load_prompts(args.prompts, args.requests)
+
+    server = None
+    host = args.host
+    if host is None:
+        from llm_adapter.standin_server import StandinConfig, StandinServer
+
+        server = StandinServer(StandinConfig(
+            latency_ms=args.latency_ms, latency_dist=args.latency_dist, jitter=args.jitter,
+            tokens_per_s=args.tokens_per_s, response_tokens=args.response_tokens,
+            error_rate=args.error_rate, seed=args.seed,
+        )).start()
+        host = server.url
+    print(f"\n🧪 Load test against {host} ({args.requests} prompts per level)", file=sys.stderr)
+    try:
+        rows = sweep(args.targets, levels, prompts, host, args.model)
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
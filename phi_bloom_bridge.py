@@ -45,17 +45,26 @@ Usage example:
 
 from __future__ import annotations
 
+import difflib
+import itertools
 import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Sequence
 
-try:
-    # Import within try/except so that this module can be imported
-    # even if ollama is not installed.  The default implementation
-    # will raise if used without the dependency.
-    from ollama import chat as ollama_chat
-except ImportError:  # pragma: no cover -- handled at runtime
-    ollama_chat = None  # type: ignore
+from bloom_inference import PrefixKVCache, load_cpu_model
+from llm_adapter.admission import backend_for, get_scheduler
+from llm_adapter.manifest_render import MANIFEST_HEADER
+from llm_adapter.sessions import SessionStore, session_generate
+from llm_adapter.telemetry import get_telemetry
+
+# What the bridge puts in front of Phi's output before handing it to BLOOM;
+# registered as a cached prefix, so every bridged call reuses its KV state
+BLOOM_INPUT_PREFIX = f"{MANIFEST_HEADER}\n"
 
 
 @dataclass
@@ -66,10 +75,73 @@ class BloomModelInterface:
     (e.g. from the Φπε field or Phi‑Coder) into execution‑ready
     manifests.  Concrete implementations should override
     ``generate_from_manifest``.
+
+    Inputs starting with one of ``prefixes`` (by default the bloom
+    manifest header, alone and as ``BLOOM_INPUT_PREFIX`` which
+    ``PhiBloomBridge`` puts in front of every Phi output) reuse that
+    prefix's cached ``past_key_values`` instead of recomputing it; see
+    ``bloom_inference.PrefixKVCache``.
+    Set ``prefix_cache_bytes`` to 0 to disable the cache.
+
+    ``inference_mode`` selects how weights are held on CPU: ``"fp32"``
+    (default), ``"mmap"`` (copy-on-write mapped safetensors shared across
+    forked workers) or ``"int8"`` (mmap plus dynamic int8 linears);
+    ``num_threads`` pins torch's thread pool for this worker.
+
+    ``max_length`` (prompt plus continuation), ``do_sample`` and
+    ``temperature`` are the generation settings of both
+    ``generate_from_manifest`` and, unless overridden per call,
+    ``generate_batch``.
     """
 
     # Optionally pass model configuration
     model_name: str = field(default="bigscience/bloom-560m")
+    inference_mode: str = field(default="fp32")
+    num_threads: int | None = field(default=None)
+    prefixes: List[str] = field(default_factory=lambda: [BLOOM_INPUT_PREFIX, MANIFEST_HEADER])
+    prefix_cache_bytes: int = field(default=256 * 2**20)
+    max_length: int = field(default=256)
+    do_sample: bool = field(default=True)
+    temperature: float = field(default=0.7)
+    # Loaded on first use and kept resident for the lifetime of the instance
+    _tokenizer: Any = field(init=False, default=None, repr=False)
+    _model: Any = field(init=False, default=None, repr=False)
+    _prefix_cache: PrefixKVCache | None = field(init=False, default=None, repr=False)
+
+    def load(self) -> None:
+        """Load the tokenizer and model once; later calls are no-ops.
+
+        Long-lived processes (the daemon, batch runs) can call this up
+        front so the first request does not pay the model load.
+        """
+        if self._model is not None:
+            return
+        try:
+            import transformers  # type: ignore  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "transformers and torch must be installed to use the default BLOOM model"
+            ) from e
+        self._model, self._tokenizer = load_cpu_model(
+            self.model_name, self.inference_mode, self.num_threads
+        )
+
+    @property
+    def prefix_cache(self) -> PrefixKVCache | None:
+        """The prefix KV cache, built (and its prefixes computed) on first use."""
+        if self._prefix_cache is None and self.prefix_cache_bytes > 0:
+            self.load()
+            self._prefix_cache = PrefixKVCache(self._model, self._tokenizer, self.prefix_cache_bytes)
+            for prefix in self.prefixes:
+                self._prefix_cache.register(prefix)
+        return self._prefix_cache
+
+    def register_prefix(self, prefix: str) -> None:
+        """Add a common prefix (e.g. system instructions) to the KV cache."""
+        if prefix not in self.prefixes:
+            self.prefixes.append(prefix)
+        if self._prefix_cache is not None:
+            self._prefix_cache.register(prefix)
 
     def generate_from_manifest(self, manifest: str) -> str:
         """Generate a response from a manifest string.
@@ -79,7 +151,6 @@ class BloomModelInterface:
         different BLOOM engine or requires bespoke logic.
         """
         try:
-            from transformers import AutoTokenizer, AutoModelForCausalLM  # type: ignore
             import torch  # type: ignore
         except ImportError as e:
             raise RuntimeError(
@@ -87,17 +158,162 @@ class BloomModelInterface:
             ) from e
 
         # Lazy load model/tokenizer to avoid heavy initialisation on import
-        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        model = AutoModelForCausalLM.from_pretrained(self.model_name)
-        inputs = tokenizer.encode(manifest, return_tensors="pt")
+        self.load()
+        tokenizer, model = self._tokenizer, self._model
+        cache = self.prefix_cache
+        if cache is not None:
+            # Start from the cached state of a shared prefix when there is one
+            inputs, _ = cache.prepare(manifest)
+        else:
+            inputs = {"inputs": tokenizer.encode(manifest, return_tensors="pt")}
         # Generate a continuation; adjust parameters as needed
         with torch.no_grad():
             outputs = model.generate(
-                inputs, max_length=256, do_sample=True, temperature=0.7
+                **inputs, max_length=self.max_length, do_sample=self.do_sample,
+                temperature=self.temperature
             )
         decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
         return decoded
 
+    @classmethod
+    def from_components(cls, model: Any, tokenizer: Any, **kwargs: Any) -> "BloomModelInterface":
+        """Wrap an already constructed model/tokenizer pair.
+
+        Useful for tests and benchmarks, e.g. a tiny randomly initialised
+        ``BloomForCausalLM(BloomConfig(n_layer=2, hidden_size=64))``.
+        """
+        instance = cls(**kwargs)
+        instance._model = model
+        instance._tokenizer = tokenizer
+        return instance
+
+    def generate_batch(
+        self,
+        manifests: Sequence[str],
+        max_new_tokens: int | Sequence[int] | None = None,
+        stop: Sequence[str] | None = None,
+        do_sample: bool | None = None,
+        temperature: float | None = None,
+    ) -> List[str]:
+        """Generate continuations for several manifests in one forward pass.
+
+        Inputs are left-padded to a common length so every row's prompt
+        ends at the same position.  Each row stops independently on EOS,
+        on any of the ``stop`` strings, or on its own ``max_new_tokens``
+        (an int for all rows or one value per row); the batch finishes
+        when every row has stopped.
+
+        Settings left as ``None`` come from the instance, as in
+        ``generate_from_manifest``: each row may then grow to
+        ``max_length`` tokens including its prompt.
+
+        Returns one string per manifest, in input order, in the same shape
+        as ``generate_from_manifest`` (prompt followed by continuation).
+        """
+        if not manifests:
+            return []
+        try:
+            import torch  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "transformers and torch must be installed to use the default BLOOM model"
+            ) from e
+
+        self.load()
+        tokenizer, model = self._tokenizer, self._model
+
+        with _left_padding(tokenizer):
+            encoded = tokenizer(list(manifests), return_tensors="pt", padding=True)
+            pad_token_id = tokenizer.pad_token_id
+        prompt_len = encoded["input_ids"].shape[1]
+
+        if max_new_tokens is None:
+            limits = [max(0, self.max_length - int(n)) for n in encoded["attention_mask"].sum(dim=1)]
+        elif isinstance(max_new_tokens, int):
+            limits = [max_new_tokens] * len(manifests)
+        else:
+            limits = list(max_new_tokens)
+        if len(limits) != len(manifests):
+            raise ValueError("max_new_tokens must be an int or one value per manifest")
+        do_sample = self.do_sample if do_sample is None else do_sample
+        temperature = self.temperature if temperature is None else temperature
+        criteria = _batch_stopping_criteria(tokenizer, prompt_len, limits, stop)
+
+        with torch.no_grad():
+            outputs = model.generate(
+                **encoded,
+                max_new_tokens=max(max(limits), 1),
+                do_sample=do_sample,
+                temperature=temperature,
+                pad_token_id=pad_token_id,
+                stopping_criteria=criteria,
+            )
+
+        results = []
+        for row, limit in enumerate(limits):
+            prompt_ids = encoded["input_ids"][row][encoded["attention_mask"][row].bool()]
+            prompt = tokenizer.decode(prompt_ids, skip_special_tokens=True)
+            # Decode prompt and continuation together, as generate_from_manifest does,
+            # so tokenizers that space tokens on decode join them the same way
+            text = tokenizer.decode(
+                torch.cat([prompt_ids, outputs[row, prompt_len:prompt_len + limit]]),
+                skip_special_tokens=True,
+            )
+            continuation = text[len(prompt):] if text.startswith(prompt) else tokenizer.decode(
+                outputs[row, prompt_len:prompt_len + limit], skip_special_tokens=True
+            )
+            results.append(prompt + _truncate_at_stop(continuation, stop))
+        return results
+
+
+@contextmanager
+def _left_padding(tokenizer: Any):
+    """Left-pad (with EOS if there is no pad token) for one call, then restore the shared tokenizer."""
+    padding_side, pad_token = tokenizer.padding_side, tokenizer.pad_token
+    tokenizer.padding_side = "left"
+    if pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    try:
+        yield tokenizer
+    finally:
+        tokenizer.padding_side = padding_side
+        if pad_token is None:
+            tokenizer.pad_token = None
+
+
+def _truncate_at_stop(text: str, stop: Sequence[str] | None) -> str:
+    """Cut ``text`` at the earliest occurrence of any stop string."""
+    cut = len(text)
+    for marker in stop or ():
+        index = text.find(marker)
+        if index != -1:
+            cut = min(cut, index)
+    return text[:cut]
+
+
+def _batch_stopping_criteria(tokenizer: Any, prompt_len: int, limits: List[int],
+                             stop: Sequence[str] | None) -> Any:
+    """Per-row stopping criteria for ``generate_batch``.
+
+    Returns a ``StoppingCriteriaList`` whose criterion reports, for each
+    row, whether it has hit its own token limit or produced a stop string.
+    """
+    import torch  # type: ignore
+    from transformers import StoppingCriteria, StoppingCriteriaList  # type: ignore
+
+    class _PerRowStop(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            generated = input_ids.shape[1] - prompt_len
+            done = torch.tensor([generated >= limit for limit in limits], device=input_ids.device)
+            if stop:
+                for row in range(input_ids.shape[0]):
+                    if not done[row]:
+                        tail = tokenizer.decode(input_ids[row, prompt_len:], skip_special_tokens=True)
+                        done[row] = any(marker in tail for marker in stop)
+            return done
+
+    return StoppingCriteriaList([_PerRowStop()])
+
 
 @dataclass
 class PhiModelInterface:
@@ -107,7 +323,7 @@ class PhiModelInterface:
     NLP responses for a given prompt.
     """
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, session_id: str | None = None) -> str:
         raise NotImplementedError
 
 
@@ -122,26 +338,75 @@ class OllamaPhiModel(PhiModelInterface):
             alignment with Φπε logic or recursion constraints).
         host: Host URL of the running Ollama server (defaults to
             ``http://localhost:11434``).
+        sessions: Store of per-session Ollama context.  Calls that pass a
+            ``session_id`` continue that session on the server's KV cache
+            instead of re-sending the system prompt and prior turns.
+        keep_alive: How long Ollama keeps the model (and its cache)
+            loaded between session turns.
+        router: Optional ``llm_adapter.router.OllamaRouter``; when set,
+            calls are spread over its hosts and ``host`` is ignored.
+        scheduler: Admission scheduler every call waits on (defaults to
+            the process-wide one from ``llm_adapter.admission``).
+        priority: Default priority class for calls (``high``/``normal``/``low``).
+        deadline: Default seconds a call may wait for admission
+            (``None`` waits indefinitely).
     """
 
     model_name: str = field(default="phi")
     system_prompt: str | None = field(default=None)
     host: str = field(default="http://localhost:11434")
+    sessions: SessionStore = field(default_factory=SessionStore, repr=False)
+    keep_alive: str = field(default="30m")
+    router: Any = field(default=None, repr=False)
+    scheduler: Any = field(default=None, repr=False)
+    priority: str = field(default="normal")
+    deadline: float | None = field(default=None)
     _initialised: bool = field(init=False, default=False)
+    _client: Any = field(init=False, default=None, repr=False)
 
     def _ensure_available(self) -> None:
-        if ollama_chat is None:
+        if self._client is not None:
+            return
+        if self.router is not None:
+            # The router exposes the same chat/generate surface as a client
+            self._client = self.router
+            self._initialised = True
+            return
+        # Import on first use so that this module can be imported quickly,
+        # and even if ollama is not installed.
+        try:
+            from ollama import Client as OllamaClient
+        except ImportError:
             raise RuntimeError(
                 "Ollama is not installed; run `pip install ollama` and ensure"
                 " the Ollama daemon is running."
             )
+        # Keep one client (and its connection pool) per model instance
+        self._client = OllamaClient(host=self.host)
+        self._initialised = True
 
         # Optionally, check that the model is available by listing or pulling
         # The Python API provides `ollama.pull(model)` but requires network
         # access; we avoid this here to prevent side effects.
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, session_id: str | None = None, priority: str | None = None) -> str:
         self._ensure_available()
+        scheduler = self.scheduler or get_scheduler()
+        # Raises AdmissionRejected / DeadlineExceeded instead of piling onto the daemon
+        with scheduler.admit(backend_for(self.host, self.router), priority or self.priority, self.deadline) as ticket, \
+                get_telemetry().track(self.model_name, "router" if self.router is not None else self.host,
+                                      "chat" if session_id is None else "generate", ticket.queue_wait) as call:
+            return self._generate(prompt, session_id, call)
+
+    def _generate(self, prompt: str, session_id: str | None, call) -> str:
+        if session_id is not None:
+            # Continue the session from its returned context tokens
+            session = self.sessions.get(session_id)
+            return session_generate(
+                self._client, self.model_name, session, self.sessions, prompt,
+                system=self.system_prompt, keep_alive=self.keep_alive, observe=call.response,
+            )
+
         messages: List[Dict[str, str]] = []
         # Prepend a system prompt if provided
         if self.system_prompt:
@@ -149,15 +414,97 @@ class OllamaPhiModel(PhiModelInterface):
         messages.append({"role": "user", "content": prompt})
 
         # Use the Ollama Python API to chat with the model
-        response = ollama_chat(
+        response = self._client.chat(
             model=self.model_name,
             messages=messages,
-            host=self.host,
         )
+        call.response(response)
         # The response is a dictionary with a message field
         return response["message"]["content"]
 
 
+@dataclass
+class BloomMicroBatcher:
+    """Group concurrent BLOOM requests into ``generate_batch`` calls.
+
+    Requests submitted from many threads (for example concurrent
+    ``PhiBloomBridge.process`` calls) are collected for up to
+    ``max_wait_ms`` after the first one arrives, or until
+    ``max_batch_size`` are waiting, and then generated together.
+
+    Args:
+        bloom: The model whose ``generate_batch`` is called.
+        max_batch_size: Largest batch sent to the model.
+        max_wait_ms: How long the first request in a batch may wait for
+            company before the batch is dispatched.
+        generate_kwargs: Extra keyword arguments for ``generate_batch``
+            (``max_new_tokens``, ``stop``, ...).  Settings left out come
+            from ``bloom``, so batched requests generate like its
+            ``generate_from_manifest``.
+    """
+
+    bloom: BloomModelInterface
+    max_batch_size: int = 8
+    max_wait_ms: float = 10.0
+    generate_kwargs: Dict[str, Any] = field(default_factory=dict)
+    _queue: "queue.Queue" = field(init=False, repr=False, default_factory=queue.Queue)
+    _worker: threading.Thread | None = field(init=False, repr=False, default=None)
+
+    def __post_init__(self) -> None:
+        self._worker = threading.Thread(target=self._run, name="bloom-microbatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, manifest: str) -> Future:
+        """Queue ``manifest`` for the next batch; returns a future for its output."""
+        future: Future = Future()
+        self._queue.put((manifest, future))
+        return future
+
+    def generate_from_manifest(self, manifest: str) -> str:
+        """Blocking single-manifest call that rides along in a batch."""
+        return self.submit(manifest).result()
+
+    def close(self) -> None:
+        """Stop the worker after the requests already queued are served."""
+        self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            closing = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            live = [(m, f) for m, f in batch if f.set_running_or_notify_cancel()]
+            if live:
+                try:
+                    outputs = self.bloom.generate_batch([m for m, _ in live], **self.generate_kwargs)
+                except Exception as e:
+                    for _, future in live:
+                        future.set_exception(e)
+                else:
+                    for (_, future), output in zip(live, outputs):
+                        future.set_result(output)
+            if closing:
+                return
+
+
 @dataclass
 class PhiBloomBridge:
     """Bridge class to connect Phi‑Coder NLP outputs to BLOOM manifests.
@@ -172,39 +519,189 @@ class PhiBloomBridge:
     By alternating between these two steps, callers can implement
     recursive interactions (e.g. iterative refinement of manifests or
     conversational flows).  The ``process`` method performs a single
-    round‑trip; callers can loop over it as needed.
+    round‑trip; ``refine`` repeats it until the outputs converge, and
+    ``refine_many`` pipelines several prompts so Phi and BLOOM work on
+    different prompts at the same time instead of idling in turn.
     """
 
     bloom: BloomModelInterface
     phi: PhiModelInterface
-
-    def process(self, prompt: str) -> Dict[str, str]:
+    # Optional micro-batcher wrapping ``bloom``; concurrent ``process``
+    # calls then share BLOOM forward passes
+    batcher: BloomMicroBatcher | None = None
+    # Optional ``llm_adapter.semantic_cache.SemanticCache`` (or ``True`` for
+    # the shared one); near-identical session-less prompts skip both models
+    semantic_cache: Any = None
+    # Prepended to Phi's output before BLOOM sees it; the default matches a
+    # prefix the BLOOM prefix cache holds ("" sends Phi's output unchanged)
+    bloom_prefix: str = BLOOM_INPUT_PREFIX
+
+    def process(self, prompt: str, session_id: str | None = None) -> Dict[str, str]:
         """Process a prompt through the Phi → BLOOM pipeline.
 
         Args:
             prompt: A natural‑language query or command to send into the
                 Phi‑Coder layer.
+            session_id: Optional conversation id; when given, the Phi call
+                continues that session instead of starting fresh.
 
         Returns:
             A dictionary with two keys:
               * ``phi_output`` – the raw content returned by the Phi model.
               * ``bloom_output`` – the BLOOM model’s response given the
-                ``phi_output`` as input manifest.
+                ``phi_output`` (after ``bloom_prefix``) as input manifest.
         """
+        if self.semantic_cache and session_id is None:
+            # Session turns depend on their history, so only fresh prompts are cached
+            from llm_adapter.semantic_cache import resolve
+
+            return resolve(self.semantic_cache).get_or_compute(
+                prompt, lambda: self._process(prompt, None),
+                namespace=f"bridge:{getattr(self.phi, 'model_name', '')}",
+            )
+        return self._process(prompt, session_id)
 
+    def _process(self, prompt: str, session_id: str | None) -> Dict[str, str]:
         # Step 1: Generate output from Phi‑Coder
-        phi_output = self.phi.generate(prompt)
+        phi_output = self.phi.generate(prompt, session_id=session_id)
         # Step 2: Feed that output into BLOOM
-        bloom_output = self.bloom.generate_from_manifest(phi_output)
+        bloom = self.batcher if self.batcher is not None else self.bloom
+        bloom_output = bloom.generate_from_manifest(self.bloom_prefix + phi_output)
         return {
             "phi_output": phi_output,
             "bloom_output": bloom_output,
         }
 
+    def refine(
+        self,
+        prompt: str,
+        rounds: int = 3,
+        stop_condition: Callable[[List[Dict[str, str]]], bool] | None = None,
+    ) -> Dict[str, Any]:
+        """Alternate Phi and BLOOM for up to ``rounds`` round-trips.
+
+        Each round feeds the previous BLOOM output back into Phi.
+        ``stop_condition`` receives the list of rounds so far and returns
+        True to stop early; by default refinement stops once two
+        consecutive BLOOM outputs are near-identical (see
+        ``outputs_converged``).
+
+        Returns a dictionary with the final ``phi_output`` and
+        ``bloom_output``, every round in ``rounds``, and ``converged``
+        telling whether the stop condition fired before the round limit.
+        """
+        return self.refine_many([prompt], rounds, stop_condition)[0]
+
+    def refine_many(
+        self,
+        prompts: Sequence[str],
+        rounds: int = 3,
+        stop_condition: Callable[[List[Dict[str, str]]], bool] | None = None,
+        max_in_flight: int = 4,
+        queue_size: int = 2,
+    ) -> List[Dict[str, Any]]:
+        """Refine several prompts through a two-stage Phi → BLOOM pipeline.
+
+        A Phi worker and a BLOOM worker run concurrently, connected by a
+        queue of at most ``queue_size`` items, so while BLOOM works on
+        round k of one prompt Phi is already working on another.
+        Prompts whose round finished are fed back to Phi ahead of new
+        prompts; at most ``max_in_flight`` prompts are being refined at
+        once.  Results are returned in input order, each shaped like the
+        result of ``refine`` (plus ``error`` if a stage or
+        ``stop_condition`` raised).
+        """
+        if rounds < 1:
+            raise ValueError(f"rounds must be at least 1, got {rounds}")
+        stop = stop_condition or outputs_converged
+        bloom = self.batcher if self.batcher is not None else self.bloom
+        results: List[Dict[str, Any] | None] = [None] * len(prompts)
+        if not prompts:
+            return []
+
+        phi_queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        bloom_queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        slots = threading.Semaphore(max(1, max_in_flight))
+        finished = threading.Semaphore(0)
+        order = itertools.count()
+
+        def finish(index: int, history: List[Dict[str, str]], converged: bool, error: str | None = None) -> None:
+            result: Dict[str, Any] = dict(history[-1]) if history else {"phi_output": "", "bloom_output": ""}
+            result.update(prompt=prompts[index], rounds=history, converged=converged)
+            if error is not None:
+                result["error"] = error
+            results[index] = result
+            slots.release()
+            finished.release()
+
+        def phi_stage() -> None:
+            while True:
+                _, _, job = phi_queue.get()
+                if job is None:
+                    bloom_queue.put(None)
+                    return
+                index, text, history = job
+                try:
+                    phi_output = self.phi.generate(text)
+                except Exception as e:
+                    finish(index, history, False, f"{type(e).__name__}: {e}")
+                    continue
+                bloom_queue.put((index, phi_output, history))
+
+        def bloom_stage() -> None:
+            while True:
+                job = bloom_queue.get()
+                if job is None:
+                    return
+                index, phi_output, history = job
+                try:
+                    bloom_output = bloom.generate_from_manifest(self.bloom_prefix + phi_output)
+                    history = history + [{"phi_output": phi_output, "bloom_output": bloom_output}]
+                    converged = stop(history)
+                except Exception as e:
+                    # Every prompt must reach ``finish`` or the caller waits forever
+                    finish(index, history, False, f"{type(e).__name__}: {e}")
+                    continue
+                if converged:
+                    finish(index, history, True)
+                elif len(history) >= rounds:
+                    finish(index, history, False)
+                else:
+                    # Priority 0: in-flight prompts go ahead of new ones
+                    phi_queue.put((0, next(order), (index, bloom_output, history)))
+
+        workers = [
+            threading.Thread(target=phi_stage, name="refine-phi", daemon=True),
+            threading.Thread(target=bloom_stage, name="refine-bloom", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+        for index, prompt in enumerate(prompts):
+            slots.acquire()
+            phi_queue.put((1, next(order), (index, prompt, [])))
+        for _ in prompts:
+            finished.acquire()
+        phi_queue.put((2, next(order), None))
+        for worker in workers:
+            worker.join()
+        return results  # type: ignore[return-value]
+
+
+def outputs_converged(history: List[Dict[str, str]], threshold: float = 0.98) -> bool:
+    """True once the last two BLOOM outputs are at least ``threshold`` similar."""
+    if len(history) < 2:
+        return False
+    previous, current = history[-2]["bloom_output"], history[-1]["bloom_output"]
+    if previous == current:
+        return True
+    return difflib.SequenceMatcher(None, previous, current).ratio() >= threshold
+
 
 __all__ = [
     "BloomModelInterface",
     "PhiModelInterface",
     "OllamaPhiModel",
+    "BloomMicroBatcher",
     "PhiBloomBridge",
+    "outputs_converged",
 ]
@@ -1,4 +1,40 @@
-@"
+"""
+Φπε core primitives.
+
+The classes keep their one-value-at-a-time methods; the batch kernels
+(``ΦπεNode.stabilize_batch`` and ``ΨΛΩLoop.run``) apply the same maths to
+whole NumPy arrays so millions of samples can be processed per call.
+NumPy is imported on first use of a batch kernel.
+
+``ΞΛΩStack`` merges into ``HarmonicRope`` trees, which render lazily to
+the same text as the original f-string merges.
+"""
+
+# ΨΛΩ recurrence: y[n] = DECAY · y[n-1] + GAIN · x[n]
+DECAY = 0.618
+GAIN = 0.382
+
+# Samples per block in the blocked filter (one Toeplitz matmul per block row)
+FILTER_BLOCK = 256
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("NumPy is required for the phipe_core batch kernels; run `pip install numpy`.")
+    return np
+
+
+def _output(np, out, shape, dtype):
+    """Return ``out`` (checked) or a new array of ``shape``/``dtype``."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != tuple(shape):
+        raise ValueError(f"out has shape {out.shape}, expected {tuple(shape)}")
+    return out
+
+
 class ΦπεNode:
     def __init__(self, ψ_signal, φ_state, ε_drift):
         self.ψ = ψ_signal
@@ -8,10 +44,127 @@ class ΦπεNode:
     def stabilize(self):
         return (self.ψ + self.φ) * (1 - self.ε)
 
+    @staticmethod
+    def stabilize_batch(ψ, φ, ε, out=None, dtype=None):
+        """``(ψ + φ) · (1 − ε)`` over broadcastable arrays.
+
+        ``dtype`` (e.g. ``numpy.float32``) sets the compute/output type,
+        defaulting to ``out``'s dtype or float64; ``out`` receives the
+        result in place (it may be one of the inputs).
+        """
+        np = _numpy()
+        if dtype is None:
+            dtype = out.dtype if out is not None else np.float64
+        ψ, φ, ε = (np.asarray(a, dtype=dtype) for a in (ψ, φ, ε))
+        out = _output(np, out, np.broadcast_shapes(ψ.shape, φ.shape, ε.shape), dtype)
+        # Same operation order as ``stabilize``, with one temporary for 1 − ε
+        scale = np.subtract(1, ε, dtype=dtype)
+        np.add(ψ, φ, out=out, casting="same_kind")
+        np.multiply(out, scale, out=out, casting="same_kind")
+        return out
+
+
+class HarmonicRope:
+    """Lazy ``[Ξ]{a}⟴{b}[Ω]`` merge of two symbols or ropes.
+
+    Creating a rope is O(1): it only references its two halves, so nested
+    merges share structure instead of copying text.  The text is produced
+    on demand — ``str(rope)``, ``iter_chunks()``, ``write_to(stream)`` —
+    and ``len`` and slicing work without rendering the whole tree.
+    Traversal is iterative, so thousands of nested merges are fine.
+    """
+
+    OPEN, JOIN, CLOSE = "[Ξ]", "⟴", "[Ω]"
+    __slots__ = ("left", "right", "length")
+
+    def __init__(self, left, right):
+        # Leaves are formatted exactly as the f-string merge would format them
+        self.left = left if isinstance(left, HarmonicRope) else format(left, "")
+        self.right = right if isinstance(right, HarmonicRope) else format(right, "")
+        self.length = len(self.OPEN) + len(self.left) + len(self.JOIN) + len(self.right) + len(self.CLOSE)
+
+    def __len__(self):
+        return self.length
+
+    def _parts(self):
+        return (self.OPEN, self.left, self.JOIN, self.right, self.CLOSE)
+
+    def iter_chunks(self):
+        """Yield the rendered text in order, one piece per leaf or bracket."""
+        pending = [self]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, HarmonicRope):
+                pending.extend(reversed(item._parts()))
+            elif item:
+                yield item
+
+    def __str__(self):
+        return "".join(self.iter_chunks())
+
+    def __repr__(self):
+        return f"HarmonicRope(len={self.length})"
+
+    def __eq__(self, other):
+        if isinstance(other, (str, HarmonicRope)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def substring(self, start, stop):
+        """``str(self)[start:stop]`` rendering only the overlapping leaves."""
+        start, stop, _ = slice(start, stop).indices(self.length)
+        pieces = []
+        pending = [(self, 0)]
+        while pending and start < stop:
+            item, offset = pending.pop()
+            end = offset + len(item)
+            if end <= start or offset >= stop:
+                continue
+            if isinstance(item, HarmonicRope):
+                parts = []
+                for part in item._parts():
+                    parts.append((part, offset))
+                    offset += len(part)
+                pending.extend(reversed(parts))
+            else:
+                pieces.append(item[max(start - offset, 0):stop - offset])
+        return "".join(pieces)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return str(self)[key]
+            return self.substring(key.start, key.stop)
+        index = key + self.length if key < 0 else key
+        if not 0 <= index < self.length:
+            raise IndexError("HarmonicRope index out of range")
+        return self.substring(index, index + 1)
+
+    def write_to(self, stream, buffer_size=1 << 16):
+        """Stream the rendered text to a text file, binary file or socket.
+
+        Binary streams and sockets receive UTF-8.  Returns the number of
+        characters written.
+        """
+        emit = _emitter(stream)
+        buffer, size = [], 0
+        for chunk in self.iter_chunks():
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= buffer_size:
+                emit("".join(buffer))
+                buffer, size = [], 0
+        if buffer:
+            emit("".join(buffer))
+        return self.length
+
 
 class ΞΛΩStack:
-    def __init__(self):
-        self.stack = []
+    def __init__(self, symbols=()):
+        self.stack = list(symbols)
 
     def push(self, symbol):
         self.stack.append(symbol)
@@ -23,7 +176,38 @@ class ΞΛΩStack:
             self.stack.append(self.harmonic_merge(a, b))
 
     def harmonic_merge(self, a, b):
-        return f"[Ξ]{a}⟴{b}[Ω]"
+        # Renders as f"[Ξ]{a}⟴{b}[Ω]", without copying a or b
+        return HarmonicRope(a, b)
+
+    def copy(self):
+        """A new stack sharing this one's symbols and merge trees."""
+        return ΞΛΩStack(self.stack)
+
+    def render(self):
+        """The merged text of the top entry (``""`` for an empty stack)."""
+        return str(self.stack[-1]) if self.stack else ""
+
+    def write_to(self, stream):
+        """Stream the top entry to ``stream`` without building the full string."""
+        if not self.stack:
+            return 0
+        top = self.stack[-1]
+        if isinstance(top, HarmonicRope):
+            return top.write_to(stream)
+        text = format(top, "")
+        _emitter(stream)(text)
+        return len(text)
+
+
+def _emitter(stream):
+    """``text -> None`` writer for a text stream, binary stream or socket (UTF-8)."""
+    import io
+
+    if hasattr(stream, "sendall"):
+        return lambda text: stream.sendall(text.encode("utf-8"))
+    if isinstance(stream, io.TextIOBase):
+        return stream.write
+    return lambda text: stream.write(text.encode("utf-8"))
 
 
 class ΨΛΩLoop:
@@ -31,6 +215,70 @@ class ΨΛΩLoop:
         self.output = 0.0
 
     def iterate(self, input_val):
-        self.output = (self.output * 0.618) + (input_val * 0.382)
+        self.output = (self.output * DECAY) + (input_val * GAIN)
         return self.output
-"@ | Set-Content -Encoding UTF8 phipe_core.py
+
+    def run(self, inputs, out=None, dtype=None):
+        """Apply ``iterate`` to every sample of the 1-D ``inputs`` at once.
+
+        Returns the array of outputs (written into ``out`` when given) and
+        leaves ``self.output`` at the last value, exactly as if ``iterate``
+        had been called per sample.  Uses ``scipy.signal.lfilter`` when
+        SciPy is installed, otherwise a blocked NumPy filter.
+        """
+        np = _numpy()
+        if dtype is None:
+            dtype = out.dtype if out is not None else np.float64
+        x = np.asarray(inputs, dtype=dtype)
+        if x.ndim != 1:
+            raise ValueError("ΨΛΩLoop.run expects a 1-D input sequence")
+        out = _output(np, out, x.shape, dtype)
+        if x.size == 0:
+            return out
+
+        try:
+            from scipy.signal import lfilter
+        except ImportError:
+            lfilter = None
+        if lfilter is not None:
+            y, _ = lfilter([GAIN], [1.0, -DECAY], x, zi=np.array([DECAY * self.output], dtype=dtype))
+            np.copyto(out, y, casting="same_kind")
+        else:
+            # The blocked filter writes through reshaped views, so it needs a contiguous buffer
+            target = out if out.flags.c_contiguous else np.empty(x.shape, dtype=out.dtype)
+            _blocked_filter(np, x, target, self.output, dtype)
+            if target is not out:
+                np.copyto(out, target)
+        self.output = float(out[-1])
+        return out
+
+
+def _blocked_filter(np, x, out, y0, dtype, block=FILTER_BLOCK):
+    """First-order IIR filter as block matmuls plus a carried state.
+
+    Within a block of ``B`` samples, ``y = T · x + DECAY^(i+1) · carry``
+    where ``T[i, j] = GAIN · DECAY^(i−j)`` for ``j ≤ i``; only the carry
+    from one block to the next is sequential.
+    """
+    n = x.size
+    block = min(block, n)
+    powers = DECAY ** np.arange(block + 1, dtype=np.float64)
+    lags = np.arange(block)[:, None] - np.arange(block)[None, :]
+    toeplitz = np.where(lags >= 0, GAIN * powers[np.clip(lags, 0, block)], 0.0).astype(dtype)
+    decay = powers[1:].astype(dtype)  # DECAY^(i+1) for i in 0..B-1
+
+    full = n // block * block
+    if full:
+        rows = x[:full].reshape(-1, block)
+        local = out[:full].reshape(-1, block)
+        # Zero-state response of every block in one matmul
+        np.matmul(rows, toeplitz.T, out=local)
+        carry = y0
+        for row in local:
+            row += decay * carry
+            carry = row[-1]
+        y0 = carry
+    if full < n:
+        tail = x[full:]
+        k = tail.size
+        out[full:] = toeplitz[:k, :k] @ tail + decay[:k] * y0
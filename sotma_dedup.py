@@ -0,0 +1,404 @@
+"""
+sotma_dedup.py
+==============
+
+Streaming near-duplicate filter for the SOTMA training chunks.
+
+Every chunk is normalised (lower-cased word tokens), cut into word
+shingles and reduced to a MinHash signature.  Signatures are split into
+LSH bands; chunks that share a band bucket with an earlier chunk are
+candidates, and a candidate whose estimated Jaccard similarity reaches
+``threshold`` makes the new chunk a near duplicate.  Byte-for-byte copies
+(after normalisation) are caught earlier by an exact digest.
+
+The signature index lives in SQLite, so
+
+* incremental ingests dedup against every earlier run that used the
+  same index file, and
+* memory stays bounded by SQLite's page cache rather than the number of
+  chunks — millions of chunks need disk, not RAM.
+
+Dropped chunks are written to a JSONL report with the reason
+(``exact_duplicate``, ``near_duplicate`` or ``empty``), the similarity
+and the chunk they duplicate.
+
+Each index commit also records how far the output had been written
+(``output_offset``), so an incremental run that follows a crash cuts the
+output back to the last commit before appending (``resume_output``)
+instead of writing the uncommitted chunks a second time.
+
+The LSH banding is derived from ``--threshold`` when the index is
+created and is fixed for that index: a threshold that needs a different
+banding is rejected up front (``threshold_conflict``); use the original
+threshold, or a new index.
+
+Usage::
+
+    python sotma_dedup.py sotma_dataset.jsonl -o sotma_dedup.jsonl --threshold 0.8
+    python sotma_dedup.py new_chunks.jsonl -o new_dedup.jsonl --index sotma_dedup.sqlite
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from array import array
+
+DEFAULT_INDEX = "sotma_dedup.sqlite"
+DEFAULT_REPORT = "sotma_dedup_report.jsonl"
+MERSENNE_PRIME = (1 << 31) - 1
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def plan_bands(threshold, num_perm):
+    """Pick ``(bands, rows)`` with ``bands * rows == num_perm``.
+
+    Uses the split whose LSH S-curve midpoint ``(1 / bands) ** (1 / rows)``
+    is the highest one at or below ``threshold``: candidates are verified
+    against the full signature anyway, so erring towards recall only costs
+    a few extra comparisons.
+    """
+    def midpoint(split):
+        return (1 / split[0]) ** (1 / split[1])
+
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [br for br in options if midpoint(br) <= threshold]
+    return max(below, key=midpoint) if below else min(options, key=midpoint)
+
+
+def normalize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def shingles(tokens, size):
+    """Word ``size``-grams; texts shorter than ``size`` become one shingle."""
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """MinHash over ``num_perm`` universal hash functions ``(a·x + b) mod p``."""
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+        try:
+            import numpy as np
+        except ImportError:
+            self._np = None
+        else:
+            self._np = np
+            self._a = np.array([a for a, _ in self.params], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self.params], dtype=np.uint64)[:, None]
+
+    def signature(self, features):
+        """``array('I')`` of ``num_perm`` minima; ``features`` must be non-empty."""
+        hashes = [_hash64(f) % MERSENNE_PRIME for f in features]
+        if self._np is not None:
+            np = self._np
+            # a, x < 2³¹ so a·x + b fits in uint64 without overflow
+            h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            return array("I", ((self._a * h + self._b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32).tobytes())
+        p = MERSENNE_PRIME
+        return array("I", [min((a * x + b) % p for x in hashes) for a, b in self.params])
+
+
+def sync_file(f):
+    """Flush ``f``, fsync it to disk and return its size in bytes."""
+    f.flush()
+    os.fsync(f.fileno())
+    return os.fstat(f.fileno()).st_size
+
+
+def index_params(index_path):
+    """The ``meta`` table of an existing index as a dict (``{}`` if there is none)."""
+    if index_path == ":memory:" or not os.path.exists(index_path):
+        return {}
+    db = sqlite3.connect(index_path)
+    try:
+        return dict(db.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        return {}
+    finally:
+        db.close()
+
+
+def threshold_conflict(index_path, threshold, num_perm=128, bands=None):
+    """Explain why ``threshold`` cannot be used with ``index_path``, or return ``None``."""
+    stored = index_params(index_path).get("bands")
+    wanted = bands or plan_bands(threshold, num_perm)[0]
+    if stored is None or int(stored) == wanted:
+        return None
+    return (f"--threshold {threshold} needs {wanted} LSH bands, but {index_path} was built with {stored}; "
+            f"the banding is fixed per index, so use the threshold it was built with or a new index")
+
+
+def resume_output(out, dedup):
+    """Cut ``out`` back to the offset ``dedup``'s index last committed.
+
+    Chunks written after that commit are not in the index, so the rerun
+    writes them again; without the cut they would appear twice (possibly
+    after a torn line).
+    """
+    offset = dedup.output_offset
+    if offset is not None and os.fstat(out.fileno()).st_size > offset:
+        out.truncate(offset)
+        out.seek(offset)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+class Deduper:
+    """MinHash/LSH dedup against a persistent SQLite signature index.
+
+    Args:
+        index_path: SQLite file holding signatures (``":memory:"`` for a
+            throwaway index).
+        threshold: Estimated Jaccard similarity at or above which a chunk
+            is a near duplicate.
+        num_perm: Signature length.
+        shingle_size: Words per shingle.
+        bands: LSH bands; derived from ``threshold`` when omitted.
+        report_path: JSONL file that dropped chunks are appended to.
+        max_candidates: Candidates compared per chunk (bounds the work on
+            very popular buckets).
+        commit_every: Chunks between SQLite commits.
+        cache_mb: SQLite page cache size.
+        before_commit: Called before every index commit.  Pass a callable
+            that flushes and fsyncs the caller's output, so the index never
+            lists a kept chunk whose record is not yet on disk (it would be
+            dropped as an ``exact_duplicate`` on the next run).  If it
+            returns the output size (``sync_file`` does), the commit records
+            it as ``output_offset``.
+
+    An existing index keeps the ``num_perm``/``shingle_size``/``bands``/
+    ``seed`` it was built with; opening it with different ones raises
+    ``ValueError`` since the signatures would not be comparable.
+    """
+
+    def __init__(self, index_path=DEFAULT_INDEX, threshold=0.8, num_perm=128, shingle_size=5, bands=None,
+                 seed=1, report_path=None, max_candidates=64, commit_every=1000, cache_mb=64,
+                 before_commit=None):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if bands is None:
+            bands, _ = plan_bands(threshold, num_perm)
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+        self.commit_every = commit_every
+        self.before_commit = before_commit
+        self.hasher = MinHasher(num_perm, seed)
+
+        self._db = sqlite3.connect(index_path)
+        self._db.execute(f"PRAGMA cache_size = {-int(cache_mb * 1024)}")
+        if index_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, key TEXT, source TEXT, signature BLOB);
+            CREATE TABLE IF NOT EXISTS exact (digest BLOB PRIMARY KEY, chunk_id INTEGER) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER, bucket INTEGER, chunk_id INTEGER,
+                PRIMARY KEY (band, bucket, chunk_id)
+            ) WITHOUT ROWID;
+        """)
+        self._check_meta({"num_perm": num_perm, "shingle_size": shingle_size, "bands": bands, "seed": seed})
+        self._pending = 0
+        self._report = open(report_path, "a", encoding="utf-8") if report_path else None
+        self.counts = {"seen": 0, "kept": 0, "exact_duplicate": 0, "near_duplicate": 0, "empty": 0}
+        self.started = time.perf_counter()
+
+    def _check_meta(self, params):
+        stored = dict(self._db.execute("SELECT key, value FROM meta"))
+        if not stored:
+            self._db.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in params.items()])
+            self._db.commit()
+            return
+        mismatched = {k: (stored.get(k), str(v)) for k, v in params.items() if stored.get(k) != str(v)}
+        if mismatched:
+            raise ValueError(f"Index was built with different parameters: {mismatched}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    # 🔎 Lookup
+    def _buckets(self, signature):
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        for band in range(self.bands):
+            digest = hashlib.blake2b(raw[band * width:(band + 1) * width], digest_size=8).digest()
+            yield band, int.from_bytes(digest, "little", signed=True)
+
+    def _chunk(self, chunk_id):
+        return self._db.execute("SELECT key, source, signature FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
+
+    def _best_match(self, signature, buckets):
+        candidates = []
+        for band, bucket in buckets:
+            for (chunk_id,) in self._db.execute(
+                    "SELECT chunk_id FROM bands WHERE band = ? AND bucket = ? LIMIT ?",
+                    (band, bucket, self.max_candidates)):
+                if chunk_id not in candidates:
+                    candidates.append(chunk_id)
+            if len(candidates) >= self.max_candidates:
+                break
+        best = None
+        for chunk_id in candidates[:self.max_candidates]:
+            key, source, blob = self._chunk(chunk_id)
+            score = similarity(signature, array("I", blob))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, key, source)
+        return best
+
+    # 🧹 Dedup
+    def check(self, text, key=None, source=None):
+        """Index ``text`` and return ``None`` if it is kept, else the drop record.
+
+        Kept chunks are added to the index, so later chunks (in this run or
+        any later run) are deduplicated against them.  A due commit runs at
+        the start of the next call, once the caller has written this chunk.
+        """
+        if self._pending >= self.commit_every:
+            self.flush()
+        self.counts["seen"] += 1
+        tokens = normalize(text)
+        if not tokens:
+            return self._drop({"key": key, "source": source, "reason": "empty"})
+
+        digest = hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=16).digest()
+        row = self._db.execute("SELECT chunk_id FROM exact WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            dup_key, dup_source, _ = self._chunk(row[0])
+            return self._drop({"key": key, "source": source, "reason": "exact_duplicate", "similarity": 1.0,
+                               "duplicate_of": {"key": dup_key, "source": dup_source}})
+
+        signature = self.hasher.signature(shingles(tokens, self.shingle_size))
+        buckets = list(self._buckets(signature))
+        match = self._best_match(signature, buckets)
+        if match is not None:
+            score, dup_key, dup_source = match
+            return self._drop({"key": key, "source": source, "reason": "near_duplicate", "similarity": round(score, 4),
+                               "duplicate_of": {"key": dup_key, "source": dup_source}})
+
+        chunk_id = self._db.execute("INSERT INTO chunks (key, source, signature) VALUES (?, ?, ?)",
+                                    (key, source, signature.tobytes())).lastrowid
+        self._db.execute("INSERT INTO exact VALUES (?, ?)", (digest, chunk_id))
+        self._db.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+                             [(band, bucket, chunk_id) for band, bucket in buckets])
+        self.counts["kept"] += 1
+        self._pending += 1
+        return None
+
+    def _drop(self, record):
+        self.counts[record["reason"]] += 1
+        if self._report is not None:
+            self._report.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    def filter(self, records, text_key="response", key_fn=None, source_key="source"):
+        """Yield the records of ``records`` (dicts) that are not duplicates."""
+        for i, record in enumerate(records):
+            key = key_fn(record) if key_fn else record.get("id", i)
+            if self.check(str(record.get(text_key) or ""), key=key, source=record.get(source_key)) is None:
+                yield record
+
+    @property
+    def output_offset(self):
+        """Output size recorded by the last commit, or ``None``."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'output_offset'").fetchone()
+        return int(row[0]) if row else None
+
+    def flush(self):
+        """Commit the index, after ``before_commit`` has made the output durable."""
+        offset = self.before_commit() if self.before_commit is not None else None
+        if offset is not None:
+            # Same transaction as the chunks it covers
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('output_offset', ?)", (str(offset),))
+        self._db.commit()
+        if self._report is not None:
+            self._report.flush()
+        self._pending = 0
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        dropped = self.counts["seen"] - self.counts["kept"]
+        return dict(
+            self.counts,
+            dropped=dropped,
+            drop_rate=round(dropped / self.counts["seen"], 4) if self.counts["seen"] else 0.0,
+            indexed=len(self),
+            threshold=self.threshold,
+            bands=self.bands,
+            rows=self.rows,
+            elapsed_s=round(elapsed, 3),
+        )
+
+    def close(self):
+        self.flush()
+        self._db.close()
+        if self._report is not None:
+            self._report.close()
+            self._report = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drop near-duplicate chunks from a JSONL dataset.")
+    parser.add_argument("input", help="JSONL of {prompt, response} records")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--text-key", default="response")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="persistent signature index")
+    parser.add_argument("--report", default=DEFAULT_REPORT, help="JSONL of dropped chunks")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--shingle-size", type=int, default=5)
+    parser.add_argument("--bands", type=int, default=None)
+    args = parser.parse_args(argv)
+    conflict = threshold_conflict(args.index, args.threshold, args.num_perm, args.bands)
+    if conflict:
+        parser.error(conflict)
+
+    def records():
+        with open(args.input, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    with open(args.output, "w", encoding="utf-8") as out, \
+            Deduper(args.index, threshold=args.threshold, num_perm=args.num_perm, shingle_size=args.shingle_size,
+                    bands=args.bands, report_path=args.report, before_commit=lambda: sync_file(out)) as dedup:
+        for record in dedup.filter(records(), text_key=args.text_key,
+                                   key_fn=lambda r: r.get("prompt") or r.get("id")):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stats = dedup.stats()
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
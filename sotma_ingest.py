@@ -1,9 +1,12 @@
 
 import os
 import json
+import argparse
 import fitz  # PyMuPDF
 from pathlib import Path
 
+from sotma_dedup import DEFAULT_INDEX, DEFAULT_REPORT, Deduper, resume_output, sync_file, threshold_conflict
+
 SOURCE_DIR = r"C:\Users\Andrew\ollama\phi-coder\S.O.T.M.A"
 OUTPUT_JSONL = "sotma_dataset.jsonl"
 INGEST_LOG = "sotma_ingest_log.json"
@@ -33,31 +36,74 @@ def chunk_text(text, max_length=1000):
 def build_dataset_entry(prompt, response):
     return {"prompt": prompt, "response": response}
 
-def main():
-    entries = []
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest SOTMA PDFs into a deduplicated JSONL dataset.")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("-o", "--output", default=OUTPUT_JSONL)
+    parser.add_argument("--threshold", type=float, default=0.8, help="near-duplicate Jaccard threshold")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="persistent dedup signature index")
+    parser.add_argument("--report", default=DEFAULT_REPORT, help="JSONL report of dropped chunks")
+    parser.add_argument("--no-dedup", action="store_true")
+    parser.add_argument("--rebuild", action="store_true", help="discard the index and rewrite the dataset")
+    args = parser.parse_args(argv)
+
+    # An existing index means earlier runs already wrote their chunks, so
+    # append only the new ones; otherwise start the dataset from scratch
+    dedup = None
+    mode = "w"
+    if not args.no_dedup:
+        if args.rebuild:
+            for path in (args.index, args.report):
+                if os.path.exists(path):
+                    os.remove(path)
+        elif os.path.exists(args.index):
+            conflict = threshold_conflict(args.index, args.threshold)
+            if conflict:
+                parser.error(conflict + " (or --rebuild)")
+            mode = "a"
+
+    written = 0
+    dedup_stats = None
     ingest_log = []
-    for root, _, files in os.walk(SOURCE_DIR):
-        for file in files:
-            if file.lower().endswith(".pdf"):
-                full_path = os.path.join(root, file)
-                try:
-                    text = extract_text_from_pdf(full_path)
-                    if not text:
-                        continue
-                    chunks = chunk_text(text)
-                    for i, chunk in enumerate(chunks):
-                        prompt = f"What does the SOTMA document '{file}' say (part {i+1})?"
-                        entry = build_dataset_entry(prompt, chunk)
-                        entries.append(entry)
-                    ingest_log.append({"file": file, "chunks": len(chunks), "path": full_path})
-                except Exception as e:
-                    ingest_log.append({"file": file, "error": str(e)})
-    with open(OUTPUT_JSONL, "w", encoding="utf-8") as f:
-        for entry in entries:
-            f.write(json.dumps(entry) + "\n")
+    # 🚀 Stream entries straight to disk instead of holding the dataset in memory
+    with open(args.output, mode, encoding="utf-8") as out:
+        if not args.no_dedup:
+            # The index only commits once the entries it lists are on disk
+            dedup = Deduper(args.index, threshold=args.threshold, report_path=args.report,
+                            before_commit=lambda: sync_file(out))
+            if mode == "a":
+                # Drop chunks a crashed run wrote after its last index commit
+                resume_output(out, dedup)
+        try:
+            for root, _, files in os.walk(args.source):
+                for file in files:
+                    if file.lower().endswith(".pdf"):
+                        full_path = os.path.join(root, file)
+                        try:
+                            text = extract_text_from_pdf(full_path)
+                            if not text:
+                                continue
+                            chunks = chunk_text(text)
+                            kept = 0
+                            for i, chunk in enumerate(chunks):
+                                prompt = f"What does the SOTMA document '{file}' say (part {i+1})?"
+                                if dedup is not None and dedup.check(chunk, key=prompt, source=full_path) is not None:
+                                    continue
+                                out.write(json.dumps(build_dataset_entry(prompt, chunk)) + "\n")
+                                kept += 1
+                            written += kept
+                            ingest_log.append({"file": file, "chunks": len(chunks), "kept": kept, "path": full_path})
+                        except Exception as e:
+                            ingest_log.append({"file": file, "error": str(e)})
+        finally:
+            if dedup is not None:
+                dedup_stats = dedup.stats()
+                dedup.close()
     with open(INGEST_LOG, "w", encoding="utf-8") as f:
         json.dump(ingest_log, f, indent=2)
-    print(f"Processed {len(entries)} chunks from SOTMA.")
+    print(f"Processed {written} chunks from SOTMA.")
+    if dedup_stats is not None:
+        print(f"Dedup: {json.dumps(dedup_stats)}")
 
 if __name__ == "__main__":
     main()
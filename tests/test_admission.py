@@ -0,0 +1,89 @@
+"""AdmissionScheduler ordering, shedding, deadlines and router limits."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_adapter.admission import AdmissionRejected, AdmissionScheduler, DeadlineExceeded, backend_for
+
+
+def wait_queued(scheduler, n, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.stats()["queued"] != n:
+        assert time.monotonic() < deadline, f"expected {n} queued, stats {scheduler.stats()}"
+        time.sleep(0.005)
+
+
+def queue_call(scheduler, priority, outcomes, order=None, deadline=None):
+    def run():
+        try:
+            ticket = scheduler.acquire("b", priority, deadline)
+        except AdmissionRejected as e:
+            outcomes[priority] = type(e).__name__
+            return
+        outcomes[priority] = "admitted"
+        if order is not None:
+            order.append(priority)
+        scheduler.release(ticket)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_admits_by_priority_then_arrival():
+    scheduler = AdmissionScheduler(default_limit=1)
+    holder = scheduler.acquire("b")
+    outcomes, order, threads = {}, [], []
+    for n, priority in enumerate(["low", "normal", "high"]):
+        threads.append(queue_call(scheduler, priority, outcomes, order))
+        wait_queued(scheduler, n + 1)
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["high", "normal", "low"]
+
+
+def test_full_queue_sheds_lower_priority_or_rejects():
+    scheduler = AdmissionScheduler(default_limit=1, max_queue=1)
+    holder = scheduler.acquire("b")
+    outcomes = {}
+    low = queue_call(scheduler, "low", outcomes)
+    wait_queued(scheduler, 1)
+
+    high = queue_call(scheduler, "high", outcomes)
+    low.join(5)
+    assert outcomes["low"] == "AdmissionRejected"
+    wait_queued(scheduler, 1)
+
+    with pytest.raises(AdmissionRejected):
+        scheduler.acquire("b", "normal")
+    scheduler.release(holder)
+    high.join(5)
+    assert outcomes["high"] == "admitted"
+    assert scheduler.stats()["shed"] == 1 and scheduler.stats()["rejected"] == 1
+
+
+def test_deadline_expires_while_queued():
+    scheduler = AdmissionScheduler(default_limit=1)
+    holder = scheduler.acquire("b")
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("b", deadline=0.05)
+    scheduler.release(holder)
+    assert scheduler.stats()["expired"] == 1
+    scheduler.release(scheduler.acquire("b", deadline=0.05))
+
+
+def test_router_limit_scales_with_hosts():
+    router = SimpleNamespace(hosts=[SimpleNamespace(url=f"http://gpu{i}:11434") for i in range(3)])
+    backend = backend_for(router=router)
+    assert backend != backend_for(router=SimpleNamespace(hosts=router.hosts[:1]))
+
+    scheduler = AdmissionScheduler(default_limit=2)
+    tickets = [scheduler.acquire(backend, deadline=0.0) for _ in range(6)]
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire(backend, deadline=0.01)
+    for ticket in tickets:
+        scheduler.release(ticket)
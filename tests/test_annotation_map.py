@@ -0,0 +1,81 @@
+import copy
+import pickle
+
+from data_core.annotation_map import AnnotationMap
+
+
+def _forked_with_deletion():
+    base = AnnotationMap({"a": 1, "b": [1, 2]})
+    fork = base.fork()
+    del fork["a"]
+    return base, fork
+
+
+def test_fork_deletion_is_local():
+    base, fork = _forked_with_deletion()
+    assert "a" not in fork
+    assert base["a"] == 1
+    assert fork.to_dict() == {"b": [1, 2]}
+
+
+def test_deepcopy_keeps_deletions():
+    _, fork = _forked_with_deletion()
+    clone = copy.deepcopy(fork)
+    assert "a" not in clone
+    assert clone.to_dict() == {"b": [1, 2]}
+    assert clone.get("a") is None
+
+
+def test_copy_keeps_deletions():
+    _, fork = _forked_with_deletion()
+    assert "a" not in copy.copy(fork)
+
+
+def test_pickle_keeps_deletions():
+    _, fork = _forked_with_deletion()
+    clone = pickle.loads(pickle.dumps(fork))
+    assert "a" not in clone
+    assert list(clone) == ["b"]
+    assert len(clone) == 1
+
+
+def test_fork_writes_are_isolated_both_ways():
+    base = AnnotationMap({"depth": 0})
+    fork = base.fork()
+    fork["depth"] = 1
+    fork["fork_only"] = True
+    base["base_only"] = True
+    assert base.to_dict() == {"depth": 0, "base_only": True}
+    assert fork.to_dict() == {"depth": 1, "fork_only": True}
+
+
+def test_copy_on_access_through_nested_forks():
+    base = AnnotationMap({"trace": ["entry"], "llm_directives": {"a": 1}})
+    child = base.fork()
+    grandchild = child.fork()
+    grandchild["trace"].append("grandchild")
+    child["trace"].append("child")
+    grandchild["llm_directives"]["b"] = 2
+    assert base["trace"] == ["entry"]
+    assert child["trace"] == ["entry", "child"]
+    assert grandchild["trace"] == ["entry", "grandchild"]
+    assert base["llm_directives"] == {"a": 1} == child["llm_directives"]
+    # Writes made in the parent after forking stay out of earlier forks
+    base["trace"].append("base")
+    assert grandchild["trace"] == ["entry", "grandchild"]
+
+
+def test_packet_fork_isolation():
+    from data_core.recursion_packet import RecursionPacket
+
+    packet = RecursionPacket("signal", symbols=["ψ"], memory=["m0"])
+    packet.annotations["trace"] = ["entry"]
+    child = packet.fork()
+    child.symbols.append("φ")
+    child.memory.append("m1")
+    child.annotations["trace"].append("child")
+    child.entropy = 0.5
+    packet.annotations["trace"].append("parent")
+    assert (packet.symbols, packet.memory, packet.entropy) == (["ψ"], ["m0"], 0.0)
+    assert packet.annotations["trace"] == ["entry", "parent"]
+    assert child.annotations["trace"] == ["entry", "child"]
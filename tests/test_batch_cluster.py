@@ -0,0 +1,110 @@
+"""batch_cluster coordinator with in-process workers and a stand-in process_fn."""
+
+import json
+import random
+import threading
+import time
+
+import pytest
+
+from batch_cluster import Coordinator, run_worker
+
+
+def write_input(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"id": f"r{i}", "prompt": f"prompt {i}"}) + "\n")
+
+
+def echo(index, record, *args, delay=0.0, **kwargs):
+    if delay:
+        time.sleep(delay)
+    return {"index": index, "id": record["id"], "echo": record["prompt"].upper(), "latency_ms": delay * 1000.0}
+
+
+def read_output(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def start_worker(address, process_fn, name, concurrency=2):
+    def work():
+        try:
+            run_worker(address, concurrency=concurrency, worker_id=name, process_fn=process_fn)
+        except (ConnectionError, OSError):
+            pass  # a stuck worker released after the coordinator closed
+
+    thread = threading.Thread(target=work, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def stuck_on(index, release):
+    def process(i, record, *args, **kwargs):
+        if i == index:
+            release.wait(30)
+        return echo(i, record)
+    return process
+
+
+def test_stuck_tail_record_is_reissued_to_an_idle_worker(tmp_path, release):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(src, 50)
+    with Coordinator(str(src), str(out), port=0, shard_size=50, lease_ttl=1.0) as coordinator:
+        start_worker(coordinator.address, stuck_on(49, release), "stuck")
+        assert wait_for(lambda: coordinator.next_index == 49)
+        start_worker(coordinator.address, echo, "healthy")
+        assert coordinator.wait(15)
+        stats = coordinator.stats()
+    assert stats["speculated"] >= 1
+    assert [r["index"] for r in read_output(out)] == list(range(50))
+
+
+def test_lease_without_progress_expires_despite_heartbeats(tmp_path, release):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(src, 4)
+    with Coordinator(str(src), str(out), port=0, shard_size=4, lease_ttl=0.6, record_timeout=1.0) as coordinator:
+        start_worker(coordinator.address, stuck_on(3, release), "stuck")
+        assert wait_for(lambda: coordinator.next_index == 3)
+        assert wait_for(lambda: coordinator.counts["expired"] >= 1, timeout=5.0)
+        start_worker(coordinator.address, echo, "healthy")
+        assert coordinator.wait(15)
+    assert [r["index"] for r in read_output(out)] == list(range(4))
+
+
+def test_output_is_exactly_once_and_deterministic(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(src, 120)
+    rng = random.Random(7)
+    delays = [rng.choice((0.0, 0.001, 0.005)) for _ in range(120)]
+
+    def jittery(i, record, *args, **kwargs):
+        return echo(i, record, delay=delays[i])
+
+    with Coordinator(str(src), str(out), port=0, shard_size=16, lease_ttl=2.0) as coordinator:
+        for n in range(3):
+            start_worker(coordinator.address, jittery, f"w{n}", concurrency=3)
+        assert coordinator.wait(30)
+
+    def content(r):
+        return {k: v for k, v in r.items() if k != "latency_ms"}
+
+    assert [content(r) for r in read_output(out)] == [
+        {"index": i, "id": f"r{i}", "echo": f"PROMPT {i}"} for i in range(120)
+    ]
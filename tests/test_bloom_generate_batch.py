@@ -0,0 +1,78 @@
+"""Batched BLOOM generation against a tiny randomly initialised model (CPU only)."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from phi_bloom_bridge import BloomModelInterface  # noqa: E402
+
+WORDS = ["harmonic", "bloom", "manifest", "recursion", "phi", "psi", "node", "sync", "layer", "vector",
+         "exec", "root", "branch", "collapse", "depth", "signal", "entropy", "field", "loop", "stack"]
+PROMPTS = ["bloom manifest exec root", "phi", "harmonic recursion collapse depth signal"]
+
+
+@pytest.fixture
+def bloom():
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {"<unk>": 0, "</s>": 1, **{word: i + 2 for i, word in enumerate(WORDS)}}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    # No pad token on purpose: generate_batch must pad with EOS and leave the tokenizer as it was
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>", eos_token="</s>")
+    torch.manual_seed(0)
+    config = transformers.BloomConfig(vocab_size=len(vocab), hidden_size=32, n_layer=2, n_head=2,
+                                      eos_token_id=1, bos_token_id=1)
+    model = transformers.BloomForCausalLM(config).eval()
+    return BloomModelInterface.from_components(model, tokenizer, prefix_cache_bytes=0)
+
+
+def test_batch_matches_per_prompt(bloom):
+    batched = bloom.generate_batch(PROMPTS, max_new_tokens=8, do_sample=False)
+    single = [bloom.generate_batch([prompt], max_new_tokens=8, do_sample=False)[0] for prompt in PROMPTS]
+    assert batched == single
+    for prompt, output in zip(PROMPTS, batched):
+        assert output.startswith(prompt)
+
+
+def test_per_row_limits_and_stop(bloom):
+    free = bloom.generate_batch(PROMPTS, max_new_tokens=8, do_sample=False)
+    continuation = free[0][len(PROMPTS[0]):].split()
+    assert len(continuation) >= 3
+    marker = continuation[2]
+
+    stopped = bloom.generate_batch(PROMPTS, max_new_tokens=8, stop=[marker], do_sample=False)
+    assert marker not in stopped[0][len(PROMPTS[0]):]
+    assert free[0].startswith(stopped[0].rstrip())
+    for prompt, before, after in zip(PROMPTS[1:], free[1:], stopped[1:]):
+        tail = before[len(prompt):]
+        expected = tail[:tail.index(marker)] if marker in tail else tail
+        assert after == prompt + expected
+
+    limited = bloom.generate_batch(PROMPTS, max_new_tokens=[2, 8, 4], do_sample=False)
+    for prompt, output, limit in zip(PROMPTS, limited, [2, 8, 4]):
+        assert len(output[len(prompt):].split()) <= limit
+
+
+def test_tokenizer_is_left_untouched(bloom):
+    tokenizer = bloom._tokenizer
+    assert (tokenizer.padding_side, tokenizer.pad_token) == ("right", None)
+    bloom.generate_batch(PROMPTS[:2], max_new_tokens=2, do_sample=False)
+    assert (tokenizer.padding_side, tokenizer.pad_token) == ("right", None)
+
+
+def test_micro_batcher_generates_like_generate_from_manifest(bloom):
+    from phi_bloom_bridge import BloomMicroBatcher
+
+    bloom.max_length, bloom.do_sample = 10, False
+    single = [bloom.generate_from_manifest(prompt) for prompt in PROMPTS]
+    batcher = BloomMicroBatcher(bloom, max_wait_ms=200.0)
+    try:
+        futures = [batcher.submit(prompt) for prompt in PROMPTS]
+        assert [future.result(timeout=60) for future in futures] == single
+    finally:
+        batcher.close()
+    # max_length counts the prompt tokens too
+    for prompt, output in zip(PROMPTS, single):
+        assert len(output.split()) <= 10
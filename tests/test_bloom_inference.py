@@ -0,0 +1,44 @@
+"""mmap and int8 CPU loading of a tiny randomly initialised BLOOM checkpoint."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from bloom_inference import load_mmap_model, quantize_int8  # noqa: E402
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    torch.manual_seed(0)
+    config = transformers.BloomConfig(vocab_size=16, hidden_size=32, n_layer=2, n_head=2,
+                                      eos_token_id=1, bos_token_id=1)
+    transformers.BloomForCausalLM(config).save_pretrained(tmp_path, safe_serialization=True)
+    return str(tmp_path)
+
+
+def shared_tensors(model):
+    return {
+        "word_embeddings": model.transformer.word_embeddings.weight,
+        "word_embeddings_layernorm": model.transformer.word_embeddings_layernorm.weight,
+        "ln_f": model.transformer.ln_f.weight,
+    }
+
+
+def test_int8_keeps_mmap_tensors(checkpoint):
+    model = load_mmap_model(checkpoint)
+    before = {name: t.data_ptr() for name, t in shared_tensors(model).items()}
+
+    quantized = quantize_int8(model)
+
+    assert quantized is model
+    assert {name: t.data_ptr() for name, t in shared_tensors(quantized).items()} == before
+    assert not any(type(m) is torch.nn.Linear for m in quantized.modules())
+
+
+def test_int8_output_tracks_fp32(checkpoint):
+    ids = torch.tensor([[2, 5, 7, 3]])
+    with torch.no_grad():
+        expected = load_mmap_model(checkpoint)(ids).logits
+        actual = quantize_int8(load_mmap_model(checkpoint))(ids).logits
+    assert torch.allclose(actual, expected, atol=0.1)
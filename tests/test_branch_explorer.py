@@ -0,0 +1,103 @@
+"""BranchExplorer over a hand-built L4 vector, in thread and process mode."""
+
+import threading
+import time
+
+import pytest
+
+from data_core import branch_explorer, node_registry
+from data_core.branch_explorer import BranchExplorer, ForkTimeout, bloom_vector, fork_vector
+from data_core.recursion_packet import RecursionPacket
+
+
+def node(i, resolution, weight=0.5):
+    return {"symbol": "ΦΨΛΩ"[i % 4], "origin": "build", "depth": 3, "memory_tag": "quantum_engine",
+            "entropy_weight": weight, "path_id": f"n::{i}", "harmonic_score": 5.0,
+            "entropy_resolution": resolution}
+
+
+VECTOR = [node(0, "collapse"), node(1, "branch"), node(2, "defer"), node(3, "branch", 0.9)]
+
+
+def explore(**kwargs):
+    packet = RecursionPacket("explore")
+    packet.annotations["L4_logic_vector"] = [dict(n) for n in VECTOR]
+    manifest = BranchExplorer(**kwargs).explore(packet).annotations["bloom_manifest"]
+    return manifest["explored_branches"], manifest["exploration"]
+
+
+def summary(survivors):
+    return [(s["path"], s["depth"], s["harmonic_sync"]) for s in survivors]
+
+
+def test_fork_vector_resolves_only_the_indexed_node():
+    forked = fork_vector(VECTOR, 1)
+    assert [n["entropy_resolution"] for n in forked] == ["collapse", "branch", "collapse", "branch"]
+    assert forked[2]["explored_from"] == "defer"
+    assert VECTOR[2]["entropy_resolution"] == "defer"
+
+
+def test_threads_prune_by_viability_and_loop_risk():
+    survivors, stats = explore(max_workers=2)
+    assert summary(survivors) == [("rdir_0", 1, survivors[0]["harmonic_sync"])]
+    reasons = {p["path"]: p["reason"] for p in stats["pruned"]}
+    assert reasons["rdir_1"] == "loop_risk"
+    assert reasons["rdir_2"] == "low_viability"
+    assert stats["timed_out"] == 0
+
+
+def test_processes_match_threads():
+    threads, _ = explore(max_workers=2, min_viability=0.0, max_loop_risk=1.0)
+    processes, stats = explore(max_workers=2, processes=True, min_viability=0.0, max_loop_risk=1.0,
+                               time_budget=30.0)
+    assert summary(processes) == summary(threads)
+    assert len(processes) > 1 and stats["timed_out"] == 0
+
+
+def test_width_budget():
+    _, stats = explore(min_viability=0.0, max_loop_risk=1.0, max_forks=1)
+    assert stats["explored"] == 1
+    assert stats["budget_skipped"] >= 2
+
+
+def test_fork_past_deadline_stops():
+    with pytest.raises(ForkTimeout):
+        bloom_vector(list(VECTOR), deadline=time.time() - 1)
+
+
+def test_forks_stop_running_after_the_deadline(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+    real_get = node_registry.get
+
+    def slow_get(name):
+        cls = real_get(name)
+        if name == "cluster_bus":
+            return cls
+
+        def make(bus):
+            inner = cls(bus)
+
+            class Slow:
+                def process(self, packet):
+                    with lock:
+                        calls.append(name)
+                    time.sleep(0.05)
+                    return inner.process(packet)
+
+            return Slow()
+
+        return make
+
+    packet = RecursionPacket("explore")
+    packet.annotations["L4_logic_vector"] = [dict(n) for n in VECTOR]
+    packet = branch_explorer.hemispheric_bloom_cycle(packet)
+    monkeypatch.setattr(branch_explorer.node_registry, "get", slow_get)
+
+    explorer = BranchExplorer(max_workers=2, min_viability=0.0, max_loop_risk=1.0, time_budget=0.12)
+    stats = explorer.explore(packet).annotations["bloom_manifest"]["exploration"]
+    assert stats["timed_out"] >= 1
+    at_return = len(calls)
+    time.sleep(0.4)
+    # Each running fork finishes at most the node it was in; a full cycle is 7 nodes
+    assert len(calls) <= at_return + explorer.max_workers
@@ -0,0 +1,49 @@
+"""FeedbackLog segments, filters and recovery from a torn last line."""
+
+import json
+
+from llm_adapter.feedback_log import FeedbackLog, iter_feedback, segment_name, segments, truncate_torn_tail
+
+
+def write_records(directory, records, **kwargs):
+    log = FeedbackLog(str(directory), flush_interval=0.01, **kwargs)
+    for record in records:
+        assert log.append(record)
+    log.close()
+    return log
+
+
+def test_round_trip_with_filters_and_rollover(tmp_path):
+    records = [{"prompt": f"p{i}", "response": "harmonic" if i % 2 else "plain", "ts": float(i)}
+               for i in range(20)]
+    write_records(tmp_path, records, max_segment_bytes=200, batch_size=2)
+    assert len(segments(str(tmp_path))) > 1
+    assert list(iter_feedback(str(tmp_path))) == records
+    assert [r["prompt"] for r in iter_feedback(str(tmp_path), contains="harmonic", since=5, until=10)] == \
+        ["p5", "p7", "p9"]
+
+
+def test_reopen_after_torn_line_appends_on_a_fresh_line(tmp_path):
+    path = tmp_path / segment_name(1)
+    path.write_bytes(b'{"prompt": "a", "ts": 1}\n{"prompt": "b", "ts": 2}\n{"prompt": "tor')
+
+    write_records(tmp_path, [{"prompt": "c", "ts": 3}])
+
+    lines = path.read_bytes().splitlines()
+    assert [json.loads(line)["prompt"] for line in lines] == ["a", "b", "c"]
+    assert [r["prompt"] for r in iter_feedback(str(tmp_path))] == ["a", "b", "c"]
+
+
+def test_truncate_torn_tail_edges(tmp_path):
+    path = tmp_path / "seg.jsonl"
+    path.write_bytes(b"no newline at all")
+    truncate_torn_tail(str(path), block=4)
+    assert path.read_bytes() == b""
+
+    path.write_bytes(b'{"x": 1}\n' + b"y" * 10)
+    truncate_torn_tail(str(path), block=4)
+    assert path.read_bytes() == b'{"x": 1}\n'
+
+    truncate_torn_tail(str(path))
+    assert path.read_bytes() == b'{"x": 1}\n'
+    truncate_torn_tail(str(tmp_path / "missing.jsonl"))
@@ -0,0 +1,90 @@
+"""finetune_pack export with a tiny word-level tokenizer saved to disk."""
+
+import json
+
+import pytest
+
+transformers = pytest.importorskip("transformers")
+
+import finetune_pack  # noqa: E402
+from finetune_pack import PackedDataset, export  # noqa: E402
+
+WORDS = ["bloom", "manifest", "phi", "psi", "node", "sync", "layer", "vector", "root", "branch"]
+EOS = 1
+SEQ_LEN = 8
+
+
+@pytest.fixture
+def tokenizer_dir(tmp_path):
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {"<unk>": 0, "</s>": EOS, "<pad>": 2, **{word: i + 3 for i, word in enumerate(WORDS)}}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>",
+                                                     eos_token="</s>", pad_token="<pad>")
+    path = tmp_path / "tokenizer"
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+def write_pairs(path, pairs):
+    with open(path, "w", encoding="utf-8") as f:
+        for prompt, response in pairs:
+            f.write(json.dumps({"prompt": prompt, "response": response}) + "\n")
+    return str(path)
+
+
+PAIRS = [
+    ("phi", "bloom node"),                                       # 4 tokens
+    ("psi sync", "layer vector root branch bloom manifest"),     # 9 tokens: truncated, response kept
+    ("phi", "bloom node"),                                       # duplicate, still in flight with BATCH_SIZE 2
+    ("root branch bloom manifest phi psi node sync", "layer"),   # prompt alone fills seq_len
+    ("node", ""),                                                # nothing to learn but EOS
+]
+
+
+def run(tmp_path, tokenizer_dir, name, **kwargs):
+    data = write_pairs(tmp_path / "pairs.jsonl", PAIRS)
+    out = str(tmp_path / name / "packed")
+    report = export([data], out, seq_len=SEQ_LEN, tokenizer=tokenizer_dir,
+                    cache_path=str(tmp_path / "cache.sqlite"), workers=1, **kwargs)
+    return report, out
+
+
+def segments(out):
+    with PackedDataset(out) as ds:
+        return [(list(ds.tokens(i)[start:start + length]), prompt_length)
+                for i in range(len(ds)) for start, length, prompt_length in ds.segments(i)]
+
+
+def test_truncation_keeps_eos_and_counts_prompt_only(tmp_path, tokenizer_dir):
+    report, out = run(tmp_path, tokenizer_dir, "all")
+    assert report["records"] == 5 and report["unique_records"] == 4
+    assert report["truncated"] == 2
+    assert report["prompt_only"] == 2 and report["skipped"] == 0
+
+    found = segments(out)
+    assert len(found) == 5
+    for ids, prompt_length in found:
+        assert len(ids) <= SEQ_LEN
+        assert ids[-1] == EOS
+        assert prompt_length < len(ids)
+    trained = sorted(len(ids) - 1 - prompt_length for ids, prompt_length in found)
+    assert trained == [0, 0, 2, 2, 5]
+
+
+def test_skip_prompt_only(tmp_path, tokenizer_dir):
+    report, out = run(tmp_path, tokenizer_dir, "skipped", skip_prompt_only=True)
+    assert report["prompt_only"] == 2 and report["skipped"] == 2
+    assert report["truncated"] == 1
+    assert all(len(ids) - 1 > prompt_length for ids, prompt_length in segments(out))
+
+
+def test_cache_counts_cover_every_record(tmp_path, tokenizer_dir, monkeypatch):
+    monkeypatch.setattr(finetune_pack, "BATCH_SIZE", 2)
+    first, _ = run(tmp_path, tokenizer_dir, "first")
+    assert (first["cache_hits"], first["cache_misses"]) == (1, 4)
+
+    again, _ = run(tmp_path, tokenizer_dir, "again")
+    assert (again["cache_hits"], again["cache_misses"]) == (5, 0)
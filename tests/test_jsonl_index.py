@@ -0,0 +1,101 @@
+"""JsonlDataset indexing, incremental refresh and views."""
+
+import json
+
+import pytest
+
+from jsonl_index import JsonlDataset
+
+
+def write(path, records, mode="w", end="\n"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write("".join(json.dumps(r) + "\n" for r in records[:-1]))
+        if records:
+            f.write(json.dumps(records[-1]) + end)
+
+
+def test_random_access_and_blank_lines(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"i": 0}\n\n  {"i": 1}  \n\r\n{"i": 2}\n', encoding="utf-8")
+    with JsonlDataset(str(path)) as ds:
+        assert len(ds) == 3
+        assert [r["i"] for r in ds] == [0, 1, 2]
+        assert ds[-1] == {"i": 2}
+        assert bytes(ds.raw(1)) == b'{"i": 1}'
+        with pytest.raises(IndexError):
+            ds[3]
+
+
+def test_append_scans_only_the_tail(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write(path, [{"i": i} for i in range(3)])
+    ds = JsonlDataset(str(path))
+    write(path, [{"i": i} for i in range(3, 6)], mode="a")
+    assert len(ds.refresh()) == 6
+    assert ds[5] == {"i": 5}
+    ds.close()
+    with JsonlDataset(str(path)) as reopened:
+        assert [r["i"] for r in reopened] == list(range(6))
+
+
+def test_unterminated_tail_waits_for_its_newline(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text('{"i": 0}\n{"i": 1}\n{"i": ', encoding="utf-8")
+    ds = JsonlDataset(str(path))
+    assert len(ds) == 2
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('2}\n{"i": 3}\n')
+    assert [r["i"] for r in ds.refresh()] == [0, 1, 2, 3]
+    ds.close()
+
+
+def test_complete_file_keeps_last_record_without_newline(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write(path, [{"i": 0}, {"i": 1}], end="")
+    with JsonlDataset(str(path)) as ds:
+        assert len(ds) == 1
+    with JsonlDataset(str(path), complete=True) as ds:
+        assert [r["i"] for r in ds] == [0, 1]
+        assert ds[-1] == {"i": 1}
+    # The tail never reached the index, so a later append still lines up
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('\n{"i": 2}\n')
+    with JsonlDataset(str(path)) as ds:
+        assert [r["i"] for r in ds] == [0, 1, 2]
+
+
+def test_rewrite_rebuilds_the_index(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write(path, [{"i": i} for i in range(5)])
+    JsonlDataset(str(path)).close()
+    write(path, [{"j": i} for i in range(7)])
+    with JsonlDataset(str(path)) as ds:
+        assert [r["j"] for r in ds] == list(range(7))
+
+
+def test_shards_partition_and_shuffle_is_deterministic(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write(path, [{"i": i} for i in range(10)])
+    with JsonlDataset(str(path)) as ds:
+        shards = [[r["i"] for r in ds.shard(k, 3)] for k in range(3)]
+        assert sorted(sum(shards, [])) == list(range(10))
+        assert shards[1] == [1, 4, 7]
+        first = [r["i"] for r in ds.shuffled(seed=7)]
+        assert first == [r["i"] for r in ds.shuffled(seed=7)]
+        assert first != [r["i"] for r in ds.shuffled(seed=7, epoch=1)]
+        assert sorted(first) == list(range(10))
+        with pytest.raises(ValueError):
+            ds.shard(3, 3)
+
+
+def test_refresh_needs_raw_views_released(tmp_path):
+    path = tmp_path / "data.jsonl"
+    write(path, [{"i": 0}])
+    ds = JsonlDataset(str(path))
+    view = ds.raw(0)
+    with pytest.raises(BufferError):
+        ds.refresh()
+    assert ds[0] == {"i": 0}
+    view.release()
+    assert len(ds.refresh()) == 1
+    ds.close()
@@ -0,0 +1,34 @@
+import time
+
+from llm_adapter import manifest_render
+from llm_adapter.manifest_render import approx_tokens, render_manifest, token_counter, use_tokenizer
+
+MANIFEST = {
+    "harmonic_sync": 0.5,
+    "linear_directives": [
+        {"priority": "high", "action": f"exec::{i % 3}", "tag": "root", "path": f"dir_{i}", "confidence": 1.0}
+        for i in range(40)
+    ],
+}
+
+
+def test_rendering_never_loads_a_tokenizer():
+    started = time.perf_counter()
+    render_manifest(MANIFEST, token_budget=64, model_name="phi")
+    assert time.perf_counter() - started < 0.5
+    assert token_counter("phi") is approx_tokens
+    assert token_counter("phi:latest") is approx_tokens
+
+
+def test_budget_includes_header_and_keeps_paths():
+    text = render_manifest(MANIFEST, token_budget=64, model_name="phi")
+    assert approx_tokens(text) + text.count("\n") <= 64
+    assert "(root @ dir_" in text
+
+
+def test_use_tokenizer_fails_fast_without_local_files():
+    started = time.perf_counter()
+    assert use_tokenizer("no-such-model", tokenizer_id="example-org/definitely-not-cached") is False
+    assert time.perf_counter() - started < 10
+    assert token_counter("no-such-model") is approx_tokens
+    assert "no-such-model" not in manifest_render._counters
@@ -0,0 +1,222 @@
+"""phipe_core batch kernels and ropes against the scalar and f-string originals."""
+
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from phipe_core import FILTER_BLOCK, HarmonicRope, ΞΛΩStack, ΦπεNode, ΨΛΩLoop  # noqa: E402
+
+# Exercises empty, sub-block, exact-block and multi-block-plus-tail inputs
+SIZES = [0, 1, 7, FILTER_BLOCK, 3 * FILTER_BLOCK + 5]
+
+
+@pytest.fixture(params=["lfilter", "blocked"])
+def filter_path(request, monkeypatch):
+    if request.param == "lfilter":
+        pytest.importorskip("scipy.signal")
+    else:
+        # A None entry makes ``from scipy.signal import lfilter`` raise ImportError
+        monkeypatch.setitem(sys.modules, "scipy.signal", None)
+    return request.param
+
+
+def scalar_loop(inputs, start=0.0):
+    loop = ΨΛΩLoop()
+    loop.output = start
+    return np.array([loop.iterate(float(x)) for x in inputs]), loop.output
+
+
+def test_stabilize_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    ψ, φ, ε = rng.normal(size=(3, 50))
+    expected = [ΦπεNode(a, b, c).stabilize() for a, b, c in zip(ψ, φ, ε)]
+    np.testing.assert_array_equal(ΦπεNode.stabilize_batch(ψ, φ, ε), expected)
+    # Broadcast scalar drift
+    np.testing.assert_array_equal(ΦπεNode.stabilize_batch(ψ, φ, 0.25),
+                                  [ΦπεNode(a, b, 0.25).stabilize() for a, b in zip(ψ, φ)])
+
+
+def test_stabilize_batch_float32_out_and_aliasing():
+    rng = np.random.default_rng(1)
+    ψ, φ, ε = rng.normal(size=(3, 40))
+    expected = ΦπεNode.stabilize_batch(ψ, φ, ε)
+
+    single = ΦπεNode.stabilize_batch(ψ, φ, ε, dtype=np.float32)
+    assert single.dtype == np.float32
+    np.testing.assert_allclose(single, expected, rtol=1e-5, atol=1e-5)
+
+    aliased = ψ.copy()
+    result = ΦπεNode.stabilize_batch(aliased, φ, ε, out=aliased)
+    assert result is aliased
+    np.testing.assert_array_equal(aliased, expected)
+
+    strided = np.zeros(80)[::2]
+    ΦπεNode.stabilize_batch(ψ, φ, ε, out=strided)
+    np.testing.assert_array_equal(strided, expected)
+
+    with pytest.raises(ValueError):
+        ΦπεNode.stabilize_batch(ψ, φ, ε, out=np.empty(39))
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_run_matches_iterate(filter_path, n):
+    x = np.random.default_rng(n).normal(size=n)
+    expected, last = scalar_loop(x, start=0.5)
+    loop = ΨΛΩLoop()
+    loop.output = 0.5
+    np.testing.assert_allclose(loop.run(x), expected, rtol=1e-12, atol=1e-12)
+    assert loop.output == pytest.approx(last, abs=1e-12)
+
+
+def test_run_continues_across_calls(filter_path):
+    x = np.random.default_rng(2).normal(size=2 * FILTER_BLOCK + 3)
+    expected, _ = scalar_loop(x)
+    loop = ΨΛΩLoop()
+    head = loop.run(x[:100]).copy()
+    tail = loop.run(x[100:])
+    np.testing.assert_allclose(np.concatenate([head, tail]), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_run_float32(filter_path):
+    x = np.random.default_rng(3).normal(size=2 * FILTER_BLOCK + 9)
+    expected, _ = scalar_loop(x)
+    y = ΨΛΩLoop().run(x, dtype=np.float32)
+    assert y.dtype == np.float32
+    np.testing.assert_allclose(y, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_run_in_place_and_strided_out(filter_path):
+    x = np.random.default_rng(4).normal(size=FILTER_BLOCK + 17)
+    expected, _ = scalar_loop(x)
+
+    aliased = x.copy()
+    assert ΨΛΩLoop().run(aliased, out=aliased) is aliased
+    np.testing.assert_allclose(aliased, expected, rtol=1e-12, atol=1e-12)
+
+    strided = np.zeros(2 * x.size)[::2]
+    assert ΨΛΩLoop().run(x, out=strided) is strided
+    np.testing.assert_allclose(strided, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_run_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        ΨΛΩLoop().run(np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        ΨΛΩLoop().run(np.zeros(4), out=np.zeros(5))
+
+
+# 🧵 Ropes
+class FStringStack:
+    """The original ΞΛΩStack, merging with f-strings."""
+
+    def __init__(self):
+        self.stack = []
+
+    def push(self, symbol):
+        self.stack.append(symbol)
+
+    def recurse(self):
+        while len(self.stack) > 1:
+            a = self.stack.pop()
+            b = self.stack.pop()
+            self.stack.append(f"[Ξ]{a}⟴{b}[Ω]")
+
+
+def random_symbols(rng, n):
+    pool = ["", "ψ", "φ-node", "harmonic", "Ω∞", "a" * 40, 0, -7, 3.25, 1e-9]
+    return [pool[i] for i in rng.integers(len(pool), size=n)]
+
+
+def merged(symbols, partial=0):
+    """Rope stack and reference stack fed ``symbols``, recursing every ``partial`` pushes."""
+    rope, reference = ΞΛΩStack(), FStringStack()
+    for i, symbol in enumerate(symbols, 1):
+        rope.push(symbol)
+        reference.push(symbol)
+        if partial and i % partial == 0:
+            rope.recurse()
+            reference.recurse()
+    rope.recurse()
+    reference.recurse()
+    return rope, reference.stack[-1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rope_renders_like_fstring_merges(seed):
+    rng = np.random.default_rng(seed)
+    rope, text = merged(random_symbols(rng, int(rng.integers(1, 40))), partial=int(rng.integers(0, 4)))
+    top = rope.stack[-1]
+    assert rope.render() == text
+    assert len(top) == len(text)
+    assert top == text
+
+    for _ in range(50):
+        start, stop = sorted(int(i) for i in rng.integers(-len(text) - 3, len(text) + 3, size=2))
+        assert top[start:stop] == text[start:stop]
+        assert top.substring(start, stop) == text[start:stop]
+    assert top[::3] == text[::3]
+    for index in (0, len(text) - 1, -1, -len(text)):
+        assert top[index] == text[index]
+    for index in (len(text), -len(text) - 1):
+        with pytest.raises(IndexError):
+            top[index]
+
+
+def test_rope_equality_and_hash():
+    a, b = HarmonicRope("x", HarmonicRope(1, 2)), HarmonicRope("x", "[Ξ]1⟴2[Ω]")
+    assert a == b == "[Ξ]x⟴[Ξ]1⟴2[Ω][Ω]"
+    assert hash(a) == hash(b) == hash(str(a))
+    assert a != "something else"
+
+
+def test_deep_nesting_does_not_recurse():
+    rope, text = merged(["s"] * 5000, partial=1)
+    top = rope.stack[-1]
+    assert len(top) == len(text)
+    assert top[-10:] == text[-10:]
+    assert str(top) == text
+
+
+def test_write_to_text_binary_and_socket():
+    import io
+    import socket
+    import threading
+
+    rope, text = merged(random_symbols(np.random.default_rng(9), 30))
+    top = rope.stack[-1]
+
+    buffer = io.StringIO()
+    assert rope.write_to(buffer) == len(text)
+    assert buffer.getvalue() == text
+
+    raw = io.BytesIO()
+    assert top.write_to(raw, buffer_size=8) == len(text)
+    assert raw.getvalue() == text.encode("utf-8")
+
+    left, right = socket.socketpair()
+    received = bytearray()
+
+    def drain():
+        while chunk := right.recv(4096):
+            received.extend(chunk)
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    with left:
+        top.write_to(left, buffer_size=16)
+        left.shutdown(socket.SHUT_WR)
+    reader.join(5)
+    right.close()
+    assert received.decode("utf-8") == text
+
+
+def test_stack_write_to_plain_top_and_empty():
+    import io
+
+    stack = ΞΛΩStack([3.5])
+    out = io.StringIO()
+    assert stack.write_to(out) == 3 and out.getvalue() == "3.5"
+    assert ΞΛΩStack().write_to(io.StringIO()) == 0
+    assert ΞΛΩStack().render() == ""
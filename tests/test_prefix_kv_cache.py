@@ -0,0 +1,82 @@
+"""PrefixKVCache against a tiny randomly initialised BLOOM (CPU only)."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from bloom_inference import PrefixKVCache  # noqa: E402
+from phi_bloom_bridge import (  # noqa: E402
+    BLOOM_INPUT_PREFIX, BloomModelInterface, PhiBloomBridge, PhiModelInterface,
+)
+
+CORPUS = [
+    f"{BLOOM_INPUT_PREFIX}exec root branch collapse depth",
+    "harmonic recursion bloom manifest sync vector layer",
+] * 50
+
+
+@pytest.fixture
+def components():
+    from tokenizers import Tokenizer, models, trainers
+
+    # No pre-tokenizer: merges may span the prefix/suffix boundary, like real BPE on unspaced text
+    backend = Tokenizer(models.BPE(unk_token="<unk>"))
+    backend.train_from_iterator(CORPUS, trainers.BpeTrainer(vocab_size=200, special_tokens=["<unk>", "</s>"]))
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>", eos_token="</s>")
+    torch.manual_seed(0)
+    config = transformers.BloomConfig(vocab_size=backend.get_vocab_size(), hidden_size=32, n_layer=2, n_head=2,
+                                      eos_token_id=1, bos_token_id=1)
+    return transformers.BloomForCausalLM(config).eval(), tokenizer
+
+
+def greedy(model, inputs):
+    with torch.no_grad():
+        return model.generate(**inputs, max_new_tokens=6, do_sample=False, pad_token_id=1)
+
+
+def test_cached_generation_matches_uncached(components):
+    model, tokenizer = components
+    cache = PrefixKVCache(model, tokenizer)
+    cache.register(BLOOM_INPUT_PREFIX)
+    text = f"{BLOOM_INPUT_PREFIX}harmonic recursion"
+    plain = tokenizer(text, return_tensors="pt", add_special_tokens=False)["input_ids"]
+
+    inputs, prefix = cache.prepare(text)
+    assert prefix == BLOOM_INPUT_PREFIX
+    assert torch.equal(inputs["input_ids"], plain)
+    expected = greedy(model, {"input_ids": plain, "attention_mask": torch.ones_like(plain)})
+    assert torch.equal(greedy(model, inputs), expected)
+    assert cache.stats()["hits"] == 1
+
+
+def test_boundary_merge_is_a_miss(components):
+    model, tokenizer = components
+    cache = PrefixKVCache(model, tokenizer)
+    cache.register("harmonic rec")
+    text = "harmonic recursion"
+    plain = tokenizer(text, return_tensors="pt", add_special_tokens=False)["input_ids"]
+    prefix_ids = tokenizer("harmonic rec", return_tensors="pt", add_special_tokens=False)["input_ids"]
+    # The trained merges tokenise the text differently from prefix + remainder
+    assert not torch.equal(plain[..., :prefix_ids.shape[-1]], prefix_ids)
+
+    inputs, prefix = cache.prepare(text)
+    assert prefix is None
+    assert torch.equal(inputs["input_ids"], plain)
+    assert "past_key_values" not in inputs
+    assert cache.stats()["misses"] == 1
+
+
+def test_bridge_input_hits_the_prefix_cache(components):
+    model, tokenizer = components
+
+    class EchoPhi(PhiModelInterface):
+        def generate(self, prompt, session_id=None):
+            return prompt
+
+    bloom = BloomModelInterface.from_components(model, tokenizer)
+    bridge = PhiBloomBridge(bloom=bloom, phi=EchoPhi())
+    result = bridge.process("exec root branch")
+    assert result["bloom_output"].startswith(BLOOM_INPUT_PREFIX.strip())
+    stats = bloom.prefix_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 0
@@ -0,0 +1,50 @@
+"""RecursionDriver stop reasons, outcome cache and saved-pass accounting."""
+
+import pytest
+
+from data_core.layer_9.recursion_driver import RecursionDriver
+from data_core.recursion_packet import RecursionPacket
+
+SETTLES = "build a harmonic clock"
+RELOOPS = "entropy field loop"
+
+
+def run(driver, signal, depth=None):
+    packet = RecursionPacket(signal, symbols=signal.split())
+    if depth is not None:
+        packet.annotations["recursion_depth"] = depth
+    return driver.run(packet).annotations["recursion_stop"]
+
+
+@pytest.fixture
+def driver():
+    return RecursionDriver()
+
+
+def test_cached_settled_run_saves_only_its_own_passes(driver):
+    first = run(driver, SETTLES)
+    assert first["reason"] == "settled"
+    assert driver.stats()["passes_saved"] == 0
+
+    replay = run(driver, SETTLES)
+    assert (replay["reason"], replay["cached_reason"]) == ("cached", "settled")
+    assert driver.stats()["passes_saved"] == first["passes"]
+
+
+def test_cached_early_stop_saves_against_max_depth(driver):
+    first = run(driver, RELOOPS)
+    assert first["reason"] in ("fixed_point", "cycle", "converged")
+    unbounded = driver._max_depth() + 1
+    assert driver.stats()["passes_saved"] == unbounded - first["passes"]
+
+    replay = run(driver, RELOOPS)
+    assert replay["reason"] == "cached"
+    assert driver.stats()["passes_saved"] == 2 * unbounded - first["passes"]
+
+
+def test_start_depth_is_part_of_the_cache_key(driver):
+    run(driver, RELOOPS)
+    deeper = run(driver, RELOOPS, depth=2)
+    assert deeper["reason"] != "cached"
+    assert run(driver, RELOOPS, depth=2)["reason"] == "cached"
+    assert driver.stats()["cache_size"] == 2
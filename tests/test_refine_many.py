@@ -0,0 +1,101 @@
+"""PhiBloomBridge.refine_many with stand-in Phi and BLOOM models."""
+
+import threading
+import time
+
+import pytest
+
+from phi_bloom_bridge import PhiBloomBridge, PhiModelInterface
+
+
+class Recorder:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def run(self, tag, text):
+        if self.fail_on is not None and self.fail_on in text:
+            raise RuntimeError(f"cannot handle {text!r}")
+        started = time.monotonic()
+        time.sleep(self.delay)
+        with self.lock:
+            self.spans.append((started, time.monotonic()))
+        return f"{tag}({text})"
+
+
+class StandinPhi(Recorder, PhiModelInterface):
+    def generate(self, prompt, session_id=None):
+        return self.run("phi", prompt)
+
+
+class StandinBloom(Recorder):
+    def generate_from_manifest(self, manifest):
+        return self.run("bloom", manifest)
+
+
+def bridge(phi=None, bloom=None):
+    return PhiBloomBridge(bloom=bloom or StandinBloom(), phi=phi or StandinPhi(), bloom_prefix="")
+
+
+def refine_in_thread(b, *args, **kwargs):
+    """Run refine_many with a hard timeout so a hang fails the test instead of blocking it."""
+    box = {}
+    thread = threading.Thread(target=lambda: box.update(results=b.refine_many(*args, **kwargs)), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "refine_many did not return"
+    return box["results"]
+
+
+def never(history):
+    return False
+
+
+def test_results_in_input_order_with_every_round():
+    results = refine_in_thread(bridge(), ["a", "b", "c"], rounds=2, stop_condition=never)
+    assert [r["prompt"] for r in results] == ["a", "b", "c"]
+    for prompt, result in zip("abc", results):
+        assert [r["bloom_output"] for r in result["rounds"]] == [
+            f"bloom(phi({prompt}))", f"bloom(phi(bloom(phi({prompt}))))"]
+        assert result["bloom_output"] == result["rounds"][-1]["bloom_output"]
+        assert result["converged"] is False
+
+
+def test_phi_and_bloom_overlap():
+    phi, bloom = StandinPhi(delay=0.05), StandinBloom(delay=0.05)
+    refine_in_thread(bridge(phi, bloom), ["a", "b", "c", "d"], rounds=2, stop_condition=never)
+    overlaps = [(p, b) for p in phi.spans for b in bloom.spans if p[0] < b[1] and b[0] < p[1]]
+    assert overlaps, "Phi and BLOOM never worked at the same time"
+
+
+def test_early_stop_marks_converged():
+    results = refine_in_thread(bridge(), ["a", "b"], rounds=5, stop_condition=lambda history: len(history) >= 2)
+    assert [len(r["rounds"]) for r in results] == [2, 2]
+    assert all(r["converged"] for r in results)
+
+
+def test_stage_errors_are_reported_per_prompt():
+    results = refine_in_thread(bridge(phi=StandinPhi(fail_on="bad"), bloom=StandinBloom(fail_on="worse")),
+                               ["ok", "bad", "worse"], rounds=2, stop_condition=never)
+    assert "error" not in results[0] and len(results[0]["rounds"]) == 2
+    assert results[1]["error"].startswith("RuntimeError") and results[1]["rounds"] == []
+    assert results[2]["error"].startswith("RuntimeError") and results[2]["rounds"] == []
+
+
+def test_failing_stop_condition_does_not_hang():
+    def explode(history):
+        if "boom" in history[-1]["bloom_output"]:
+            raise ValueError("bad stop")
+        return False
+
+    results = refine_in_thread(bridge(), ["fine", "boom"], rounds=2, stop_condition=explode)
+    assert "error" not in results[0]
+    assert results[1]["error"] == "ValueError: bad stop"
+    assert results[1]["converged"] is False
+
+
+def test_rounds_must_be_positive():
+    with pytest.raises(ValueError):
+        bridge().refine_many(["a"], rounds=0)
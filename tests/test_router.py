@@ -0,0 +1,147 @@
+"""OllamaRouter against local stand-in Ollama servers."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from llm_adapter.router import HostError, NoHealthyHostError, OllamaRouter
+from llm_adapter.standin_server import StandinConfig, StandinServer
+
+MESSAGES = [{"role": "user", "content": "route me"}]
+
+
+def standin(latency_ms=0.0, error_rate=0.0):
+    return StandinServer(StandinConfig(latency_ms=latency_ms, latency_dist="fixed", tokens_per_s=0,
+                                       response_tokens=4, error_rate=error_rate, seed=0)).start()
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def make(*args, **kwargs):
+        server = standin(*args, **kwargs)
+        started.append(server)
+        return server
+
+    yield make
+    for server in started:
+        server.stop()
+
+
+def dead_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_least_outstanding_host_is_chosen(servers):
+    a, b = servers(300), servers(300)
+    router = OllamaRouter([a.url, b.url], health_interval=None)
+    try:
+        first = {}
+        worker = threading.Thread(target=lambda: first.update(router.chat("phi", MESSAGES)))
+        worker.start()
+        assert wait_for(lambda: any(host.in_flight for host in router.hosts))
+        busy = next(host.url for host in router.hosts if host.in_flight)
+        second = router.chat("phi", MESSAGES)
+        worker.join()
+        assert second["routed_host"] != busy
+        assert first["routed_host"] == busy
+        assert a.requests == b.requests == 1
+    finally:
+        router.close()
+
+
+def test_hedge_fires_after_p95_and_cancels_loser(servers):
+    slow, fast = servers(2000), servers(10)
+    router = OllamaRouter([slow.url, fast.url], hedge=True, min_samples=5, health_interval=None)
+    try:
+        # Recent history: the slow host usually answers in 50 ms, so it is preferred and hedged at p95
+        router.hosts[0].latencies.extend([0.05] * 20)
+        router.hosts[1].latencies.extend([0.5] * 20)
+        started = time.monotonic()
+        response = router.chat("phi", MESSAGES)
+        elapsed = time.monotonic() - started
+        assert response["routed_host"] == fast.url
+        assert 0.05 <= elapsed < 1.0
+        assert slow.requests == fast.requests == 1
+        assert router.hosts[1].hedges_won == 1
+        # The losing request's connection is closed long before the slow host would have answered
+        assert wait_for(lambda: router.hosts[0].in_flight == 0, timeout=0.5)
+        assert router.hosts[0].failures == 0
+    finally:
+        router.close()
+
+
+def test_circuit_opens_then_recovers_half_open(servers):
+    flaky = servers(error_rate=1.0)
+    router = OllamaRouter([flaky.url], failure_threshold=2, cooldown=0.3, retries=0, health_interval=None)
+    try:
+        for _ in range(2):
+            with pytest.raises(HostError):
+                router.chat("phi", MESSAGES)
+        assert router.stats()[0]["breaker"] == "open"
+        with pytest.raises(NoHealthyHostError):
+            router.chat("phi", MESSAGES)
+        assert flaky.requests == 2
+
+        flaky.config.error_rate = 0.0
+        time.sleep(0.35)
+        assert router._acquire() is router.hosts[0]
+        assert router.stats()[0]["breaker"] == "half_open"
+        # Only one probe at a time while half-open
+        assert router._acquire() is None
+        router._release(router.hosts[0])
+
+        assert router.chat("phi", MESSAGES)["routed_host"] == flaky.url
+        assert router.stats()[0]["breaker"] == "closed"
+    finally:
+        router.close()
+
+
+def test_failed_probe_reopens_circuit(servers):
+    flaky = servers(error_rate=1.0)
+    router = OllamaRouter([flaky.url], failure_threshold=1, cooldown=0.2, retries=0, health_interval=None)
+    try:
+        with pytest.raises(HostError):
+            router.chat("phi", MESSAGES)
+        time.sleep(0.25)
+        with pytest.raises(HostError):
+            router.chat("phi", MESSAGES)
+        assert router.stats()[0]["breaker"] == "open"
+    finally:
+        router.close()
+
+
+def test_retry_on_connection_failure(servers):
+    live = servers()
+    dead = dead_url()
+    router = OllamaRouter([dead, live.url], retries=1, health_interval=None)
+    try:
+        response = router.chat("phi", MESSAGES)
+        assert response["routed_host"] == live.url
+        stats = {host["url"]: host for host in router.stats()}
+        assert stats[dead]["failures"] == 1
+        assert stats[live.url]["requests"] == 1
+    finally:
+        router.close()
+
+    no_retry = OllamaRouter([dead, live.url], retries=0, health_interval=None)
+    try:
+        with pytest.raises(HostError):
+            no_retry.chat("phi", MESSAGES)
+    finally:
+        no_retry.close()
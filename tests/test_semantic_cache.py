@@ -0,0 +1,29 @@
+from llm_adapter.semantic_cache import DEFAULT_THRESHOLD, SemanticCache, calibrate
+
+
+def test_default_threshold_has_no_false_hits_on_calibration_pairs():
+    report = calibrate()
+    assert report["false_hits"] == 0
+    assert report["max_different"] < DEFAULT_THRESHOLD
+    assert report["paraphrase_hits"] >= report["paraphrases"] // 2
+
+
+def test_swapped_units_miss_and_paraphrase_hits():
+    cache = SemanticCache(audit_rate=0.0)
+    cache.store("convert celsius to fahrenheit in python", "c_to_f")
+    assert cache.lookup("convert fahrenheit to celsius in python") is None
+    cache.store("write a python function to reverse a list", "reverse")
+    hit = cache.lookup("write a python function that reverses a list")
+    assert hit is not None and hit.entry.value == "reverse"
+
+
+def test_audits_are_on_by_default_and_count_false_hits():
+    cache = SemanticCache(audit_rate=1.0, seed=0)
+    assert SemanticCache().audit_rate > 0
+    cache.store("read a json file in python", "stale answer")
+    value = cache.get_or_compute("read the json file in python", lambda: "fresh answer")
+    assert value == "fresh answer"
+    stats = cache.stats()
+    assert stats["audits"] == 1
+    assert stats["false_hits"] == 1
+    assert stats["audit_false_hit_rate"] == 1.0
@@ -0,0 +1,71 @@
+"""Deduper index commits, crash recovery and threshold checks."""
+
+import json
+
+import pytest
+
+import sotma_dedup
+from sotma_dedup import Deduper, resume_output, sync_file, threshold_conflict
+
+CHUNKS = [f"chunk {i} about harmonic recursion layer {i} and its bloom vector number {i * 7}" for i in range(5)]
+
+
+def run(out, index, chunks, commit_every=2):
+    """Dedup ``chunks`` into ``out`` the way sotma_ingest does."""
+    dedup = Deduper(str(index), commit_every=commit_every, before_commit=lambda: sync_file(out))
+    resume_output(out, dedup)
+    for i, chunk in enumerate(chunks):
+        if dedup.check(chunk, key=f"k{i}") is None:
+            out.write(json.dumps({"id": i, "response": chunk}) + "\n")
+    return dedup
+
+
+def test_near_and_exact_duplicates_are_dropped(tmp_path):
+    with Deduper(str(tmp_path / "idx.sqlite")) as dedup:
+        assert dedup.check(CHUNKS[0], key="a") is None
+        assert dedup.check(CHUNKS[0].upper(), key="b")["reason"] == "exact_duplicate"
+        near = dedup.check(CHUNKS[0] + " again", key="c")
+        assert near["reason"] == "near_duplicate" and near["duplicate_of"]["key"] == "a"
+        assert dedup.check(CHUNKS[1], key="d") is None
+        assert dedup.check("  ", key="e")["reason"] == "empty"
+
+
+def test_rerun_after_crash_writes_each_chunk_once(tmp_path):
+    output, index = tmp_path / "out.jsonl", tmp_path / "idx.sqlite"
+    with open(output, "w", encoding="utf-8") as out:
+        dedup = run(out, index, CHUNKS)
+        # Crash: the last chunk is on disk but its index commit never happens
+        out.write('{"id": 99, "resp')
+        out.flush()
+        dedup._db.close()
+
+    with open(output, "a", encoding="utf-8") as out:
+        dedup = run(out, index, CHUNKS)
+        dedup.close()
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(5))
+
+
+def test_offset_recorded_with_each_commit(tmp_path):
+    output, index = tmp_path / "out.jsonl", tmp_path / "idx.sqlite"
+    with open(output, "w", encoding="utf-8") as out:
+        dedup = run(out, index, CHUNKS)
+        dedup.close()
+    with Deduper(str(index)) as dedup:
+        assert dedup.output_offset == output.stat().st_size
+
+
+def test_threshold_with_other_banding_is_rejected(tmp_path, capsys):
+    index = tmp_path / "idx.sqlite"
+    Deduper(str(index), threshold=0.8).close()
+    assert threshold_conflict(str(index), 0.8) is None
+    assert "built with 16" in threshold_conflict(str(index), 0.5)
+    assert threshold_conflict(str(tmp_path / "missing.sqlite"), 0.5) is None
+
+    data = tmp_path / "in.jsonl"
+    data.write_text(json.dumps({"response": CHUNKS[0]}) + "\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        sotma_dedup.main([str(data), "-o", str(tmp_path / "o.jsonl"), "--index", str(index),
+                          "--report", str(tmp_path / "r.jsonl"), "--threshold", "0.5"])
+    assert "banding is fixed per index" in capsys.readouterr().err